@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from .models import User, UserProfile, UserRoleAssignment
+from .models import OutboundEmail, User, UserProfile, UserRoleAssignment
 
 
 @admin.register(User)
@@ -25,3 +25,11 @@ class UserRoleAssignmentAdmin(admin.ModelAdmin):
     list_display = ('user', 'role', 'created_at')
     list_filter = ('role',)
     search_fields = ('user__username',)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'template')
+    search_fields = ('to_email', 'subject')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
@@ -0,0 +1,59 @@
+"""
+Détection de l'appareil à partir du User-Agent, avec cache mémoire.
+
+`user_agents.parse` enchaîne de nombreuses expressions régulières (de l'ordre
+de la milliseconde par appel) alors que le trafic se concentre sur quelques
+centaines de User-Agent distincts. Le résultat est donc mémorisé dans un cache
+LRU borné (`USER_AGENT_CACHE_SIZE` entrées), partagé par tous les appelants :
+création des `UserSession`, `AdminSessionViewSet`, serializers.
+
+`cache_stats()` expose la taille du cache et son taux de succès.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from django.conf import settings
+from user_agents import parse
+
+# Au-delà, un User-Agent est tronqué pour la clé du cache (chaînes forgées).
+MAX_USER_AGENT_LENGTH = 1024
+
+
+def _parse(user_agent_string: str) -> Tuple[str, str, str]:
+    user_agent = parse(user_agent_string)
+    if user_agent.is_mobile:
+        device_type = 'mobile'
+    elif user_agent.is_tablet:
+        device_type = 'tablet'
+    else:
+        device_type = 'desktop'
+    browser = f"{user_agent.browser.family} {user_agent.browser.version_string}"
+    os = f"{user_agent.os.family} {user_agent.os.version_string}"
+    return device_type, browser, os
+
+
+_cached_parse = lru_cache(maxsize=getattr(settings, 'USER_AGENT_CACHE_SIZE', 1024))(_parse)
+
+
+def parse_device(user_agent_string: str) -> Dict[str, str]:
+    """Type d'appareil, navigateur et système ; un nouveau dict à chaque appel."""
+    device_type, browser, os = _cached_parse((user_agent_string or '')[:MAX_USER_AGENT_LENGTH])
+    return {'device_type': device_type, 'browser': browser, 'os': os}
+
+
+def cache_stats() -> Dict[str, float]:
+    info = _cached_parse.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+    }
+
+
+def clear_cache() -> None:
+    _cached_parse.cache_clear()
@@ -0,0 +1,227 @@
+"""
+File d'envoi des emails, persistée en base (`OutboundEmail`).
+
+- `enqueue_email` enregistre le message (une insertion) : les vues
+  (inscription, renvoi de vérification, mot de passe oublié) ne dépendent plus
+  de la disponibilité du serveur SMTP.
+- Le worker réclame les messages dus par lots (`FOR UPDATE SKIP LOCKED` sur
+  PostgreSQL : plusieurs processus peuvent tourner en parallèle) et les envoie
+  sur une seule connexion SMTP gardée ouverte entre les lots, refermée après
+  `IDLE_TIMEOUT` secondes d'inactivité ou sur erreur réseau.
+- Un échec replanifie le message avec un délai exponentiel ; après
+  `EMAIL_QUEUE_MAX_ATTEMPTS` essais il passe en `failed`. Un message resté en
+  `sending` (processus arrêté pendant l'envoi) redevient dû après
+  `SENDING_TIMEOUT`.
+
+Le worker tourne dans un thread du processus web (`EMAIL_QUEUE_WORKER`) ou
+dans un processus dédié : `manage.py send_queued_emails`.
+"""
+from __future__ import annotations
+
+import logging
+import smtplib
+import threading
+import time
+from datetime import timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY = 30  # secondes, doublé à chaque essai
+RETRY_MAX_DELAY = 3600
+SENDING_TIMEOUT = timedelta(minutes=10)
+POLL_INTERVAL = 5
+IDLE_TIMEOUT = 60
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY))
+
+
+def enqueue_email(to_email: str, subject: str, text_body: str, html_body: str = '', template: str = ''):
+    """Met un email en file ; l'envoi a lieu après le commit de la transaction courante."""
+    from .models import OutboundEmail
+
+    email = OutboundEmail.objects.create(
+        to_email=to_email,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body,
+        template=template,
+    )
+    if getattr(settings, 'EMAIL_QUEUE_WORKER', True):
+        transaction.on_commit(email_worker.wake)
+    return email
+
+
+def enqueue_emails(messages: Iterable[dict], batch_size: int = 500) -> List:
+    """Met en file plusieurs emails (dicts des arguments de `enqueue_email`) en `bulk_create`."""
+    from .models import OutboundEmail
+
+    emails = OutboundEmail.objects.bulk_create(
+        [OutboundEmail(from_email=settings.DEFAULT_FROM_EMAIL, **message) for message in messages],
+        batch_size=batch_size,
+    )
+    if emails and getattr(settings, 'EMAIL_QUEUE_WORKER', True):
+        transaction.on_commit(email_worker.wake)
+    return emails
+
+
+def claim_due(batch_size: int) -> List:
+    """Réserve jusqu'à `batch_size` messages dus (statut `sending`) et les retourne."""
+    from .models import OutboundEmail
+
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                status__in=[OutboundEmail.Status.PENDING, OutboundEmail.Status.SENDING],
+                next_attempt_at__lte=now,
+            )
+            .order_by('next_attempt_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        OutboundEmail.objects.filter(pk__in=ids).update(
+            status=OutboundEmail.Status.SENDING,
+            attempts=F('attempts') + 1,
+            next_attempt_at=now + SENDING_TIMEOUT,
+        )
+    return list(OutboundEmail.objects.filter(pk__in=ids).order_by('next_attempt_at', 'pk'))
+
+
+def _as_message(email, connection) -> EmailMultiAlternatives:
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.text_body,
+        from_email=email.from_email,
+        to=[email.to_email],
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _is_connection_error(error: Exception) -> bool:
+    # Les exceptions smtplib dérivent d'OSError ; seuls ces refus concernent le message lui-même.
+    message_errors = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+    return isinstance(error, OSError) and not isinstance(error, message_errors)
+
+
+def _record_failure(email, error: Exception) -> None:
+    from .models import OutboundEmail
+
+    max_attempts = getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 6)
+    if email.attempts >= max_attempts:
+        status, next_attempt_at = OutboundEmail.Status.FAILED, timezone.now()
+    else:
+        status, next_attempt_at = OutboundEmail.Status.PENDING, timezone.now() + retry_delay(email.attempts)
+    OutboundEmail.objects.filter(pk=email.pk).update(
+        status=status, next_attempt_at=next_attempt_at, last_error=repr(error)[:2000],
+    )
+
+
+class EmailWorker:
+    """Envoie la file sur une connexion SMTP réutilisée ; un thread par processus."""
+
+    def __init__(self):
+        self._connection = None
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def _get_connection(self):
+        if self._connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:  # noqa: BLE001 - connexion déjà perdue
+                pass
+            self._connection = None
+
+    def deliver_batch(self, batch_size: Optional[int] = None) -> Tuple[int, int]:
+        """Envoie un lot de messages dus ; retourne (envoyés, en échec)."""
+        from .models import OutboundEmail
+
+        emails = claim_due(batch_size or getattr(settings, 'EMAIL_QUEUE_BATCH_SIZE', 50))
+        sent_ids, failed = [], 0
+        for index, email in enumerate(emails):
+            try:
+                _as_message(email, self._get_connection()).send()
+            except Exception as exc:  # noqa: BLE001 - replanifié avec délai
+                logger.warning("Envoi de l'email %s à %s impossible : %s", email.pk, email.to_email, exc)
+                if not _is_connection_error(exc):
+                    _record_failure(email, exc)
+                    failed += 1
+                    continue
+                # Serveur injoignable ou connexion perdue : tout le reste du lot est replanifié.
+                self.close()
+                for remaining in emails[index:]:
+                    _record_failure(remaining, exc)
+                failed += len(emails) - index
+                break
+            else:
+                sent_ids.append(email.pk)
+        if sent_ids:
+            OutboundEmail.objects.filter(pk__in=sent_ids).update(
+                status=OutboundEmail.Status.SENT, sent_at=timezone.now(), last_error='',
+            )
+        return len(sent_ids), failed
+
+    def drain(self) -> Tuple[int, int]:
+        """Envoie les lots tant que des messages sont dus."""
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = self.deliver_batch()
+            total_sent, total_failed = total_sent + sent, total_failed + failed
+            if not sent and not failed:
+                return total_sent, total_failed
+
+    def run_forever(self) -> None:
+        idle_since = time.monotonic()
+        while True:
+            self._wakeup.wait(POLL_INTERVAL)
+            self._wakeup.clear()
+            try:
+                close_old_connections()
+                sent, failed = self.drain()
+            except Exception:  # noqa: BLE001 - le worker ne doit jamais s'arrêter
+                logger.exception("Erreur du worker d'envoi des emails")
+                self.close()
+                continue
+            if sent or failed:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= IDLE_TIMEOUT:
+                # Pas d'envoi récent : ne pas garder la connexion SMTP ouverte.
+                self.close()
+
+    def wake(self) -> None:
+        self._ensure_thread()
+        self._wakeup.set()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run_forever, name='email-queue', daemon=True)
+                self._thread.start()
+
+
+email_worker = EmailWorker()
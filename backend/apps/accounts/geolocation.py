@@ -0,0 +1,293 @@
+"""
+Géolocalisation des adresses IP des sessions utilisateur, hors du cycle de requête.
+
+- `create_user_session` enregistre la session avec `location='pending'` (sauf
+  réseau local ou IP déjà en cache) puis, après commit, confie la résolution
+  au thread de fond (`schedule_location`).
+- Les résultats sont gardés dans un cache LRU + TTL en mémoire, par préfixe
+  /24 (IPv4) ou /64 (IPv6) : une rafale de connexions depuis un même réseau
+  ne consomme qu'un appel au service externe.
+- Deux backends (`GEOIP_BACKEND`) : `ipapi` (ipapi.co, 1000 requêtes/jour) et
+  `file`, qui lit un fichier local de plages triées (`GEOIP_RANGES_FILE`,
+  construit par `manage.py build_ip_ranges`) mappé en mémoire et parcouru par
+  recherche dichotomique, sans réseau (tests, déploiements isolés).
+- Les sessions restées en attente (redémarrage, file pleine) sont reprises par
+  `manage.py resolve_session_locations`.
+"""
+from __future__ import annotations
+
+import ipaddress
+import logging
+import mmap
+import queue
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+PENDING_LOCATION = 'pending'
+LOCAL_LOCATION = 'Local Network'
+# Les échecs (quota, réseau) sont gardés moins longtemps que les réponses.
+FAILURE_TTL = 300
+QUEUE_SIZE = 1000
+
+
+def unknown_location(ip_address: str) -> str:
+    return f'Unknown ({ip_address})'
+
+
+def is_local(ip_address: str) -> bool:
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return ip_address == 'localhost'
+    return address.is_private or address.is_loopback or address.is_link_local
+
+
+def cache_key(ip_address: str) -> str:
+    """Préfixe réseau /24 (IPv4) ou /64 (IPv6) : même localisation pour tout le bloc."""
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return ip_address
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f'{address}/{prefix}', strict=False))
+
+
+def format_location(city: str, region: str, country: str) -> Optional[str]:
+    parts = [part for part in (city, region, country) if part]
+    return ', '.join(parts) if parts else None
+
+
+class LocationCache:
+    """Cache LRU borné avec expiration, partagé par les threads du worker."""
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + (ttl or self.ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class IpapiBackend:
+    """Service ipapi.co (HTTPS, quota gratuit de 1000 requêtes/jour)."""
+
+    def __init__(self, timeout: float = 3):
+        self.timeout = timeout
+
+    def lookup(self, ip_address: str) -> Optional[str]:
+        try:
+            response = requests.get(f'https://ipapi.co/{ip_address}/json/', timeout=self.timeout)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        return format_location(data.get('city', ''), data.get('region', ''), data.get('country_name', ''))
+
+
+class RangeFileBackend:
+    """
+    Fichier de plages d'adresses trié, lu via mmap.
+
+    Format : en-tête `MAGIC` + nombre d'enregistrements (uint32), puis des
+    enregistrements fixes (début et fin sur 128 bits, IPv4 en ::ffff:a.b.c.d,
+    position et longueur du libellé), puis les libellés UTF-8.
+    """
+
+    MAGIC = b'TGEOIP1\x00'
+    HEADER = struct.Struct('>8sI')
+    RECORD = struct.Struct('>QQQQIH')
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f'Fichier de plages IP invalide : {path}')
+        self._labels_offset = self.HEADER.size + self.count * self.RECORD.size
+
+    @staticmethod
+    def _as_int(ip_address: str) -> int:
+        address = ipaddress.ip_address(ip_address)
+        if address.version == 4:
+            address = ipaddress.IPv6Address(f'::ffff:{address}')
+        return int(address)
+
+    def _record(self, index: int) -> Tuple[int, int, int, int]:
+        start_hi, start_lo, end_hi, end_lo, offset, length = self.RECORD.unpack_from(
+            self._map, self.HEADER.size + index * self.RECORD.size,
+        )
+        return (start_hi << 64) | start_lo, (end_hi << 64) | end_lo, offset, length
+
+    def lookup(self, ip_address: str) -> Optional[str]:
+        try:
+            value = self._as_int(ip_address)
+        except ValueError:
+            return None
+        # Dernière plage dont le début est <= value.
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[0] <= value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return None
+        start, end, offset, length = self._record(lo - 1)
+        if value > end:
+            return None
+        position = self._labels_offset + offset
+        return self._map[position:position + length].decode('utf-8') or None
+
+    @classmethod
+    def write(cls, rows: Iterable[Tuple[str, str, str]], path: str) -> int:
+        """Écrit un fichier de plages depuis des lignes (début, fin, libellé)."""
+        records, labels, label_offsets = [], bytearray(), {}
+        for start, end, label in rows:
+            start_int, end_int = cls._as_int(start), cls._as_int(end)
+            if end_int < start_int:
+                raise ValueError(f'Plage invalide : {start} - {end}')
+            encoded = label.encode('utf-8')
+            if encoded not in label_offsets:
+                label_offsets[encoded] = len(labels)
+                labels.extend(encoded)
+            records.append((start_int, end_int, label_offsets[encoded], len(encoded)))
+        records.sort()
+        for previous, current in zip(records, records[1:]):
+            if current[0] <= previous[1]:
+                raise ValueError('Plages IP qui se chevauchent.')
+        mask = (1 << 64) - 1
+        with open(path, 'wb') as handle:
+            handle.write(cls.HEADER.pack(cls.MAGIC, len(records)))
+            for start_int, end_int, offset, length in records:
+                handle.write(cls.RECORD.pack(
+                    start_int >> 64, start_int & mask, end_int >> 64, end_int & mask, offset, length,
+                ))
+            handle.write(labels)
+        return len(records)
+
+
+def _build_backend():
+    name = getattr(settings, 'GEOIP_BACKEND', 'ipapi')
+    if name == 'file':
+        return RangeFileBackend(settings.GEOIP_RANGES_FILE)
+    if name == 'none':
+        return None
+    return IpapiBackend(timeout=getattr(settings, 'GEOIP_HTTP_TIMEOUT', 3))
+
+
+class Geolocator:
+    def __init__(self):
+        self.cache = LocationCache(
+            max_size=getattr(settings, 'GEOIP_CACHE_SIZE', 10_000),
+            ttl=getattr(settings, 'GEOIP_CACHE_TTL', 86_400),
+        )
+        self._backend = None
+        self._backend_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = _build_backend() or False
+        return self._backend or None
+
+    def cached(self, ip_address: str) -> Optional[str]:
+        """Localisation connue sans appel réseau (réseau local ou cache), sinon None."""
+        if is_local(ip_address):
+            return LOCAL_LOCATION
+        return self.cache.get(cache_key(ip_address))
+
+    def locate(self, ip_address: str) -> str:
+        """Localisation via le cache puis le backend (appel bloquant : hors requête HTTP)."""
+        location = self.cached(ip_address)
+        if location is not None:
+            return location
+        backend = self.backend
+        location = backend.lookup(ip_address) if backend else None
+        if location is None:
+            location = unknown_location(ip_address)
+            self.cache.set(cache_key(ip_address), location, ttl=FAILURE_TTL)
+        else:
+            self.cache.set(cache_key(ip_address), location)
+        return location
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='session-geolocation', daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            session_id, ip_address = self._queue.get()
+            try:
+                close_old_connections()
+                resolve_session_location(session_id, self.locate(ip_address))
+            except Exception:  # noqa: BLE001 - le worker ne doit jamais s'arrêter
+                logger.exception('Géolocalisation de la session %s impossible', session_id)
+            finally:
+                self._queue.task_done()
+
+    def enqueue(self, session_id, ip_address: str) -> bool:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((session_id, ip_address))
+        except queue.Full:
+            # Reprise par `resolve_session_locations`.
+            return False
+        return True
+
+
+def resolve_session_location(session_id, location: str) -> int:
+    from .models import UserSession
+
+    return UserSession.objects.filter(pk=session_id, location=PENDING_LOCATION).update(location=location)
+
+
+geolocator = Geolocator()
+
+
+def schedule_location(session) -> None:
+    """Résout la localisation d'une session en arrière-plan, après le commit."""
+    session_id, ip_address = session.pk, session.ip_address
+    transaction.on_commit(lambda: geolocator.enqueue(session_id, ip_address))
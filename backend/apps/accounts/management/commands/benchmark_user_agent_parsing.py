@@ -0,0 +1,82 @@
+"""
+Micro-benchmark de la détection d'appareil (User-Agent), à froid et à chaud.
+
+Génère un trafic dominé par quelques centaines de User-Agent distincts
+(navigateurs et versions courants) puis mesure le débit :
+
+- à froid : `user_agents.parse` à chaque appel (comportement sans cache) ;
+- à chaud : `parse_device` une fois le cache rempli.
+
+Vérifie aussi que les résultats en cache sont identiques à l'analyse directe.
+
+Usage:
+    docker-compose exec backend python manage.py benchmark_user_agent_parsing --calls 20000 --distinct 300
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts import device_detection
+
+TEMPLATES = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{major}.0.{build}.{patch} Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/{minor}.{patch} Safari/605.1.15',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS {minor}_{patch} like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/{minor}.0 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (Linux; Android {minor}; SM-G{build}) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{major}.0.{build}.{patch} Mobile Safari/537.36',
+    'Mozilla/5.0 (iPad; CPU OS {minor}_{patch} like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/{minor}.0 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:{major}.0) Gecko/20100101 Firefox/{major}.0',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare le débit de la détection d\'appareil sans cache et avec cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=20_000, help='Appels mesurés par phase')
+        parser.add_argument('--distinct', type=int, default=300, help='User-Agent distincts')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        agents = self._agents(rng, options['distinct'])
+        # Distribution concentrée : quelques User-Agent font l'essentiel du trafic.
+        weights = [1 / (rank + 1) for rank in range(len(agents))]
+        traffic = rng.choices(agents, weights=weights, k=options['calls'])
+
+        for agent in agents:
+            expected = dict(zip(('device_type', 'browser', 'os'), device_detection._parse(agent)))
+            if device_detection.parse_device(agent) != expected:
+                raise CommandError(f'Résultat en cache différent pour : {agent}')
+        device_detection.clear_cache()
+
+        started = time.perf_counter()
+        for agent in traffic:
+            device_detection._parse(agent)
+        cold = time.perf_counter() - started
+
+        for agent in agents:
+            device_detection.parse_device(agent)
+        started = time.perf_counter()
+        for agent in traffic:
+            device_detection.parse_device(agent)
+        warm = time.perf_counter() - started
+
+        stats = device_detection.cache_stats()
+        calls = len(traffic)
+        self.stdout.write(f'{len(agents)} User-Agent distincts, {calls} appels par phase')
+        self.stdout.write(f'À froid : {calls / cold:,.0f} appels/s ({cold / calls * 1e6:.1f} µs/appel)')
+        self.stdout.write(f'À chaud : {calls / warm:,.0f} appels/s ({warm / calls * 1e6:.2f} µs/appel)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Gain x{cold / warm:.0f} - cache {stats["size"]}/{stats["max_size"]}, '
+            f'taux de succès {stats["hit_rate"]:.1%}'
+        ))
+
+    def _agents(self, rng, count):
+        agents = set()
+        while len(agents) < count:
+            agents.add(rng.choice(TEMPLATES).format(
+                major=rng.randint(100, 130), minor=rng.randint(10, 17),
+                build=rng.randint(1000, 9999), patch=rng.randint(0, 200),
+            ))
+        return sorted(agents)
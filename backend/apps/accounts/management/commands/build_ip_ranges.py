@@ -0,0 +1,40 @@
+"""
+Construit le fichier de plages IP lu par le backend de géolocalisation `file`.
+
+Entrée CSV (avec en-tête) : start_ip,end_ip,city,region,country
+(IPv4 ou IPv6, bornes incluses ; les plages ne doivent pas se chevaucher).
+
+Usage:
+    docker-compose exec backend python manage.py build_ip_ranges ranges.csv /data/ip-ranges.bin
+    # puis GEOIP_BACKEND=file GEOIP_RANGES_FILE=/data/ip-ranges.bin
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.geolocation import RangeFileBackend, format_location
+
+
+class Command(BaseCommand):
+    help = 'Construit le fichier binaire de plages IP (géolocalisation hors ligne)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='CSV start_ip,end_ip,city,region,country')
+        parser.add_argument('output', help='Fichier binaire à écrire')
+
+    def handle(self, *args, **options):
+        with open(options['csv_path'], newline='', encoding='utf-8') as handle:
+            reader = csv.DictReader(handle)
+            rows = [
+                (
+                    row['start_ip'].strip(),
+                    row['end_ip'].strip(),
+                    format_location(row.get('city', ''), row.get('region', ''), row.get('country', '')) or '',
+                )
+                for row in reader
+            ]
+        try:
+            count = RangeFileBackend.write(rows, options['output'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f'{count} plages écrites dans {options["output"]}'))
@@ -0,0 +1,166 @@
+"""
+Vérifie la file d'envoi des emails contre un serveur SMTP local de test.
+
+Dans une transaction annulée à la fin :
+
+1. met N emails de vérification en file alors que le serveur SMTP est
+   injoignable : la mise en file (chemin de l'inscription) reste rapide et les
+   messages sont replanifiés ;
+2. démarre un serveur SMTP local qui refuse temporairement (451) les premiers
+   messages : les refusés sont replanifiés avec délai, les autres envoyés ;
+3. renvoie les messages replanifiés ; tout est envoyé sur une seule connexion.
+
+Usage:
+    docker-compose exec backend python manage.py check_email_queue --emails 200
+"""
+import socketserver
+import statistics
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from apps.accounts.email_queue import EmailWorker
+from apps.accounts.models import OutboundEmail
+from apps.accounts.services import EmailService
+
+
+class _SMTPStubHandler(socketserver.StreamRequestHandler):
+    """Juste assez de SMTP pour smtplib : pas de TLS ni d'authentification."""
+
+    def reply(self, line: bytes) -> None:
+        self.wfile.write(line + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply(b'220 stub ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.strip().upper()
+            if command.startswith(b'DATA'):
+                self.reply(b'354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                with server.lock:
+                    refuse = server.refuse_next > 0
+                    if refuse:
+                        server.refuse_next -= 1
+                    else:
+                        server.messages += 1
+                self.reply(b'451 Try again later' if refuse else b'250 OK')
+            elif command.startswith(b'QUIT'):
+                self.reply(b'221 Bye')
+                return
+            else:
+                self.reply(b'250 OK')
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, refuse_next: int = 0):
+        super().__init__(('127.0.0.1', 0), _SMTPStubHandler)
+        self.lock = threading.Lock()
+        self.connections = self.messages = 0
+        self.refuse_next = refuse_next
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+def _free_port() -> int:
+    with socketserver.TCPServer(('127.0.0.1', 0), None) as server:
+        return server.server_address[1]
+
+
+class Command(BaseCommand):
+    help = 'Teste la file d\'envoi des emails (mise en file, nouvel essai, connexion réutilisée)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--emails', type=int, default=200, help='Emails mis en file')
+        parser.add_argument('--refused', type=int, default=10, help='Messages refusés (451) au premier envoi')
+
+    def handle(self, *args, **options):
+        smtp = {
+            'EMAIL_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+            'EMAIL_HOST': '127.0.0.1',
+            'EMAIL_USE_SSL': False,
+            'EMAIL_USE_TLS': False,
+            'EMAIL_HOST_USER': '',
+            'EMAIL_HOST_PASSWORD': '',
+            'EMAIL_TIMEOUT': 2,
+            'EMAIL_QUEUE_WORKER': False,
+        }
+        with transaction.atomic():
+            # Phase 1 : serveur injoignable.
+            with override_settings(EMAIL_PORT=_free_port(), **smtp):
+                ids = self._enqueue(options['emails'])
+                started = time.perf_counter()
+                EmailWorker().drain()
+                elapsed = time.perf_counter() - started
+            statuses = self._statuses(ids)
+            if statuses != {OutboundEmail.Status.PENDING: len(ids)}:
+                raise CommandError(f'Serveur injoignable : statuts {statuses}')
+            self.stdout.write(f'Serveur injoignable : {len(ids)} messages replanifiés en {elapsed * 1000:.0f} ms')
+
+            stub = SMTPStub(refuse_next=options['refused'])
+            threading.Thread(target=stub.serve_forever, daemon=True).start()
+            worker = EmailWorker()
+            try:
+                with override_settings(EMAIL_PORT=stub.port, **smtp):
+                    first = self._retry_now(ids, worker)
+                    second = self._retry_now(ids, worker)
+            finally:
+                worker.close()
+                stub.shutdown()
+                stub.server_close()
+
+            statuses = self._statuses(ids)
+            self.stdout.write(
+                f'Premier envoi : {first[0]} envoyés, {first[1]} refusés (451) ; nouvel essai : {second[0]} envoyés'
+            )
+            if statuses != {OutboundEmail.Status.SENT: len(ids)} or stub.messages != len(ids) or stub.connections != 1:
+                raise CommandError(
+                    f'Statuts {statuses}, {stub.messages} messages reçus, {stub.connections} connexion(s) SMTP'
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'{stub.messages} emails reçus sur {stub.connections} connexion SMTP'
+            ))
+            transaction.set_rollback(True)
+
+    def _enqueue(self, count):
+        User = get_user_model()
+        timings, ids = [], []
+        for index in range(count):
+            user = User(username=f'queue-{index}', email=f'queue-{index}@example.com')
+            started = time.perf_counter()
+            if not EmailService.send_verification_email(user, f'https://example.com/verify-email?token={index}'):
+                raise CommandError('Mise en file impossible.')
+            timings.append((time.perf_counter() - started) * 1000)
+            ids.append(OutboundEmail.objects.latest('pk').pk)
+        timings.sort()
+        self.stdout.write(
+            f'Mise en file : p50 {statistics.median(timings):.2f} ms, max {timings[-1]:.2f} ms par email'
+        )
+        return ids
+
+    def _retry_now(self, ids, worker):
+        # Simule l'écoulement du délai avant nouvel essai.
+        OutboundEmail.objects.filter(pk__in=ids, status=OutboundEmail.Status.PENDING).update(
+            next_attempt_at=timezone.now(),
+        )
+        return worker.drain()
+
+    def _statuses(self, ids):
+        return dict(Counter(OutboundEmail.objects.filter(pk__in=ids).values_list('status', flat=True)))
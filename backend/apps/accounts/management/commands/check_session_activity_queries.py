@@ -0,0 +1,92 @@
+"""
+Vérifie le nombre de requêtes SQL ajoutées par UserSessionMiddleware.
+
+Trois phases, dans une transaction annulée à la fin :
+
+1. première requête de chaque utilisateur : recherche (et création) de la session ;
+2. requêtes suivantes dans l'intervalle : aucune requête SQL ;
+3. après l'intervalle : une relecture par session, et les `last_activity` en
+   attente écrits en un seul `bulk_update`.
+
+Usage:
+    docker-compose exec backend python manage.py check_session_activity_queries --users 50 --requests 20
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from apps.accounts.models import UserSession
+from apps.accounts.session_activity import activity_tracker
+from apps.accounts.session_middleware import UserSessionMiddleware
+
+GRANULARITY = 1
+
+
+class Command(BaseCommand):
+    help = "Compte les requêtes SQL par requête HTTP dues au suivi d'activité des sessions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Utilisateurs simulés')
+        parser.add_argument('--requests', type=int, default=20, help='Requêtes par utilisateur')
+
+    def handle(self, *args, **options):
+        activity_tracker.flush()
+        activity_tracker.forget()
+        try:
+            with override_settings(SESSION_ACTIVITY_GRANULARITY=GRANULARITY), transaction.atomic():
+                self._run(options['users'], options['requests'])
+                transaction.set_rollback(True)
+        finally:
+            activity_tracker.forget()
+
+    def _run(self, user_count, request_count):
+        User = get_user_model()
+        users = [
+            User.objects.create(username=f'activity-{index}-{time.monotonic_ns()}', email=f'activity-{index}@example.com')
+            for index in range(user_count)
+        ]
+        middleware = UserSessionMiddleware(lambda request: HttpResponse())
+        factory = RequestFactory()
+
+        def send(user):
+            request = factory.get('/api/v1/', HTTP_USER_AGENT='Mozilla/5.0', REMOTE_ADDR='127.0.0.1')
+            request.user = user
+            with CaptureQueriesContext(connection) as queries:
+                middleware(request)
+            return [query['sql'] for query in queries.captured_queries]
+
+        # L'intervalle en cours ne doit pas se terminer au milieu des phases 1 et 2.
+        activity_tracker.flush()
+        first = [len(send(user)) for user in users]
+        self.stdout.write(f'Première requête : {max(first)} requête(s) SQL au plus (session créée)')
+
+        hot = [len(send(user)) for user in users for _ in range(request_count - 1)]
+        if any(hot):
+            raise CommandError(f'Requêtes SQL sur le chemin courant : {max(hot)} par requête au plus')
+        self.stdout.write(f'{len(hot)} requêtes suivantes : 0 requête SQL')
+
+        before = dict(UserSession.objects.filter(user__in=users).values_list('pk', 'last_activity'))
+        time.sleep(GRANULARITY + 0.1)
+        statements = [sql for user in users for sql in send(user)]
+        statements += self._flush()
+        updates = [sql for sql in statements if sql.lstrip().upper().startswith('UPDATE')]
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+        after = dict(UserSession.objects.filter(user__in=users).values_list('pk', 'last_activity'))
+        stale = [pk for pk, seen in after.items() if seen <= before[pk]]
+        if stale or len(selects) != user_count or len(updates) > 2:
+            raise CommandError(
+                f'Après intervalle : {len(selects)} SELECT, {len(updates)} UPDATE, {len(stale)} session(s) non mise(s) à jour'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Après intervalle : {len(selects)} relectures, {len(after)} sessions écrites en {len(updates)} UPDATE'
+        ))
+
+    def _flush(self):
+        with CaptureQueriesContext(connection) as queries:
+            activity_tracker.flush()
+        return [query['sql'] for query in queries.captured_queries]
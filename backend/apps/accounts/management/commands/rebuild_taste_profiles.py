@@ -0,0 +1,34 @@
+"""
+Reconstruit les profils de goûts (UserProfile.taste_profile) depuis l'historique
+des favoris, avis et likes.
+
+Usage:
+    docker-compose exec backend python manage.py rebuild_taste_profiles
+    docker-compose exec backend python manage.py rebuild_taste_profiles --user 42 --user 43
+"""
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import UserProfile
+from apps.accounts.services import TasteProfileService
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit en masse les profils de goûts des utilisateurs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='users', help='Limiter à cet utilisateur (id, répétable)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Utilisateurs traités par lot')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        profiles = UserProfile.objects.order_by('pk')
+        if options['users']:
+            profiles = profiles.filter(user_id__in=options['users'])
+
+        user_ids = list(profiles.values_list('user_id', flat=True))
+        total = 0
+        for start in range(0, len(user_ids), batch_size):
+            total += TasteProfileService.rebuild(user_ids[start:start + batch_size])
+            self.stdout.write(f'   {total}/{len(user_ids)} profils reconstruits')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} profils de goûts reconstruits'))
@@ -0,0 +1,31 @@
+"""
+Résout la localisation des sessions restées en attente (`location='pending'`).
+
+Le thread de géolocalisation traite normalement les sessions juste après leur
+création ; cette commande reprend celles perdues (redémarrage, file pleine).
+
+Usage:
+    docker-compose exec backend python manage.py resolve_session_locations
+"""
+from django.core.management.base import BaseCommand
+
+from apps.accounts.geolocation import PENDING_LOCATION, geolocator, resolve_session_location
+from apps.accounts.models import UserSession
+
+
+class Command(BaseCommand):
+    help = 'Géolocalise les sessions utilisateur en attente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help='Nombre maximal de sessions traitées')
+
+    def handle(self, *args, **options):
+        pending = (
+            UserSession.objects.filter(location=PENDING_LOCATION)
+            .order_by('created_at')
+            .values_list('pk', 'ip_address')[:options['limit']]
+        )
+        resolved = 0
+        for session_id, ip_address in pending:
+            resolved += resolve_session_location(session_id, geolocator.locate(ip_address))
+        self.stdout.write(self.style.SUCCESS(f'{resolved} session(s) géolocalisée(s)'))
@@ -0,0 +1,36 @@
+"""
+Envoie les emails en file (`OutboundEmail`) depuis un processus dédié.
+
+À utiliser avec `EMAIL_QUEUE_WORKER=False` pour sortir l'envoi SMTP des
+processus web ; reprend aussi les messages en attente après un redémarrage.
+
+Usage:
+    docker-compose exec backend python manage.py send_queued_emails
+    docker-compose exec backend python manage.py send_queued_emails --once
+"""
+from django.core.management.base import BaseCommand
+
+from apps.accounts.email_queue import email_worker
+
+
+class Command(BaseCommand):
+    help = 'Envoie les emails en file, sur une connexion SMTP réutilisée'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Vide la file puis s\'arrête')
+
+    def handle(self, *args, **options):
+        if not options['once']:
+            self.stdout.write('Worker d\'envoi des emails démarré (Ctrl+C pour arrêter).')
+            try:
+                email_worker.run_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                email_worker.close()
+            return
+        try:
+            sent, failed = email_worker.drain()
+        finally:
+            email_worker.close()
+        self.stdout.write(self.style.SUCCESS(f'{sent} email(s) envoyé(s), {failed} replanifié(s) ou en échec.'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_add_achievement_system'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='taste_profile',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_outbound_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adminauditlog',
+            index=models.Index(fields=['-created_at', '-id'], name='audit_log_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-scheduled_for', '-created_at'], name='notification_user_sched_idx'),
+        ),
+    ]
@@ -410,6 +410,8 @@ class UserProfile(models.Model):
 
     preferences = models.JSONField(default=dict, blank=True)
     behavior_profile = models.JSONField(default=dict, blank=True)
+    # Profil de goûts agrégé, maintenu par TasteProfileService (voir services/taste_profile.py)
+    taste_profile = models.JSONField(default=dict, blank=True)
     segments = models.JSONField(default=list, blank=True)
     metadata = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
@@ -626,6 +628,9 @@ class AdminAuditLog(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='audit_log_created_idx'),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.admin} → {self.action}"
@@ -699,6 +704,9 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-scheduled_for', '-created_at']
+        indexes = [
+            models.Index(fields=['user', '-scheduled_for', '-created_at'], name='notification_user_sched_idx'),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.user} - {self.title}"
@@ -772,3 +780,42 @@ class UserSession(models.Model):
         """Révoque la session."""
         self.is_active = False
         self.save(update_fields=['is_active', 'updated_at'])
+
+
+class OutboundEmail(models.Model):
+    """
+    File d'envoi des emails (voir `apps.accounts.email_queue`).
+    Les vues n'enregistrent que la ligne ; l'envoi SMTP se fait hors requête.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'En attente'
+        SENDING = 'sending', 'En cours d\'envoi'
+        SENT = 'sent', 'Envoyé'
+        FAILED = 'failed', 'Échec définitif'
+
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    text_body = models.TextField()
+    html_body = models.TextField(blank=True)
+    template = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Prochain essai ; pour une ligne « sending », fin du délai de prise en charge.
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                name='outbound_email_due_idx',
+                condition=models.Q(status__in=['pending', 'sending']),
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.to_email} - {self.subject} ({self.status})"
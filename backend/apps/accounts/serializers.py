@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from django.db.models import Count, Q
 from rest_framework import serializers
 
+from apps.core.sparse_fields import SparseFieldsetsMixin
+from .device_detection import parse_device
 from .models import (
     Achievement,
     AdminAuditLog,
@@ -72,12 +75,32 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
     def get_followers_count(self, obj):
         """Retourne le nombre d'abonnés."""
+        if hasattr(obj, 'followers_total'):
+            return obj.followers_total
         return obj.get_followers_count()
 
     def get_following_count(self, obj):
         """Retourne le nombre d'abonnements."""
+        if hasattr(obj, 'following_total'):
+            return obj.following_total
         return obj.get_following_count()
 
+    @staticmethod
+    def with_follow_counts(queryset):
+        """Annote les compteurs d'abonnés/abonnements (évite deux COUNT par profil sérialisé)."""
+        return queryset.annotate(
+            followers_total=Count(
+                'user__follower_relationships',
+                filter=Q(user__follower_relationships__is_active=True),
+                distinct=True,
+            ),
+            following_total=Count(
+                'user__following_relationships',
+                filter=Q(user__following_relationships__is_active=True),
+                distinct=True,
+            ),
+        )
+
 
 class UserRoleAssignmentSerializer(serializers.ModelSerializer):
     user_id = serializers.UUIDField(source='user.public_id', read_only=True)
@@ -224,7 +247,7 @@ class RegisterSerializer(serializers.Serializer):
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     profile = UserProfileSerializer(read_only=True)
     roles = serializers.SlugRelatedField(
         many=True,
@@ -258,6 +281,7 @@ class UserSerializer(serializers.ModelSerializer):
             'profile',
             'role_assignments_detail',
         )
+        expandable_fields = ('profile', 'role_assignments_detail')
 
 
 class UserPreferencesSerializer(serializers.Serializer):
@@ -290,6 +314,7 @@ class AdminAuditLogSerializer(serializers.ModelSerializer):
 
 class AdminSessionSerializer(serializers.ModelSerializer):
     admin_detail = UserSerializer(source='admin', read_only=True)
+    device = serializers.SerializerMethodField()
 
     class Meta:
         model = AdminSession
@@ -300,6 +325,7 @@ class AdminSessionSerializer(serializers.ModelSerializer):
             'session_token',
             'ip_address',
             'user_agent',
+            'device',
             'expires_at',
             'last_activity',
             'is_active',
@@ -315,6 +341,9 @@ class AdminSessionSerializer(serializers.ModelSerializer):
                 'created_at',
         )
 
+    def get_device(self, obj):
+        return parse_device(obj.user_agent)
+
 
 class AdminPermissionSerializer(serializers.ModelSerializer):
     admin_detail = UserSerializer(source='admin', read_only=True)
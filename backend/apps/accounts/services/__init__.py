@@ -1,3 +1,5 @@
+from .email_renderer import EmailRenderer, RenderedEmail, email_renderer
 from .email_service import EmailService
+from .taste_profile import TasteProfileService
 
-__all__ = ['EmailService']
+__all__ = ['EmailRenderer', 'EmailService', 'RenderedEmail', 'TasteProfileService', 'email_renderer']
@@ -0,0 +1,73 @@
+"""
+Rendu des emails : templates compilés une seule fois, variante texte dédiée.
+
+Pour un template `emails/<nom>.html`, la partie texte vient de
+`emails/<nom>.txt` quand il existe (sinon, repli sur `strip_tags` du HTML).
+`render_many` rend N emails avec un seul contexte de base, poussé/retiré pour
+chaque destinataire, pour les envois groupés (notifications, rappels).
+"""
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.template import Context, TemplateDoesNotExist, engines
+from django.utils.html import strip_tags
+
+
+class RenderedEmail(NamedTuple):
+    text: str
+    html: str
+
+
+def text_template_name(html_template: str) -> str:
+    base, _, extension = html_template.rpartition('.')
+    return f'{base}.txt' if extension == 'html' else f'{html_template}.txt'
+
+
+class EmailRenderer:
+    def __init__(self, engine_alias: str = 'django'):
+        self.engine_alias = engine_alias
+        self._templates: Dict[str, Optional[object]] = {}
+        self._lock = threading.Lock()
+
+    def _compiled(self, name: str, required: bool = True):
+        if name not in self._templates:
+            engine = engines[self.engine_alias].engine
+            try:
+                template = engine.get_template(name)
+            except TemplateDoesNotExist:
+                if required:
+                    raise
+                template = None
+            with self._lock:
+                self._templates[name] = template
+        return self._templates[name]
+
+    def templates(self, html_template: str) -> Tuple[object, Optional[object]]:
+        """Templates HTML et texte compilés (le texte peut manquer)."""
+        return self._compiled(html_template), self._compiled(text_template_name(html_template), required=False)
+
+    def render(self, html_template: str, context: dict) -> RenderedEmail:
+        return self.render_many(html_template, [context])[0]
+
+    def render_many(
+        self, html_template: str, contexts: Iterable[dict], shared: Optional[dict] = None,
+    ) -> List[RenderedEmail]:
+        """Rend un email par contexte ; `shared` est commun à tous les destinataires."""
+        html, text = self.templates(html_template)
+        context = Context(shared or {})
+        rendered = []
+        for item in contexts:
+            with context.push(item):
+                html_body = html.render(context)
+                text_body = text.render(context).strip() + '\n' if text is not None else strip_tags(html_body)
+            rendered.append(RenderedEmail(text=text_body, html=html_body))
+        return rendered
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+
+email_renderer = EmailRenderer()
@@ -1,16 +1,77 @@
 """
 Service de gestion des emails pour l'authentification.
 Gère l'envoi des emails de vérification, bienvenue et réinitialisation de mot de passe.
+
+Les emails sont rendus (`EmailRenderer` : templates compilés une fois, partie
+texte depuis le template `.txt`) puis mis en file (`apps.accounts.email_queue`) :
+l'envoi SMTP a lieu hors de la requête.
 """
+import logging
+
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+
+from ..email_queue import enqueue_email, enqueue_emails
+from .email_renderer import email_renderer
+
+logger = logging.getLogger(__name__)
 
 
 class EmailService:
     """Service centralisé pour l'envoi d'emails."""
 
+    @staticmethod
+    def _queue(user, subject: str, template: str, context: dict) -> bool:
+        try:
+            rendered = email_renderer.render(template, {
+                'user': user,
+                'frontend_url': settings.FRONTEND_URL,
+                **context,
+            })
+            enqueue_email(
+                to_email=user.email,
+                subject=subject,
+                text_body=rendered.text,
+                html_body=rendered.html,
+                template=template,
+            )
+            return True
+        except Exception:
+            logger.exception("Mise en file de l'email %s pour %s impossible", template, user.email)
+            return False
+
+    @staticmethod
+    def send_bulk(users, subject: str, template: str, context=None, per_user_context=None) -> int:
+        """
+        Rend et met en file un même email pour plusieurs utilisateurs.
+
+        Args:
+            users: Les destinataires (utilisateurs avec une adresse email)
+            subject: Sujet commun
+            template: Template HTML (`emails/<nom>.html`, partie texte `emails/<nom>.txt`)
+            context: Contexte commun à tous les destinataires
+            per_user_context: Fonction optionnelle `user -> dict` de contexte propre à chacun
+
+        Returns:
+            int: Nombre d'emails mis en file
+        """
+        users = [user for user in users if user.email]
+        rendered = email_renderer.render_many(
+            template,
+            ({'user': user, **(per_user_context(user) if per_user_context else {})} for user in users),
+            shared={'frontend_url': settings.FRONTEND_URL, **(context or {})},
+        )
+        emails = enqueue_emails(
+            {
+                'to_email': user.email,
+                'subject': subject,
+                'text_body': email.text,
+                'html_body': email.html,
+                'template': template,
+            }
+            for user, email in zip(users, rendered)
+        )
+        return len(emails)
+
     @staticmethod
     def send_verification_email(user, verification_url: str) -> bool:
         """
@@ -21,28 +82,14 @@ class EmailService:
             verification_url: URL complète de vérification avec token
 
         Returns:
-            bool: True si l'email a été envoyé avec succès
+            bool: True si l'email a été mis en file d'envoi
         """
-        try:
-            html_message = render_to_string('emails/verify_email.html', {
-                'user': user,
-                'verification_url': verification_url,
-                'frontend_url': settings.FRONTEND_URL,
-            })
-            plain_message = strip_tags(html_message)
-
-            send_mail(
-                subject='Vérifiez votre adresse email - Tasarini',
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de l'email de vérification: {e}")
-            return False
+        return EmailService._queue(
+            user,
+            'Vérifiez votre adresse email - Tasarini',
+            'emails/verify_email.html',
+            {'verification_url': verification_url},
+        )
 
     @staticmethod
     def send_welcome_email(user) -> bool:
@@ -53,27 +100,9 @@ class EmailService:
             user: L'utilisateur qui vient de vérifier son email
 
         Returns:
-            bool: True si l'email a été envoyé avec succès
+            bool: True si l'email a été mis en file d'envoi
         """
-        try:
-            html_message = render_to_string('emails/welcome.html', {
-                'user': user,
-                'frontend_url': settings.FRONTEND_URL,
-            })
-            plain_message = strip_tags(html_message)
-
-            send_mail(
-                subject='Bienvenue sur Tasarini!',
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de l'email de bienvenue: {e}")
-            return False
+        return EmailService._queue(user, 'Bienvenue sur Tasarini!', 'emails/welcome.html', {})
 
     @staticmethod
     def send_password_reset_email(user, reset_url: str) -> bool:
@@ -85,28 +114,14 @@ class EmailService:
             reset_url: URL complète de réinitialisation avec token
 
         Returns:
-            bool: True si l'email a été envoyé avec succès
+            bool: True si l'email a été mis en file d'envoi
         """
-        try:
-            html_message = render_to_string('emails/password_reset.html', {
-                'user': user,
-                'reset_url': reset_url,
-                'frontend_url': settings.FRONTEND_URL,
-            })
-            plain_message = strip_tags(html_message)
-
-            send_mail(
-                subject='Réinitialisation de votre mot de passe - Tasarini',
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de l'email de réinitialisation: {e}")
-            return False
+        return EmailService._queue(
+            user,
+            'Réinitialisation de votre mot de passe - Tasarini',
+            'emails/password_reset.html',
+            {'reset_url': reset_url},
+        )
 
     @staticmethod
     def resend_verification_email(user) -> bool:
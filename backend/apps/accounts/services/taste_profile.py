@@ -0,0 +1,257 @@
+"""
+Profil de goûts matérialisé (UserProfile.taste_profile).
+
+Le profil agrège, avec des poids, les signaux d'intérêt d'un utilisateur :
+tags des POI favoris/notés, zones géographiques (préfixe geohash), tags et
+lieux des récits aimés, histogrammes budget/difficulté. Il est mis à jour de
+façon incrémentale par les signaux (favori, like, avis) et peut être
+reconstruit en masse avec `manage.py rebuild_taste_profiles`.
+
+Un retrait soustrait les caractéristiques *actuelles* du POI : quand ses tags
+changent, les tags ajoutés ou retirés sont donc reportés, avec le poids de
+chaque favori / avis, dans les profils des utilisateurs concernés
+(`tags_changed`) pour ne pas dériver, sans reconstruire leur historique.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+
+REBUILD_BATCH_SIZE = 500
+FAVORITE_WEIGHT = 3
+LIKE_WEIGHT = 1
+AREA_PRECISION = 4
+
+SECTIONS = ('tags', 'areas', 'story_tags', 'locations', 'price', 'difficulty')
+
+
+def _review_weight(rating) -> int:
+    """Un avis 5★ pèse 3, 4★ pèse 2, 3★ pèse 1, en dessous rien."""
+    return max(int(rating or 0) - 2, 0)
+
+
+class TasteProfileService:
+    """Calcul et mise à jour du profil de goûts d'un utilisateur."""
+
+    @staticmethod
+    def empty() -> dict:
+        profile = {section: {} for section in SECTIONS}
+        profile['counts'] = {'favorites': 0, 'likes': 0, 'reviews': 0}
+        return profile
+
+    @staticmethod
+    def poi_features(poi_ids: Iterable) -> Dict:
+        """Caractéristiques de plusieurs POI en deux requêtes : {poi_id: features}."""
+        from apps.poi.models import TouristPoint
+
+        poi_ids = list(poi_ids)
+        features = {}
+        if not poi_ids:
+            return features
+        rows = TouristPoint.objects.filter(pk__in=poi_ids).values_list(
+            'pk', 'geohash', 'budget_level__code', 'difficulty_level__code', 'price_range',
+        )
+        for pk, geohash, budget_code, difficulty_code, price_range in rows:
+            features[pk] = {
+                'tags': [],
+                'areas': [geohash[:AREA_PRECISION]] if geohash else [],
+                'price': [budget_code or price_range] if (budget_code or price_range) else [],
+                'difficulty': [difficulty_code] if difficulty_code else [],
+            }
+        tag_rows = TouristPoint.tags.through.objects.filter(touristpoint_id__in=poi_ids).values_list(
+            'touristpoint_id', 'tag_id',
+        )
+        for poi_id, tag_id in tag_rows:
+            if poi_id in features:
+                features[poi_id]['tags'].append(str(tag_id))
+        return features
+
+    @staticmethod
+    def story_features(story_ids: Iterable) -> Dict:
+        from apps.content.models import Story
+
+        features = {}
+        for pk, tags, location in Story.objects.filter(pk__in=list(story_ids)).values_list(
+            'pk', 'tags', 'location_name',
+        ):
+            features[pk] = {
+                'story_tags': sorted({str(tag).lower() for tag in (tags or []) if tag}),
+                'locations': [location.lower()] if location else [],
+            }
+        return features
+
+    @staticmethod
+    def merge(profile: dict, features: Optional[dict], weight: int) -> dict:
+        """Ajoute (ou retire si `weight` < 0) les caractéristiques au profil."""
+        if not features or not weight:
+            return profile
+        for section, keys in features.items():
+            bucket = profile.setdefault(section, {})
+            for key in keys:
+                value = bucket.get(key, 0) + weight
+                if value > 0:
+                    bucket[key] = value
+                else:
+                    bucket.pop(key, None)
+        return profile
+
+    @classmethod
+    def apply(cls, user_id, features: Optional[dict], weight: int, counter: str, count_delta: int) -> None:
+        """Met à jour le profil d'un utilisateur sous verrou de ligne."""
+        from apps.accounts.models import UserProfile
+
+        if not features and not count_delta:
+            return
+        with transaction.atomic():
+            profile = (
+                UserProfile.objects.select_for_update()
+                .filter(user_id=user_id)
+                .only('id', 'taste_profile')
+                .first()
+            )
+            if profile is None:
+                return
+            data = profile.taste_profile or cls.empty()
+            cls.merge(data, features, weight)
+            counts = data.setdefault('counts', {})
+            counts[counter] = max(counts.get(counter, 0) + count_delta, 0)
+            profile.taste_profile = data
+            profile.save(update_fields=['taste_profile'])
+
+    # --- Points d'entrée utilisés par les signaux -------------------------
+
+    @classmethod
+    def favorite_added(cls, user_id, poi_id) -> None:
+        cls.apply(user_id, cls.poi_features([poi_id]).get(poi_id), FAVORITE_WEIGHT, 'favorites', 1)
+
+    @classmethod
+    def favorite_removed(cls, user_id, poi_id) -> None:
+        cls.apply(user_id, cls.poi_features([poi_id]).get(poi_id), -FAVORITE_WEIGHT, 'favorites', -1)
+
+    @classmethod
+    def review_changed(cls, user_id, poi_id, old_rating, new_rating) -> None:
+        """`old_rating` à None pour une création, `new_rating` à None pour une suppression."""
+        delta = _review_weight(new_rating) - _review_weight(old_rating)
+        count_delta = (new_rating is not None) - (old_rating is not None)
+        features = cls.poi_features([poi_id]).get(poi_id) if delta else None
+        cls.apply(user_id, features, delta, 'reviews', count_delta)
+
+    @classmethod
+    def like_added(cls, user_id, story_id) -> None:
+        cls.apply(user_id, cls.story_features([story_id]).get(story_id), LIKE_WEIGHT, 'likes', 1)
+
+    @classmethod
+    def like_removed(cls, user_id, story_id) -> None:
+        cls.apply(user_id, cls.story_features([story_id]).get(story_id), -LIKE_WEIGHT, 'likes', -1)
+
+    # --- Reconstruction complète -----------------------------------------
+
+    @classmethod
+    def build_profiles(cls, user_ids: Iterable) -> Dict:
+        """Recalcule depuis l'historique les profils d'un lot d'utilisateurs."""
+        from apps.content.models import StoryLike
+        from apps.poi.models import FavoriteTouristPoint, TouristPointReview
+
+        user_ids = list(user_ids)
+        profiles = {user_id: cls.empty() for user_id in user_ids}
+
+        favorites = list(
+            FavoriteTouristPoint.objects.filter(user_id__in=user_ids).values_list('user_id', 'tourist_point_id')
+        )
+        reviews = list(
+            TouristPointReview.objects.filter(reviewer_id__in=user_ids).values_list(
+                'reviewer_id', 'tourist_point_id', 'rating',
+            )
+        )
+        likes = list(StoryLike.objects.filter(user_id__in=user_ids).values_list('user_id', 'story_id'))
+
+        poi_features = cls.poi_features({poi_id for _, poi_id in favorites} | {poi_id for _, poi_id, _ in reviews})
+        story_features = cls.story_features({story_id for _, story_id in likes})
+
+        counts = defaultdict(lambda: defaultdict(int))
+        for user_id, poi_id in favorites:
+            cls.merge(profiles[user_id], poi_features.get(poi_id), FAVORITE_WEIGHT)
+            counts[user_id]['favorites'] += 1
+        for user_id, poi_id, rating in reviews:
+            cls.merge(profiles[user_id], poi_features.get(poi_id), _review_weight(rating))
+            counts[user_id]['reviews'] += 1
+        for user_id, story_id in likes:
+            cls.merge(profiles[user_id], story_features.get(story_id), LIKE_WEIGHT)
+            counts[user_id]['likes'] += 1
+        for user_id, user_counts in counts.items():
+            profiles[user_id]['counts'].update(user_counts)
+        return profiles
+
+    @classmethod
+    def rebuild(cls, user_ids: Iterable) -> int:
+        """Reconstruit et écrit les profils d'un lot d'utilisateurs ; renvoie le nombre écrit."""
+        from apps.accounts.models import UserProfile
+
+        user_ids = list(user_ids)
+        with transaction.atomic():
+            # Verrouiller avant de lire l'historique : aucun signal ne peut
+            # modifier ces profils entre le calcul et l'écriture.
+            rows = list(
+                UserProfile.objects.select_for_update()
+                .filter(user_id__in=user_ids)
+                .order_by('user_id')
+                .only('id', 'user_id', 'taste_profile')
+            )
+            built = cls.build_profiles(user_ids)
+            for profile in rows:
+                profile.taste_profile = built[profile.user_id]
+            UserProfile.objects.bulk_update(rows, ['taste_profile'])
+        return len(rows)
+
+    @classmethod
+    def tags_changed(cls, pairs: Iterable, sign: int) -> int:
+        """
+        Reporte l'ajout (`sign` = 1) ou le retrait (-1) de couples (POI, tag) dans
+        les profils qui comptent ces POI (favori ou avis) ; renvoie le nombre de
+        profils modifiés.
+        """
+        from apps.accounts.models import UserProfile
+        from apps.poi.models import FavoriteTouristPoint, TouristPointReview
+
+        tags = defaultdict(list)
+        for poi_id, tag_id in pairs:
+            tags[poi_id].append(str(tag_id))
+        if not tags:
+            return 0
+        weights = defaultdict(lambda: defaultdict(int))
+        for user_id, poi_id in FavoriteTouristPoint.objects.filter(tourist_point_id__in=tags).values_list(
+            'user_id', 'tourist_point_id',
+        ):
+            weights[user_id][poi_id] += FAVORITE_WEIGHT
+        for user_id, poi_id, rating in TouristPointReview.objects.filter(tourist_point_id__in=tags).values_list(
+            'reviewer_id', 'tourist_point_id', 'rating',
+        ):
+            weights[user_id][poi_id] += _review_weight(rating)
+
+        user_ids = sorted(user_id for user_id, by_poi in weights.items() if any(by_poi.values()))
+        updated = 0
+        for start in range(0, len(user_ids), REBUILD_BATCH_SIZE):
+            with transaction.atomic():
+                rows = list(
+                    UserProfile.objects.select_for_update()
+                    .filter(user_id__in=user_ids[start:start + REBUILD_BATCH_SIZE])
+                    .order_by('user_id')
+                    .only('id', 'user_id', 'taste_profile')
+                )
+                for profile in rows:
+                    data = profile.taste_profile or cls.empty()
+                    for poi_id, weight in weights[profile.user_id].items():
+                        cls.merge(data, {'tags': tags[poi_id]}, sign * weight)
+                    profile.taste_profile = data
+                UserProfile.objects.bulk_update(rows, ['taste_profile'])
+            updated += len(rows)
+        return updated
+
+    @staticmethod
+    def top(profile: Optional[dict], section: str, limit: Optional[int] = None):
+        """Clés d'une section triées par poids décroissant."""
+        bucket = (profile or {}).get(section) or {}
+        keys = sorted(bucket, key=lambda key: (-bucket[key], key))
+        return keys[:limit] if limit is not None else keys
@@ -0,0 +1,116 @@
+"""
+Suivi de l'activité des sessions utilisateur avec écritures regroupées.
+
+`UserSessionMiddleware` appelait `update_session_activity` à chaque requête
+authentifiée (SELECT + UPDATE de `last_activity`). Le tracker garde en mémoire
+du processus, par (utilisateur, IP), la session courante et la date de sa
+dernière vérification :
+
+- requête courante : aucune requête SQL, le dernier accès est seulement noté ;
+- au plus une fois par `SESSION_ACTIVITY_GRANULARITY` secondes et par session,
+  la session est relue (révocation, expiration) et son horodatage mis en file ;
+- la file est écrite en un seul `bulk_update` par intervalle (et à l'arrêt du
+  processus) ; les sessions non revalidées depuis plus d'une granularité sont
+  alors oubliées, la mémoire reste bornée par les utilisateurs actifs.
+
+`last_activity` a donc une précision de l'ordre de la granularité.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .session_utils import create_user_session, get_client_ip
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 500
+
+
+class SessionActivityTracker:
+    def __init__(self, granularity: Optional[int] = None):
+        self._granularity = granularity
+        # (user_id, ip) -> (session_id, vérifiée à (monotonic))
+        self._sessions: Dict[Tuple, Tuple] = {}
+        # session_id -> dernier accès pas encore écrit
+        self._pending: Dict = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def granularity(self) -> int:
+        if self._granularity is None:
+            return getattr(settings, 'SESSION_ACTIVITY_GRANULARITY', 60)
+        return self._granularity
+
+    def touch(self, user, request) -> None:
+        """Note l'activité ; SQL seulement si la session est inconnue ou à revalider."""
+        key = (user.pk, get_client_ip(request))
+        now = time.monotonic()
+        with self._lock:
+            known = self._sessions.get(key)
+        if known is None or now - known[1] >= self.granularity:
+            session_id, created = self._load_session(user, request)
+            with self._lock:
+                self._sessions[key] = (session_id, now)
+                if not created:
+                    self._pending[session_id] = timezone.now()
+        if now - self._last_flush >= self.granularity:
+            self.flush()
+
+    def _load_session(self, user, request):
+        from .models import UserSession
+
+        session_id = (
+            UserSession.objects.filter(
+                user=user,
+                ip_address=get_client_ip(request),
+                is_active=True,
+                expires_at__gt=timezone.now(),
+            )
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if session_id is None:
+            # Nouvelle session : `last_activity` est déjà à jour à la création.
+            return create_user_session(user, request).pk, True
+        return session_id, False
+
+    def flush(self) -> int:
+        """Écrit les derniers accès en attente (un `bulk_update` par lot)."""
+        from .models import UserSession
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = now = time.monotonic()
+            # À revalider de toute façon au prochain accès : inutile de les garder.
+            for key in [key for key, (_, checked) in self._sessions.items() if now - checked >= self.granularity]:
+                del self._sessions[key]
+        if not pending:
+            return 0
+        sessions = [UserSession(pk=session_id, last_activity=seen) for session_id, seen in pending.items()]
+        try:
+            UserSession.objects.bulk_update(sessions, ['last_activity'], batch_size=FLUSH_BATCH_SIZE)
+        except Exception:  # noqa: BLE001 - l'activité est indicative, ne pas casser la requête
+            logger.exception("Écriture de l'activité de %s session(s) impossible", len(sessions))
+            return 0
+        return len(sessions)
+
+    def forget(self, user_id=None) -> None:
+        """Oublie les sessions en mémoire (toutes, ou celles d'un utilisateur)."""
+        with self._lock:
+            if user_id is None:
+                self._sessions.clear()
+            else:
+                for key in [key for key in self._sessions if key[0] == user_id]:
+                    del self._sessions[key]
+
+
+activity_tracker = SessionActivityTracker()
+atexit.register(activity_tracker.flush)
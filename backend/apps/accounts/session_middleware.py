@@ -2,13 +2,16 @@
 Middleware pour la gestion automatique des sessions utilisateur.
 """
 from django.utils.deprecation import MiddlewareMixin
-from .session_utils import update_session_activity
+from .session_activity import activity_tracker
 
 
 class UserSessionMiddleware(MiddlewareMixin):
     """
     Middleware qui crée ou met à jour automatiquement une UserSession
     lorsqu'un utilisateur authentifié fait une requête.
+
+    Les mises à jour de `last_activity` sont regroupées par `activity_tracker` :
+    aucune requête SQL dans le cas courant.
     """
 
     def process_request(self, request):
@@ -19,7 +22,7 @@ class UserSessionMiddleware(MiddlewareMixin):
         if hasattr(request, 'user') and request.user.is_authenticated:
             # Créer ou mettre à jour la session
             try:
-                update_session_activity(request.user, request)
+                activity_tracker.touch(request.user, request)
             except Exception as e:
                 # En cas d'erreur, logger mais ne pas bloquer la requête
                 import logging
@@ -1,10 +1,11 @@
 """
 Utilitaires pour la gestion des sessions utilisateur.
 """
-import requests
 from datetime import timedelta
 from django.utils import timezone
-from user_agents import parse
+
+from .device_detection import parse_device
+from .geolocation import PENDING_LOCATION, geolocator, schedule_location
 
 
 def get_client_ip(request):
@@ -18,66 +19,17 @@ def get_client_ip(request):
 
 
 def get_device_info(user_agent_string):
-    """Parse le User-Agent pour extraire les informations de l'appareil."""
-    user_agent = parse(user_agent_string)
-
-    # Déterminer le type d'appareil
-    if user_agent.is_mobile:
-        device_type = 'mobile'
-    elif user_agent.is_tablet:
-        device_type = 'tablet'
-    else:
-        device_type = 'desktop'
-
-    # Navigateur et version
-    browser = f"{user_agent.browser.family} {user_agent.browser.version_string}"
-
-    # Système d'exploitation
-    os = f"{user_agent.os.family} {user_agent.os.version_string}"
-
-    return {
-        'device_type': device_type,
-        'browser': browser,
-        'os': os,
-        'user_agent': user_agent_string
-    }
+    """Parse le User-Agent pour extraire les informations de l'appareil (résultat mis en cache)."""
+    return {**parse_device(user_agent_string), 'user_agent': user_agent_string}
 
 
 def get_location_from_ip(ip_address):
     """
     Récupère la localisation géographique à partir d'une adresse IP.
-    Utilise l'API gratuite ipapi.co (limite: 1000 requêtes/jour).
+    Appel bloquant (cache puis backend configuré) : à éviter dans une requête,
+    voir `create_user_session` qui délègue au thread de géolocalisation.
     """
-    # IPs locales
-    if ip_address in ['127.0.0.1', '::1', 'localhost'] or ip_address.startswith('192.168.') or ip_address.startswith('10.'):
-        return 'Local Network'
-
-    try:
-        response = requests.get(
-            f'https://ipapi.co/{ip_address}/json/',
-            timeout=3  # 3 secondes de timeout
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-
-            # Construire la localisation
-            city = data.get('city', '')
-            region = data.get('region', '')
-            country = data.get('country_name', '')
-
-            location_parts = [part for part in [city, region, country] if part]
-
-            if location_parts:
-                return ', '.join(location_parts)
-            else:
-                return f'Unknown ({ip_address})'
-        else:
-            return f'Unknown ({ip_address})'
-
-    except requests.RequestException:
-        # En cas d'erreur réseau, retourner IP seulement
-        return f'Unknown ({ip_address})'
+    return geolocator.locate(ip_address)
 
 
 def create_user_session(user, request, expires_in_days=30):
@@ -98,7 +50,8 @@ def create_user_session(user, request, expires_in_days=30):
     ip_address = get_client_ip(request)
     user_agent_string = request.META.get('HTTP_USER_AGENT', '')
     device_info = get_device_info(user_agent_string)
-    location = get_location_from_ip(ip_address)
+    # Pas d'appel réseau ici : la localisation est résolue en arrière-plan.
+    location = geolocator.cached(ip_address) or PENDING_LOCATION
 
     # Créer la session
     session = UserSession.objects.create(
@@ -113,6 +66,8 @@ def create_user_session(user, request, expires_in_days=30):
         last_activity=timezone.now(),
         expires_at=timezone.now() + timedelta(days=expires_in_days)
     )
+    if location == PENDING_LOCATION:
+        schedule_location(session)
 
     return session
 
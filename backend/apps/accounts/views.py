@@ -12,12 +12,14 @@ from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from apps.bookings.models import Booking
+from apps.core.sparse_fields import SparseFieldsetsViewMixin
 from apps.partners.models import PartnerProfile
 from apps.poi.models import TouristPoint
 
@@ -53,8 +55,14 @@ from .services import EmailService
 from .permissions import PermissionChecker
 
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all().order_by('-date_joined')
+class UserViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
+    queryset = (
+        User.objects.prefetch_related(
+            'role_assignments',
+            Prefetch('profile', queryset=UserProfileSerializer.with_follow_counts(UserProfile.objects.all())),
+        )
+        .order_by('-date_joined')
+    )
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -270,15 +278,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):  # type: ignore[override]
-        qs = Notification.objects.filter(user=self.request.user).order_by('-scheduled_for', '-created_at')
-        limit = self.request.query_params.get('limit')
-        if limit:
-            try:
-                limit_int = max(1, int(limit))
-                return qs[:limit_int]
-            except (ValueError, TypeError):
-                pass
-        return qs
+        # `?limit=` est traité par la pagination (taille de page).
+        return Notification.objects.filter(user=self.request.user).order_by('-scheduled_for', '-created_at')
 
     def perform_create(self, serializer):  # type: ignore[override]
         serializer.save(user=self.request.user)
@@ -348,8 +349,10 @@ class AdminSessionViewSet(viewsets.ViewSet):
 
     def list(self, request):
         sessions = AdminSession.objects.filter(admin=request.user).order_by('-created_at')
-        serializer = AdminSessionSerializer(sessions, many=True)
-        return Response(serializer.data)
+        paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+        page = paginator.paginate_queryset(sessions, request, view=self)
+        serializer = AdminSessionSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def create(self, request):
         hours = int(request.data.get('duration_hours', 2))
@@ -360,7 +363,7 @@ class AdminSessionViewSet(viewsets.ViewSet):
         session = AdminSession.objects.create(
             admin=request.user,
             ip_address=ip_address,
-            user_agent=request.data.get('user_agent', ''),
+            user_agent=(request.data.get('user_agent') or request.META.get('HTTP_USER_AGENT', ''))[:255],
             expires_at=expires_at,
         )
         serializer = AdminSessionSerializer(session)
@@ -1659,6 +1662,7 @@ class AchievementViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Achievement.objects.filter(is_active=True)
     serializer_class = AchievementSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
 
 
 class UserAchievementViewSet(viewsets.ModelViewSet):
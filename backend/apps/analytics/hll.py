@@ -0,0 +1,123 @@
+"""
+HyperLogLog : estimation du nombre d'éléments distincts en mémoire constante.
+
+Avec une précision `p`, le sketch occupe 2**p octets (un registre par octet)
+et l'erreur type vaut environ 1.04 / sqrt(2**p) : 1.6 % pour p = 12 (4 Ko).
+Deux sketches de même précision se fusionnent registre par registre (max),
+ce qui permet de compter les visiteurs uniques d'une union de jours ou de POI
+sans revenir aux événements bruts.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+from typing import Iterable, Optional
+
+DEFAULT_PRECISION = 12
+MIN_PRECISION = 4
+MAX_PRECISION = 16
+HASH_BITS = 64
+_INVERSE_POWERS = [2.0 ** -rank for rank in range(HASH_BITS + 1)]
+# Bit de poids fort de chaque octet : les rangs (<= 64) n'y touchent jamais.
+_HIGH_BITS = {}
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _max_bytes(left: bytes, right: bytes) -> bytearray:
+    """Maximum octet par octet, calculé sur deux grands entiers (octets < 128)."""
+    size = len(left)
+    high = _HIGH_BITS.get(size)
+    if high is None:
+        high = _HIGH_BITS[size] = int.from_bytes(b'\x80' * size, 'big')
+    a, b = int.from_bytes(left, 'big'), int.from_bytes(right, 'big')
+    # Octet de `(a | 0x80) - b` : bit 7 à 1 si a >= b, sans retenue entre octets.
+    mask = (((a | high) - b) & high) >> 7
+    mask *= 0xFF
+    return bytearray((a & mask | b & ~mask).to_bytes(size, 'big'))
+
+
+class HyperLogLog:
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytes] = None):
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(f'Précision HyperLogLog hors limites : {precision}')
+        self.precision = precision
+        size = 1 << precision
+        if registers is not None and len(registers) != size:
+            raise ValueError(f'{len(registers)} registres pour une précision {precision}')
+        self.registers = bytearray(registers) if registers is not None else bytearray(size)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HyperLogLog':
+        """Sketch sérialisé par `to_bytes` : la précision se déduit de la taille."""
+        precision = len(data).bit_length() - 1
+        if len(data) != 1 << precision:
+            raise ValueError(f'Taille de sketch invalide : {len(data)} octets')
+        return cls(precision, data)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    def add(self, value: str) -> None:
+        hashed = _hash(value)
+        remaining_bits = HASH_BITS - self.precision
+        index = hashed >> remaining_bits
+        remaining = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[str]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """
+        Fusion en place (union des ensembles) ; renvoie `self`.
+
+        Si les précisions diffèrent (changement de `ANALYTICS_HLL_PRECISION`),
+        le résultat prend la plus faible des deux.
+        """
+        precision = min(self.precision, other.precision)
+        if self.precision != precision:
+            self.precision, self.registers = precision, self._folded(precision)
+        registers = other.registers if other.precision == precision else other._folded(precision)
+        self.registers = _max_bytes(self.registers, registers)
+        return self
+
+    def _folded(self, precision: int) -> bytearray:
+        """Registres ramenés à une précision inférieure (bits d'index rendus au rang)."""
+        shift = self.precision - precision
+        registers = bytearray(1 << precision)
+        for index, rank in enumerate(self.registers):
+            if not rank:
+                continue
+            dropped = index & ((1 << shift) - 1)
+            rank = shift - dropped.bit_length() + 1 if dropped else rank + shift
+            if rank > registers[index >> shift]:
+                registers[index >> shift] = rank
+        return registers
+
+    def count(self) -> int:
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        # Histogramme des rangs (bytearray.count en C), arrêté dès que tous les registres sont comptés.
+        zeros = self.registers.count(0)
+        harmonic, remaining, rank = float(zeros), size - zeros, 1
+        while remaining:
+            registers = self.registers.count(rank)
+            harmonic += registers * _INVERSE_POWERS[rank]
+            remaining -= registers
+            rank += 1
+        estimate = alpha * size * size / harmonic
+        if estimate <= 2.5 * size and zeros:
+            # Petites cardinalités : comptage linéaire des registres vides.
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def __len__(self) -> int:
+        return self.count()
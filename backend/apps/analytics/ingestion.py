@@ -0,0 +1,278 @@
+"""
+Ingestion des événements de vue / clic des POI (endpoint beacon).
+
+Les événements ne sont pas écrits un par un : `EventBuffer` les cumule en
+mémoire du processus par (POI, jour) et tient un sketch HyperLogLog des
+visiteurs par (POI, jour). Toutes les `ANALYTICS_FLUSH_INTERVAL` secondes (minuterie
+du processus, même sans nouvel événement) ou dès `ANALYTICS_FLUSH_MAX_KEYS`
+couples en attente, un thread d'arrière-plan écrit le tampon dans
+`TouristPointAnalytics` par lots :
+
+    INSERT ... ON CONFLICT (tourist_point_id, date)
+    DO UPDATE SET views = views + excluded.views, clicks = clicks + excluded.clicks, ...
+
+et incrémente `TouristPoint.view_count` (apps.poi.counters) dans une courte
+transaction. Après son commit, et hors des verrous de l'upsert, il fusionne les
+sketches dans `visitor_sketch`, met à jour les agrégats (apps.analytics.rollups)
+et invalide les tableaux de bord partenaires concernés.
+
+- Les compteurs sont additifs et la fusion des sketches idempotente : plusieurs
+  workers peuvent écrire la même ligne, un visiteur vu par deux workers n'est
+  compté qu'une fois.
+- Les lignes sont écrites et verrouillées dans l'ordre (POI, jour) à chaque
+  étape (upsert, sketches, agrégats) : deux workers qui écrivent les mêmes POI
+  s'attendent au lieu de s'interbloquer.
+- Une écriture en échec (timeout, interblocage) remet ses compteurs dans le
+  tampon : ils repartent à l'écriture suivante. Si seule la seconde étape
+  échoue, les couples reviennent à zéro pour refaire sketches et agrégats.
+  Le tampon est borné (`ANALYTICS_BUFFER_MAX_KEYS`) : au-delà, les jours les
+  plus anciens remis en attente sont abandonnés.
+- Les événements encore en mémoire au moment d'un arrêt brutal sont perdus
+  (au plus un intervalle) ; le tampon est écrit à l'arrêt normal du processus.
+"""
+from __future__ import annotations
+
+import atexit
+import datetime
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .hll import HyperLogLog
+from .models import TouristPointAnalytics
+from .rollups import VisitorUnion, refresh_rollups
+
+logger = logging.getLogger(__name__)
+
+EVENT_VIEW = 'view'
+EVENT_CLICK = 'click'
+EVENT_TYPES = (EVENT_VIEW, EVENT_CLICK)
+UPSERT_BATCH_SIZE = 500
+# Sketches gardés en mémoire : aujourd'hui et hier (événements reçus autour de minuit).
+SKETCH_RETENTION_DAYS = 1
+
+Key = Tuple[object, datetime.date]
+
+
+def _upsert_sql(rows: int) -> str:
+    table = connection.ops.quote_name(TouristPointAnalytics._meta.db_table)
+    values = ', '.join(['(%s, %s, %s, %s, 0, 0, 0, %s, %s)'] * rows)
+    return (
+        f'INSERT INTO {table} '
+        '(tourist_point_id, date, views, clicks, bookings, revenue, unique_visitors, created_at, updated_at) '
+        f'VALUES {values} '
+        'ON CONFLICT (tourist_point_id, date) DO UPDATE SET '
+        f'views = {table}.views + excluded.views, '
+        f'clicks = {table}.clicks + excluded.clicks, '
+        'updated_at = excluded.updated_at'
+    )
+
+
+def upsert_counts(rows: Iterable[Tuple[object, datetime.date, int, int]]) -> int:
+    """Ajoute (POI, jour, vues, clics) aux lignes journalières."""
+    point_field = TouristPointAnalytics._meta.get_field('tourist_point')
+    date_field = TouristPointAnalytics._meta.get_field('date')
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    rows = list(rows)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            params = []
+            for point_id, day, views, clicks in batch:
+                params += [
+                    point_field.get_db_prep_value(point_id, connection),
+                    date_field.get_db_prep_value(day, connection),
+                    views, clicks, now, now,
+                ]
+            cursor.execute(_upsert_sql(len(batch)), params)
+    return len(rows)
+
+
+def merge_visitor_sketches(sketches: Dict[Key, bytes]) -> int:
+    """
+    Fusionne des sketches de visiteurs dans les lignes journalières existantes
+    et recalcule leur `unique_visitors` ; renvoie le nombre de lignes mises à jour.
+    """
+    if not sketches:
+        return 0
+    rows = (
+        TouristPointAnalytics.objects.select_for_update()
+        .filter(
+            tourist_point_id__in={point_id for point_id, _ in sketches},
+            date__in={day for _, day in sketches},
+        )
+        .order_by('tourist_point_id', 'date')
+        .only('pk', 'tourist_point_id', 'date', 'unique_visitors', 'visitor_sketch')
+    )
+    updated = []
+    for row in rows:
+        sketch = sketches.get((row.tourist_point_id, row.date))
+        if sketch is None:
+            continue
+        union = VisitorUnion()
+        union.add(row.unique_visitors, row.visitor_sketch)
+        union.add(0, sketch)
+        row.unique_visitors, row.visitor_sketch = union.count(), union.to_bytes()
+        updated.append(row)
+    TouristPointAnalytics.objects.bulk_update(updated, ['unique_visitors', 'visitor_sketch'], batch_size=UPSERT_BATCH_SIZE)
+    return len(updated)
+
+
+class EventBuffer:
+    def __init__(self):
+        # (POI, jour) -> [vues, clics] pas encore écrits
+        self._counts: Dict[Key, list] = {}
+        # (POI, jour) -> visiteurs vus par ce processus
+        self._sketches: Dict[Key, HyperLogLog] = {}
+        self._flushing = False
+        self._lock = threading.Lock()
+        # Une seule écriture à la fois par processus (minuterie, seuil, atexit).
+        self._flush_lock = threading.Lock()
+        # Processus propriétaire de la minuterie (un thread ne survit pas à un fork).
+        self._timer_pid: Optional[int] = None
+
+    @property
+    def flush_interval(self) -> float:
+        return getattr(settings, 'ANALYTICS_FLUSH_INTERVAL', 10)
+
+    @property
+    def max_keys(self) -> int:
+        return getattr(settings, 'ANALYTICS_FLUSH_MAX_KEYS', 20_000)
+
+    @property
+    def max_buffered_keys(self) -> int:
+        return getattr(settings, 'ANALYTICS_BUFFER_MAX_KEYS', 100_000)
+
+    def add(self, events: Iterable[Tuple[object, str, str]], day: Optional[datetime.date] = None) -> int:
+        """Cumule des événements (POI, type, visiteur) ; aucune requête SQL."""
+        day = day or timezone.localdate()
+        precision = getattr(settings, 'ANALYTICS_HLL_PRECISION', 12)
+        accepted = 0
+        with self._lock:
+            for point_id, kind, visitor in events:
+                key = (point_id, day)
+                counts = self._counts.get(key)
+                if counts is None:
+                    counts = self._counts[key] = [0, 0]
+                counts[1 if kind == EVENT_CLICK else 0] += 1
+                if visitor:
+                    sketch = self._sketches.get(key)
+                    if sketch is None:
+                        sketch = self._sketches[key] = HyperLogLog(precision)
+                    sketch.add(visitor)
+                accepted += 1
+            start_timer = self._timer_pid != os.getpid()
+            if start_timer:
+                self._timer_pid = os.getpid()
+            start_flush = len(self._counts) >= self.max_keys and not self._flushing
+            if start_flush:
+                self._flushing = True
+        if start_timer:
+            threading.Thread(target=self._run_timer, name='analytics-flush-timer', daemon=True).start()
+        if start_flush:
+            threading.Thread(target=self._flush_in_background, name='analytics-flush', daemon=True).start()
+        return accepted
+
+    def _run_timer(self) -> None:
+        """Écrit le tampon toutes les `flush_interval` secondes, y compris quand le worker est inactif."""
+        while True:
+            time.sleep(self.flush_interval)
+            if self.pending():
+                self._flush_in_background()
+
+    def _flush_in_background(self) -> None:
+        try:
+            self.flush()
+        except Exception:  # noqa: BLE001 - ne jamais arrêter la minuterie
+            logger.exception('Écriture du tampon analytics impossible')
+        finally:
+            connection.close()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._counts)
+
+    def flush(self) -> int:
+        """Écrit les compteurs en attente ; renvoie le nombre de lignes (POI, jour) écrites."""
+        from apps.partners.dashboard import invalidate_dashboard_for_points
+        from apps.poi.counters import add_views
+        from apps.poi.models import TouristPoint
+
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, {}
+                sketches = {key: bytes(self._sketches[key].registers) for key in counts if key in self._sketches}
+                self._flushing = False
+                oldest = timezone.localdate() - datetime.timedelta(days=SKETCH_RETENTION_DAYS)
+                for key in [key for key in self._sketches if key[1] < oldest]:
+                    del self._sketches[key]
+            if not counts:
+                return 0
+            try:
+                known = set(
+                    TouristPoint.objects.filter(pk__in={point_id for point_id, _ in counts}).values_list('pk', flat=True)
+                )
+                # Ordre de verrouillage commun à tous les workers : (POI, jour).
+                rows = sorted(
+                    (point_id, day, views, clicks)
+                    for (point_id, day), (views, clicks) in counts.items()
+                    if point_id in known
+                )
+                # Section critique courte : les lignes journalières restent verrouillées jusqu'au commit.
+                with transaction.atomic():
+                    upsert_counts(rows)
+                    views_by_point = defaultdict(int)
+                    for point_id, _, views, _ in rows:
+                        views_by_point[point_id] += views
+                    add_views(views_by_point)
+            except Exception:  # noqa: BLE001 - analytics indicatives, ne pas faire tomber le worker
+                logger.exception('Écriture de %s compteur(s) analytics impossible, remis en attente', len(counts))
+                self._restore(counts)
+                return 0
+            try:
+                merged = {key: sketches[key] for key in sorted(sketches) if key[0] in known}
+                with transaction.atomic():
+                    merge_visitor_sketches(merged)
+                    refresh_rollups(((point_id, day) for point_id, day, *_ in rows), merged)
+                invalidate_dashboard_for_points({point_id for point_id, *_ in rows})
+            except Exception:  # noqa: BLE001
+                # Compteurs déjà écrits : les couples repartent à zéro, seuls sketches et agrégats sont refaits.
+                logger.exception('Agrégats analytics de %s ligne(s) non mis à jour, remis en attente', len(rows))
+                self._restore({(point_id, day): [0, 0] for point_id, day, *_ in rows})
+            return len(rows)
+
+    def _restore(self, counts: Dict[Key, list]) -> None:
+        """
+        Remet des compteurs non écrits dans le tampon (les sketches y sont restés),
+        dans la limite de `max_buffered_keys` : les jours les plus anciens sont abandonnés.
+        """
+        with self._lock:
+            fresh = sorted((key for key in counts if key not in self._counts), key=lambda key: key[1])
+            dropped = fresh[:max(len(fresh) - max(self.max_buffered_keys - len(self._counts), 0), 0)]
+            for key in dropped:
+                del counts[key]
+            for key, (views, clicks) in counts.items():
+                pending = self._counts.get(key)
+                if pending is None:
+                    self._counts[key] = [views, clicks]
+                else:
+                    pending[0] += views
+                    pending[1] += clicks
+        if dropped:
+            logger.error('Tampon analytics plein : %s couple(s) (POI, jour) abandonné(s)', len(dropped))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._sketches.clear()
+
+
+event_buffer = EventBuffer()
+atexit.register(event_buffer.flush)
@@ -0,0 +1,150 @@
+"""
+Benchmark de l'ingestion des vues / clics de POI (`POST /analytics/events/`).
+
+Dans une transaction annulée à la fin :
+
+1. envoie N événements par lots à l'endpoint beacon : débit (événements/s) et
+   nombre de requêtes SQL pendant la réception (attendu : 0) ;
+2. écrit le tampon (`INSERT ... ON CONFLICT DO UPDATE`) : durée et requêtes ;
+3. renvoie les mêmes événements et réécrit : les compteurs doivent doubler,
+   les visiteurs uniques non ;
+4. compare les visiteurs uniques estimés (HyperLogLog) au nombre exact, par
+   POI et par jour puis pour le partenaire sur deux jours (fusion des sketches).
+
+Usage:
+    docker-compose exec backend python manage.py benchmark_event_ingestion --events 50000 --points 200
+"""
+import datetime
+import random
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from apps.analytics.ingestion import event_buffer
+from apps.analytics.models import TouristPointAnalytics
+from apps.analytics.rollups import unique_visitors_between
+from apps.analytics.views import TouristPointEventIngestView
+from apps.poi.models import TouristPoint
+
+CLIENT_IP = '203.0.113.7'
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit de l'endpoint beacon des vues/clics et l'écriture groupée"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=50_000, help='Événements envoyés')
+        parser.add_argument('--points', type=int, default=200, help='POI distincts')
+        parser.add_argument('--visitors', type=int, default=5_000, help='Visiteurs distincts')
+        parser.add_argument('--batch', type=int, default=100, help='Événements par requête beacon')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        event_buffer.flush()
+        event_buffer.clear()
+        # Écriture déclenchée explicitement, dans la transaction de la commande.
+        with override_settings(ANALYTICS_FLUSH_INTERVAL=10 ** 9, ANALYTICS_FLUSH_MAX_KEYS=10 ** 9):
+            try:
+                with transaction.atomic():
+                    self._run(rng, options)
+                    transaction.set_rollback(True)
+            finally:
+                event_buffer.clear()
+
+    def _run(self, rng, options):
+        suffix = uuid.uuid4().hex[:8]
+        owner = get_user_model().objects.create(username=f'beacon-{suffix}', email=f'beacon-{suffix}@example.com')
+        points = TouristPoint.objects.bulk_create(
+            [TouristPoint(owner=owner, name=f'POI {index}') for index in range(options['points'])]
+        )
+        # Une requête = un visiteur anonyme (user-agent distinct) et des POI distincts :
+        # la vue ignore les doublons (POI, type) d'un même lot.
+        batch_size = min(options['batch'], len(points))
+        batches, truth = [], {}
+        for _ in range(0, options['events'], batch_size):
+            user_agent = f'visitor-{rng.randrange(options["visitors"])}'
+            events = []
+            for point in rng.sample(points, batch_size):
+                truth.setdefault(point.pk, set()).add(self._visitor(user_agent))
+                events.append({'tourist_point': str(point.pk), 'type': 'click' if rng.random() < 0.2 else 'view'})
+            batches.append((user_agent, events))
+        sent = sum(len(events) for _, events in batches)
+
+        for round_number in (1, 2):
+            received, queries = self._send(batches)
+            with CaptureQueriesContext(connection) as flush_queries:
+                started = time.perf_counter()
+                rows = event_buffer.flush()
+                flush_time = time.perf_counter() - started
+            self.stdout.write(
+                f'Passe {round_number} : {sent / received:,.0f} événements/s reçus ({queries} requêtes SQL), '
+                f'écriture de {rows} lignes (POI, jour) en {flush_time * 1000:.0f} ms '
+                f'({len(flush_queries)} requêtes SQL)'
+            )
+            if queries:
+                raise CommandError(f'{queries} requêtes SQL pendant la réception des événements')
+            totals = TouristPointAnalytics.objects.filter(
+                tourist_point__owner=owner, date=timezone.localdate(),
+            ).aggregate(views=Sum('views'), clicks=Sum('clicks'))
+            if (totals['views'] or 0) + (totals['clicks'] or 0) != sent * round_number:
+                raise CommandError(f'Compteurs {totals} pour {sent * round_number} événements envoyés')
+
+        errors = []
+        for point_id, estimate in TouristPointAnalytics.objects.filter(
+            tourist_point__owner=owner, date=timezone.localdate(),
+        ).values_list('tourist_point_id', 'unique_visitors'):
+            exact = len(truth[point_id])
+            errors.append(abs(estimate - exact) / exact)
+        errors.sort()
+        self.stdout.write(
+            f'Visiteurs uniques (HyperLogLog) : erreur médiane {errors[len(errors) // 2]:.1%}, '
+            f'max {errors[-1]:.1%}'
+        )
+
+        # Veille : la moitié des visiteurs revient le lendemain (identifiants construits comme par la vue).
+        today = timezone.localdate()
+        yesterday = today - datetime.timedelta(days=1)
+        visitors = {visitor for point_visitors in truth.values() for visitor in point_visitors}
+        returning = sorted(visitors)[: len(visitors) // 2]
+        new = [self._visitor(f'visitor-yesterday-{index}') for index in range(len(visitors) // 2)]
+        event_buffer.add(((rng.choice(points).pk, 'view', visitor) for visitor in returning + new), day=yesterday)
+        event_buffer.flush()
+        exact = len(visitors) + len(new)
+        merged = unique_visitors_between(yesterday, today, partner_id=owner.pk)
+        summed = TouristPointAnalytics.objects.filter(
+            tourist_point__owner=owner, date__gte=yesterday,
+        ).aggregate(total=Sum('unique_visitors'))['total']
+        self.stdout.write(
+            f'Visiteurs uniques du partenaire sur 2 jours : exact {exact}, fusion des sketches {merged} '
+            f'({abs(merged - exact) / exact:.1%}), somme des lignes journalières {summed}'
+        )
+        self.stdout.write(self.style.SUCCESS(f'{sent * 2} événements ingérés sans écriture par événement'))
+
+    @staticmethod
+    def _visitor(user_agent: str) -> str:
+        return f'a:{CLIENT_IP}:{user_agent}'
+
+    def _send(self, batches):
+        # Sans limite de débit : toutes les requêtes viennent de la même IP.
+        view = TouristPointEventIngestView.as_view(throttle_classes=[])
+        factory = APIRequestFactory()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for user_agent, events in batches:
+                request = factory.post(
+                    '/api/v1/analytics/events/', {'events': events}, format='json',
+                    REMOTE_ADDR=CLIENT_IP, HTTP_USER_AGENT=user_agent,
+                )
+                response = view(request)
+                if response.status_code != 202 or response.data['rejected'] or response.data['duplicates']:
+                    raise CommandError(f'Réponse {response.status_code} : {response.data}')
+            elapsed = time.perf_counter() - started
+        return elapsed, len(queries)
@@ -0,0 +1,36 @@
+"""
+Reconstruit les agrégats hebdomadaires et mensuels des analytics de POI.
+
+À lancer une fois au déploiement, puis après un import direct en base de
+lignes `TouristPointAnalytics` ou un changement de propriétaire de POI ; les
+écritures courantes sont reportées incrémentalement (apps.analytics.rollups).
+
+Usage:
+    docker-compose exec backend python manage.py rebuild_analytics_rollups --since 2025-01-01
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.analytics.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit les agrégats (semaine, mois) des analytics de POI et des partenaires'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Reconstruit seulement les périodes à partir de cette date (AAAA-MM-JJ)')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError('Date invalide, format attendu : AAAA-MM-JJ')
+        started = time.perf_counter()
+        points, partners = rebuild_rollups(since)
+        self.stdout.write(self.style.SUCCESS(
+            f'{points} agrégats par POI et {partners} agrégats par partenaire reconstruits '
+            f'en {time.perf_counter() - started:.1f} s'
+        ))
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_touristpointanalytics'),
+        ('poi', '0017_cursor_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnerAnalyticsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grain', models.CharField(choices=[('day', 'Jour'), ('week', 'Semaine'), ('month', 'Mois')], max_length=8)),
+                ('period_start', models.DateField()),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('clicks', models.PositiveBigIntegerField(default=0)),
+                ('bookings', models.PositiveBigIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('unique_visitors', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'partner_analytics_rollup',
+                'ordering': ['-period_start'],
+                'abstract': False,
+                'unique_together': {('partner', 'grain', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TouristPointAnalyticsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grain', models.CharField(choices=[('day', 'Jour'), ('week', 'Semaine'), ('month', 'Mois')], max_length=8)),
+                ('period_start', models.DateField()),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('clicks', models.PositiveBigIntegerField(default=0)),
+                ('bookings', models.PositiveBigIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('unique_visitors', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('tourist_point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_rollups', to='poi.touristpoint')),
+            ],
+            options={
+                'db_table': 'tourist_point_analytics_rollup',
+                'ordering': ['-period_start'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['owner', 'grain', 'period_start'], name='tourist_poi_owner_i_621d99_idx')],
+                'unique_together': {('tourist_point', 'grain', 'period_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partneranalyticsrollup',
+            name='visitor_sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='touristpointanalytics',
+            name='visitor_sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='touristpointanalyticsrollup',
+            name='visitor_sketch',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
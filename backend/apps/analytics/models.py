@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from django.conf import settings
 from django.db import models
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
 
 
 class TouristPointAnalytics(models.Model):
@@ -17,6 +19,8 @@ class TouristPointAnalytics(models.Model):
     bookings = models.PositiveIntegerField(default=0)
     revenue = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     unique_visitors = models.PositiveIntegerField(default=0)
+    # Sketch HyperLogLog des visiteurs du jour (apps.analytics.hll) : fusionnable entre jours et POI.
+    visitor_sketch = models.BinaryField(null=True, blank=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -75,3 +79,87 @@ class TravelAnalytics(models.Model):
 
     def __str__(self) -> str:
         return f"Analytics {self.session_id}"
+
+
+class AnalyticsGrain(models.TextChoices):
+    DAY = 'day', 'Jour'
+    WEEK = 'week', 'Semaine'
+    MONTH = 'month', 'Mois'
+
+
+class AnalyticsRollup(models.Model):
+    """Somme des lignes journalières `TouristPointAnalytics` sur une période (voir apps.analytics.rollups)."""
+    grain = models.CharField(max_length=8, choices=AnalyticsGrain.choices)
+    period_start = models.DateField()
+    views = models.PositiveBigIntegerField(default=0)
+    clicks = models.PositiveBigIntegerField(default=0)
+    bookings = models.PositiveBigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Visiteurs uniques de la période : fusion des sketches journaliers, plus les
+    # visiteurs des lignes sans sketch (sommés, donc majorés).
+    unique_visitors = models.PositiveBigIntegerField(default=0)
+    visitor_sketch = models.BinaryField(null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+        ordering = ['-period_start']
+
+
+class TouristPointAnalyticsRollup(AnalyticsRollup):
+    """Agrégats hebdomadaires et mensuels par POI."""
+    tourist_point = models.ForeignKey('poi.TouristPoint', related_name='analytics_rollups', on_delete=models.CASCADE)
+    # Propriétaire du POI, dénormalisé pour les agrégats par partenaire.
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.CASCADE)
+
+    class Meta(AnalyticsRollup.Meta):
+        unique_together = ('tourist_point', 'grain', 'period_start')
+        indexes = [models.Index(fields=['owner', 'grain', 'period_start'])]
+        db_table = 'tourist_point_analytics_rollup'
+
+    def __str__(self) -> str:
+        return f"Rollup {self.tourist_point_id} - {self.grain} {self.period_start}"
+
+
+class PartnerAnalyticsRollup(AnalyticsRollup):
+    """Agrégats journaliers, hebdomadaires et mensuels par partenaire (tous ses POI)."""
+    partner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='analytics_rollups', on_delete=models.CASCADE)
+
+    class Meta(AnalyticsRollup.Meta):
+        unique_together = ('partner', 'grain', 'period_start')
+        db_table = 'partner_analytics_rollup'
+
+    def __str__(self) -> str:
+        return f"Rollup partenaire {self.partner_id} - {self.grain} {self.period_start}"
+
+
+def _is_cascade(origin) -> bool:
+    model = getattr(origin, 'model', type(origin))
+    return model is not TouristPointAnalytics
+
+
+@receiver(post_save, sender=TouristPointAnalytics)
+@receiver(post_delete, sender=TouristPointAnalytics)
+def refresh_rollups_on_analytics_change(sender, instance: TouristPointAnalytics, **kwargs):
+    from .rollups import refresh_rollups
+
+    # Suppression en cascade d'un POI : `rebuild_rollups_on_poi_delete` recalcule le partenaire.
+    if kwargs.get('raw') or ('origin' in kwargs and _is_cascade(kwargs['origin'])):
+        return
+    refresh_rollups([(instance.tourist_point_id, instance.date)])
+
+
+@receiver(pre_delete, sender='poi.TouristPoint')
+def remember_analytics_days_on_poi_delete(sender, instance, **kwargs):
+    # Jours encore présents avant la suppression en cascade des lignes journalières.
+    instance._analytics_days = list(
+        TouristPointAnalytics.objects.filter(tourist_point=instance).order_by().values_list('date', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender='poi.TouristPoint')
+def rebuild_rollups_on_poi_delete(sender, instance, **kwargs):
+    from .rollups import rebuild_partner_rollups
+
+    # Seules les périodes où le POI avait des lignes changent pour le partenaire.
+    rebuild_partner_rollups([instance.owner_id], getattr(instance, '_analytics_days', None))
@@ -0,0 +1,473 @@
+"""
+Agrégats pré-calculés des analytics de POI (jour → semaine → mois).
+
+- `TouristPointAnalyticsRollup` : semaine et mois, par POI ;
+- `PartnerAnalyticsRollup` : jour, semaine et mois, par partenaire.
+
+Mise à jour incrémentale : `refresh_rollups` reçoit les couples
+(POI, jour) modifiés et recalcule uniquement les périodes touchées, avec une
+requête groupée et un upsert par période (au plus ~31 lignes journalières par
+POI). Les receivers de `apps.analytics.models` l'appellent pour chaque ligne ;
+une ingestion groupée l'appelle une fois pour tout le lot, avec les sketches
+qu'elle vient de fusionner : le sketch stocké de chaque période est alors
+complété par ces seuls sketches (la fusion HLL est monotone) au lieu d'être
+refusionné depuis toutes les lignes journalières de la semaine ou du mois.
+
+`rebuild_rollups` reconstruit tout (ou à partir d'une date) en SQL ensembliste
+(commande `rebuild_analytics_rollups`), à lancer après un import brut ou un
+changement de propriétaire de POI.
+
+Visiteurs uniques : les sketches HyperLogLog des lignes journalières sont
+fusionnés à chaque niveau (`VisitorUnion`), un visiteur revenu plusieurs jours
+n'est compté qu'une fois. `unique_visitors_between` répond aux requêtes sur une
+plage quelconque en fusionnant le moins de sketches possible (mois et semaines
+entiers, puis jours).
+
+Les semaines commencent le lundi ; une période est identifiée par son premier jour.
+"""
+from __future__ import annotations
+
+import datetime
+from collections import defaultdict
+from itertools import groupby
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from apps.poi.models import TouristPoint
+
+from .hll import HyperLogLog
+from .models import AnalyticsGrain, PartnerAnalyticsRollup, TouristPointAnalytics, TouristPointAnalyticsRollup
+
+METRICS = ('views', 'clicks', 'bookings', 'revenue', 'unique_visitors')
+POINT_GRAINS = (AnalyticsGrain.WEEK, AnalyticsGrain.MONTH)
+PARTNER_GRAINS = (AnalyticsGrain.DAY, AnalyticsGrain.WEEK, AnalyticsGrain.MONTH)
+TRUNCATE = {AnalyticsGrain.WEEK: TruncWeek, AnalyticsGrain.MONTH: TruncMonth}
+BATCH_SIZE = 2000
+# Sketches de 4 Ko (précision 12) : lots plus petits pour les fusions.
+SKETCH_BATCH_SIZE = 500
+
+
+def period_start(grain: str, day: datetime.date) -> datetime.date:
+    if grain == AnalyticsGrain.WEEK:
+        return day - datetime.timedelta(days=day.weekday())
+    if grain == AnalyticsGrain.MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def period_end(grain: str, start: datetime.date) -> datetime.date:
+    """Premier jour de la période suivante."""
+    if grain == AnalyticsGrain.WEEK:
+        return start + datetime.timedelta(days=7)
+    if grain == AnalyticsGrain.MONTH:
+        return (start + datetime.timedelta(days=32)).replace(day=1)
+    return start + datetime.timedelta(days=1)
+
+
+class VisitorUnion:
+    """
+    Visiteurs uniques d'un ensemble de lignes (journalières ou agrégées).
+
+    Pour une ligne, `unique_visitors` vaut l'estimation de son sketch plus les
+    visiteurs comptés hors sketch (données importées). L'union fusionne les
+    sketches et somme la part hors sketch.
+    """
+
+    def __init__(self):
+        self.sketch: Optional[HyperLogLog] = None
+        self.unsketched = 0
+        # Somme brute des `unique_visitors` ajoutés
+        self.total = 0
+
+    def add(self, unique_visitors: int, sketch: Optional[bytes]) -> None:
+        unique_visitors = unique_visitors or 0
+        self.total += unique_visitors
+        if not sketch:
+            self.unsketched += unique_visitors
+            return
+        hll = HyperLogLog.from_bytes(sketch)
+        self.unsketched += max(unique_visitors - hll.count(), 0)
+        self.sketch = hll if self.sketch is None else self.sketch.merge(hll)
+
+    def count(self) -> int:
+        return self.unsketched + (self.sketch.count() if self.sketch is not None else 0)
+
+    def to_bytes(self) -> Optional[bytes]:
+        return self.sketch.to_bytes() if self.sketch is not None else None
+
+    def apply(self, obj) -> None:
+        """Remplace, dans un agrégat dont `unique_visitors` est la somme brute de ces lignes, la somme par l'union."""
+        obj.unique_visitors = max(obj.unique_visitors - self.total, 0) + self.count()
+        obj.visitor_sketch = self.to_bytes()
+
+
+def _unions(rows) -> Dict[object, VisitorUnion]:
+    """`rows` : (clé, unique_visitors, sketch)."""
+    unions = defaultdict(VisitorUnion)
+    for key, unique_visitors, sketch in rows:
+        unions[key].add(unique_visitors, sketch)
+    return unions
+
+
+def _sums() -> dict:
+    return {f'total_{metric}': Sum(metric) for metric in METRICS}
+
+
+def _metrics(row: dict) -> dict:
+    return {metric: row[f'total_{metric}'] or 0 for metric in METRICS}
+
+
+def _upsert(model, objects, unique_fields, extra_update_fields=()) -> None:
+    if objects:
+        model.objects.bulk_create(
+            objects,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=[*METRICS, *extra_update_fields, 'visitor_sketch', 'updated_at'],
+        )
+
+
+def _insert(model, objects: Iterable) -> int:
+    count, batch = 0, []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            count, batch = count + len(batch), []
+    if batch:
+        model.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def _merged_unions(rollups, key_lookup: str, deltas: Dict[object, list]) -> Dict[object, VisitorUnion]:
+    """
+    Unions des agrégats existants (verrouillés dans l'ordre des clés) complétées
+    par les sketches `deltas` (clé -> sketches fusionnés dans ses lignes journalières).
+    """
+    unions = {}
+    rows = rollups.select_for_update().order_by(key_lookup).values_list(key_lookup, 'unique_visitors', 'visitor_sketch')
+    for key, unique_visitors, sketch in rows:
+        union = unions[key] = VisitorUnion()
+        union.add(unique_visitors, sketch)
+        for delta in deltas.get(key, ()):
+            union.add(0, delta)
+    return unions
+
+
+def _period_unions(sources, key_lookup: str, keys, rollups, rollup_key: str, deltas: Optional[Dict[object, list]]):
+    """
+    (unions complètes, unions incrémentales) d'une période.
+
+    Sans `deltas`, tous les sketches des sources sont fusionnés. Sinon les
+    agrégats existants sont complétés par `deltas` ; seules les clés sans
+    agrégat repartent des sources.
+    """
+    merged = {}
+    if deltas is not None:
+        merged = _merged_unions(rollups, rollup_key, deltas)
+        sources = sources.filter(**{f'{key_lookup}__in': set(keys) - set(merged)})
+    full = _unions(
+        sources.filter(visitor_sketch__isnull=False).values_list(key_lookup, 'unique_visitors', 'visitor_sketch')
+    )
+    return full, merged
+
+
+def _apply_period_unions(obj, key, full: dict, merged: dict) -> None:
+    if key in merged:
+        # Part hors sketch inchangée : seul le sketch de la période a grandi.
+        obj.unique_visitors, obj.visitor_sketch = merged[key].count(), merged[key].to_bytes()
+    elif key in full:
+        full[key].apply(obj)
+
+
+def _refresh_point_period(grain, start, point_ids, owners, deltas=None) -> None:
+    days = TouristPointAnalytics.objects.filter(
+        tourist_point_id__in=point_ids, date__gte=start, date__lt=period_end(grain, start),
+    ).order_by()
+    rows = days.values('tourist_point_id').annotate(**_sums())
+    full, merged = _period_unions(
+        days, 'tourist_point_id', point_ids,
+        TouristPointAnalyticsRollup.objects.filter(tourist_point_id__in=point_ids, grain=grain, period_start=start),
+        'tourist_point_id', deltas,
+    )
+    objects = [
+        TouristPointAnalyticsRollup(
+            tourist_point_id=row['tourist_point_id'], owner_id=owners[row['tourist_point_id']],
+            grain=grain, period_start=start, **_metrics(row),
+        )
+        for row in rows.order_by('tourist_point_id')
+    ]
+    for obj in objects:
+        _apply_period_unions(obj, obj.tourist_point_id, full, merged)
+    _upsert(TouristPointAnalyticsRollup, objects, ['tourist_point', 'grain', 'period_start'], ['owner'])
+    empty = set(point_ids) - {obj.tourist_point_id for obj in objects}
+    if empty:
+        TouristPointAnalyticsRollup.objects.filter(
+            tourist_point_id__in=empty, grain=grain, period_start=start,
+        ).delete()
+
+
+def _refresh_partner_period(grain, start, owner_ids, deltas=None) -> None:
+    if grain == AnalyticsGrain.DAY:
+        sources = TouristPointAnalytics.objects.filter(tourist_point__owner_id__in=owner_ids, date=start)
+        owner_lookup = 'tourist_point__owner_id'
+    else:
+        # Les agrégats par POI de la période viennent d'être recalculés.
+        sources = TouristPointAnalyticsRollup.objects.filter(owner_id__in=owner_ids, grain=grain, period_start=start)
+        owner_lookup = 'owner_id'
+    sources = sources.order_by()
+    full, merged = _period_unions(
+        sources, owner_lookup, owner_ids,
+        PartnerAnalyticsRollup.objects.filter(partner_id__in=owner_ids, grain=grain, period_start=start),
+        'partner_id', deltas,
+    )
+    objects = [
+        PartnerAnalyticsRollup(partner_id=row['partner'], grain=grain, period_start=start, **_metrics(row))
+        for row in sources.values(partner=F(owner_lookup)).annotate(**_sums()).order_by('partner')
+    ]
+    for obj in objects:
+        _apply_period_unions(obj, obj.partner_id, full, merged)
+    _upsert(PartnerAnalyticsRollup, objects, ['partner', 'grain', 'period_start'])
+    empty = set(owner_ids) - {obj.partner_id for obj in objects}
+    if empty:
+        PartnerAnalyticsRollup.objects.filter(partner_id__in=empty, grain=grain, period_start=start).delete()
+
+
+@transaction.atomic
+def refresh_rollups(
+    entries: Iterable[Tuple[object, datetime.date]],
+    sketches: Optional[Dict[Tuple[object, datetime.date], bytes]] = None,
+) -> None:
+    """
+    Recalcule les périodes contenant les lignes journalières (POI, jour) modifiées.
+
+    `sketches` : sketches que l'appelant vient de fusionner dans ces lignes, sans
+    autre changement de leurs visiteurs (ingestion). Les sketches des périodes
+    sont alors complétés par ces seuls sketches ; sans `sketches`, ils sont
+    refusionnés depuis les lignes journalières.
+
+    Périodes puis lignes écrites dans un ordre fixe (début de période, clé) :
+    deux écritures concurrentes verrouillent les agrégats dans le même ordre.
+    """
+    entries = set(entries)
+    if not entries:
+        return
+    owners = dict(
+        TouristPoint.objects.filter(pk__in={point_id for point_id, _ in entries}).values_list('pk', 'owner_id')
+    )
+    entries = {(point_id, day) for point_id, day in entries if point_id in owners}
+    for grain in POINT_GRAINS:
+        periods = defaultdict(set)
+        for point_id, day in entries:
+            periods[period_start(grain, day)].add(point_id)
+        deltas = _period_deltas(grain, sketches, lambda point_id: point_id)
+        for start, point_ids in sorted(periods.items()):
+            _refresh_point_period(grain, start, point_ids, owners, None if deltas is None else deltas[start])
+    for grain in PARTNER_GRAINS:
+        periods = defaultdict(set)
+        for point_id, day in entries:
+            periods[period_start(grain, day)].add(owners[point_id])
+        deltas = _period_deltas(grain, sketches, owners.get)
+        for start, owner_ids in sorted(periods.items()):
+            _refresh_partner_period(grain, start, owner_ids, None if deltas is None else deltas[start])
+
+
+def _period_deltas(grain, sketches, key_for) -> Optional[Dict[datetime.date, Dict[object, list]]]:
+    """Sketches fusionnés regroupés par début de période puis par clé (POI ou partenaire)."""
+    if sketches is None:
+        return None
+    deltas = defaultdict(lambda: defaultdict(list))
+    for (point_id, day), sketch in sketches.items():
+        key = key_for(point_id)
+        if key is not None:
+            deltas[period_start(grain, day)][key].append(sketch)
+    return deltas
+
+
+def _apply_unions(model, key_field: str, grain, unions: dict) -> None:
+    targets = model.objects.filter(
+        grain=grain,
+        period_start__in={start for _, start in unions},
+        **{f'{key_field}__in': {key for key, _ in unions}},
+    ).only('pk', key_field, 'period_start', 'unique_visitors')
+    updated = []
+    for obj in targets:
+        union = unions.get((getattr(obj, f'{key_field}_id'), obj.period_start))
+        if union is not None:
+            union.apply(obj)
+            updated.append(obj)
+    model.objects.bulk_update(updated, ['unique_visitors', 'visitor_sketch'], batch_size=SKETCH_BATCH_SIZE)
+
+
+def _rebuild_unions(model, key_field: str, grain, rows) -> None:
+    """`rows` : (clé, jour ou début de période, unique_visitors, sketch), triés par clé puis date."""
+    batch = {}
+    for key, group in groupby(rows, key=lambda row: (row[0], period_start(grain, row[1]))):
+        union = batch[key] = VisitorUnion()
+        for *_, unique_visitors, sketch in group:
+            union.add(unique_visitors, sketch)
+        if len(batch) >= SKETCH_BATCH_SIZE:
+            _apply_unions(model, key_field, grain, batch)
+            batch = {}
+    if batch:
+        _apply_unions(model, key_field, grain, batch)
+
+
+def _sketched(queryset, key_lookup: str, date_lookup: str):
+    return (
+        queryset.filter(visitor_sketch__isnull=False)
+        .order_by(key_lookup, date_lookup)
+        .values_list(key_lookup, date_lookup, 'unique_visitors', 'visitor_sketch')
+        .iterator(chunk_size=SKETCH_BATCH_SIZE)
+    )
+
+
+def _rebuild_points(since: Optional[datetime.date]) -> int:
+    created = 0
+    for grain in POINT_GRAINS:
+        days = TouristPointAnalytics.objects.order_by()
+        stale = TouristPointAnalyticsRollup.objects.filter(grain=grain)
+        if since:
+            cutoff = period_start(grain, since)
+            days = days.filter(date__gte=cutoff)
+            stale = stale.filter(period_start__gte=cutoff)
+        stale.delete()
+        rows = days.values(
+            'tourist_point_id', owner=F('tourist_point__owner_id'), start=TRUNCATE[grain]('date'),
+        ).annotate(**_sums())
+        created += _insert(TouristPointAnalyticsRollup, (
+            TouristPointAnalyticsRollup(
+                tourist_point_id=row['tourist_point_id'], owner_id=row['owner'],
+                grain=grain, period_start=row['start'], **_metrics(row),
+            )
+            for row in rows.iterator(chunk_size=BATCH_SIZE)
+        ))
+        _rebuild_unions(
+            TouristPointAnalyticsRollup, 'tourist_point', grain, _sketched(days, 'tourist_point_id', 'date'),
+        )
+    return created
+
+
+def _rebuild_partners(
+    owner_ids: Optional[Iterable], since: Optional[datetime.date], days: Optional[Iterable[datetime.date]] = None,
+) -> int:
+    """`days` : ne recalcule que les périodes contenant ces jours."""
+    created = 0
+    for grain in PARTNER_GRAINS:
+        stale = PartnerAnalyticsRollup.objects.filter(grain=grain)
+        if grain == AnalyticsGrain.DAY:
+            sources = TouristPointAnalytics.objects.order_by()
+            owner_lookup, start_lookup = 'tourist_point__owner_id', 'date'
+        else:
+            sources = TouristPointAnalyticsRollup.objects.filter(grain=grain).order_by()
+            owner_lookup, start_lookup = 'owner_id', 'period_start'
+        if owner_ids is not None:
+            stale = stale.filter(partner_id__in=owner_ids)
+            sources = sources.filter(**{f'{owner_lookup}__in': owner_ids})
+        if since:
+            cutoff = period_start(grain, since)
+            stale = stale.filter(period_start__gte=cutoff)
+            sources = sources.filter(**{f'{start_lookup}__gte': cutoff})
+        if days is not None:
+            starts = {period_start(grain, day) for day in days}
+            stale = stale.filter(period_start__in=starts)
+            sources = sources.filter(**{f'{start_lookup}__in': starts})
+        stale.delete()
+        rows = sources.values(partner=F(owner_lookup), start=F(start_lookup)).annotate(**_sums())
+        created += _insert(PartnerAnalyticsRollup, (
+            PartnerAnalyticsRollup(partner_id=row['partner'], grain=grain, period_start=row['start'], **_metrics(row))
+            for row in rows.iterator(chunk_size=BATCH_SIZE)
+        ))
+        _rebuild_unions(PartnerAnalyticsRollup, 'partner', grain, _sketched(sources, owner_lookup, start_lookup))
+    return created
+
+
+@transaction.atomic
+def rebuild_rollups(since: Optional[datetime.date] = None) -> Tuple[int, int]:
+    """Reconstruit tous les agrégats (ou les périodes à partir de `since`) ; renvoie (POI, partenaires)."""
+    points = _rebuild_points(since)
+    return points, _rebuild_partners(None, since)
+
+
+@transaction.atomic
+def rebuild_partner_rollups(owner_ids: Iterable, days: Optional[Iterable[datetime.date]] = None) -> int:
+    """
+    Recalcule les agrégats des partenaires donnés à partir des agrégats par POI :
+    tous, ou seulement les périodes contenant `days`.
+    """
+    owner_ids = [owner_id for owner_id in set(owner_ids) if owner_id is not None]
+    if days is not None:
+        days = set(days)
+        if not days:
+            return 0
+    return _rebuild_partners(owner_ids, None, days) if owner_ids else 0
+
+
+def _fill(periods: Dict[str, list], first: datetime.date, last: datetime.date, grains) -> None:
+    day = first
+    while day <= last:
+        for grain in grains:
+            if period_start(grain, day) == day and period_end(grain, day) <= last + datetime.timedelta(days=1):
+                periods[grain].append(day)
+                day = period_end(grain, day)
+                break
+
+
+def _cover(start: datetime.date, end: datetime.date) -> Dict[str, list]:
+    """Découpe [start, end] en mois entiers, puis semaines entières et jours pour les bords."""
+    periods = defaultdict(list)
+    months_start = start if start.day == 1 else period_end(AnalyticsGrain.MONTH, start)
+    months_end = months_start
+    while period_end(AnalyticsGrain.MONTH, months_end) <= end + datetime.timedelta(days=1):
+        months_end = period_end(AnalyticsGrain.MONTH, months_end)
+    if months_end == months_start:
+        _fill(periods, start, end, (AnalyticsGrain.WEEK, AnalyticsGrain.DAY))
+        return periods
+    one_day = datetime.timedelta(days=1)
+    _fill(periods, start, months_start - one_day, (AnalyticsGrain.WEEK, AnalyticsGrain.DAY))
+    _fill(periods, months_start, months_end - one_day, (AnalyticsGrain.MONTH,))
+    _fill(periods, months_end, end, (AnalyticsGrain.WEEK, AnalyticsGrain.DAY))
+    return periods
+
+
+def _periods_q(periods: Dict[str, list]) -> Q:
+    query = Q(pk__in=[])
+    for grain, starts in periods.items():
+        query |= Q(grain=grain, period_start__in=starts)
+    return query
+
+
+def unique_visitors_between(
+    start: datetime.date,
+    end: datetime.date,
+    *,
+    partner_id=None,
+    point_ids: Optional[Iterable] = None,
+) -> int:
+    """
+    Visiteurs uniques du `start` au `end` inclus, d'un partenaire (tous ses POI)
+    ou d'un ensemble de POI, par fusion des sketches de la couverture la plus
+    grossière de la plage (30 jours : un mois et quelques jours au plus).
+    """
+    if (partner_id is None) == (point_ids is None):
+        raise ValueError('Indiquer partner_id ou point_ids')
+    periods = _cover(start, end)
+    union = VisitorUnion()
+    if partner_id is not None:
+        sources = [PartnerAnalyticsRollup.objects.filter(_periods_q(periods), partner_id=partner_id)]
+    else:
+        point_ids = list(point_ids)
+        days = periods.pop(AnalyticsGrain.DAY, [])
+        sources = [
+            TouristPointAnalyticsRollup.objects.filter(_periods_q(periods), tourist_point_id__in=point_ids),
+            TouristPointAnalytics.objects.filter(tourist_point_id__in=point_ids, date__in=days),
+        ]
+    for queryset in sources:
+        for unique_visitors, sketch in queryset.order_by().values_list('unique_visitors', 'visitor_sketch'):
+            union.add(unique_visitors, sketch)
+    return union.count()
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import TouristPointAnalytics, TravelAnalytics
+from .models import TouristPointAnalytics, TouristPointAnalyticsRollup, TravelAnalytics
 
 
 class TouristPointAnalyticsSerializer(serializers.ModelSerializer):
@@ -24,6 +24,23 @@ class TouristPointAnalyticsSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'updated_at')
 
 
+class TouristPointAnalyticsRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TouristPointAnalyticsRollup
+        fields = [
+            'tourist_point',
+            'grain',
+            'period_start',
+            'views',
+            'clicks',
+            'bookings',
+            'revenue',
+            'unique_visitors',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+
 class TravelAnalyticsSerializer(serializers.ModelSerializer):
     class Meta:
         model = TravelAnalytics
@@ -1,23 +1,33 @@
+import uuid
 from datetime import timedelta
 
-from django.db.models import Avg, Count, Sum
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, Sum
 from django.db.models.functions import TruncDate
 from django.utils import timezone
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
 from apps.accounts.models import User
+from apps.accounts.session_utils import get_client_ip
 from apps.poi.models import TouristPoint
 
-from .models import TouristPointAnalytics, TravelAnalytics
-from .serializers import TouristPointAnalyticsSerializer, TravelAnalyticsSerializer
+from .ingestion import EVENT_TYPES, event_buffer
+from .models import AnalyticsGrain, TouristPointAnalytics, TouristPointAnalyticsRollup, TravelAnalytics
+from .serializers import (
+    TouristPointAnalyticsRollupSerializer,
+    TouristPointAnalyticsSerializer,
+    TravelAnalyticsSerializer,
+)
 
 
 class TouristPointAnalyticsViewSet(viewsets.ModelViewSet):
     """ViewSet for TouristPointAnalytics - read-only for partners to view their POI analytics"""
-    queryset = TouristPointAnalytics.objects.select_related('tourist_point').all()
+    queryset = TouristPointAnalytics.objects.select_related('tourist_point').defer('visitor_sketch')
     serializer_class = TouristPointAnalyticsSerializer
     permission_classes = [permissions.IsAuthenticated]
     http_method_names = ['get', 'head', 'options']
@@ -47,6 +57,31 @@ class TouristPointAnalyticsViewSet(viewsets.ModelViewSet):
 
         return queryset.order_by('-date')
 
+    @action(detail=False, methods=['get'])
+    def rollups(self, request):
+        """Agrégats hebdomadaires (`?grain=week`, défaut) ou mensuels (`?grain=month`) par POI."""
+        grain = request.query_params.get('grain', AnalyticsGrain.WEEK)
+        if grain not in (AnalyticsGrain.WEEK, AnalyticsGrain.MONTH):
+            return Response({'detail': 'grain doit valoir week ou month'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = TouristPointAnalyticsRollup.objects.filter(grain=grain).defer('visitor_sketch')
+        tourist_point_id = request.query_params.get('tourist_point_id')
+        if tourist_point_id:
+            queryset = queryset.filter(tourist_point_id=tourist_point_id)
+        date_gte = request.query_params.get('date__gte')
+        if date_gte:
+            queryset = queryset.filter(period_start__gte=date_gte)
+        date_lte = request.query_params.get('date__lte')
+        if date_lte:
+            queryset = queryset.filter(period_start__lte=date_lte)
+        if not request.user.is_staff:
+            queryset = queryset.filter(owner=request.user)
+
+        queryset = queryset.order_by('-period_start')
+        page = self.paginate_queryset(queryset)
+        serializer = TouristPointAnalyticsRollupSerializer(page if page is not None else queryset, many=True)
+        return self.get_paginated_response(serializer.data) if page is not None else Response(serializer.data)
+
 
 class TravelAnalyticsViewSet(viewsets.ModelViewSet):
     queryset = TravelAnalytics.objects.all().order_by('-created_at')
@@ -100,6 +135,61 @@ class TravelAnalyticsViewSet(viewsets.ModelViewSet):
         return Response(list(countries))
 
 
+class TouristPointEventIngestView(APIView):
+    """
+    Beacon de vues / clics de POI, par lots.
+
+    Corps : `{"events": [{"tourist_point": "<uuid>", "type": "view"}, ...]}`.
+    Les événements sont cumulés en mémoire et écrits périodiquement
+    (apps.analytics.ingestion) : la requête ne fait aucune écriture SQL.
+
+    Anonyme, donc borné : limite de débit `analytics-events`, un seul événement
+    par (POI, type) et par requête, et visiteur déterminé côté serveur
+    (utilisateur connecté, sinon IP + user-agent), jamais fourni par le client.
+    """
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'analytics-events'
+    MAX_EVENTS = 500
+
+    def post(self, request):
+        payload = request.data if isinstance(request.data, dict) else {'events': request.data}
+        events = payload.get('events')
+        if not isinstance(events, list) or not events:
+            return Response({'detail': 'events doit être une liste non vide'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(events) > self.MAX_EVENTS:
+            return Response(
+                {'detail': f'{self.MAX_EVENTS} événements maximum par lot'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        visitor = self._visitor(request)
+        parsed, rejected = {}, 0
+        for event in events:
+            try:
+                point_id = uuid.UUID(str(event['tourist_point']))
+                kind = event.get('type', 'view')
+            except (KeyError, TypeError, AttributeError, ValueError):
+                rejected += 1
+                continue
+            if kind not in EVENT_TYPES:
+                rejected += 1
+                continue
+            parsed[(point_id, kind)] = (point_id, kind, visitor)
+
+        accepted = event_buffer.add(parsed.values())
+        return Response(
+            {'accepted': accepted, 'duplicates': len(events) - rejected - accepted, 'rejected': rejected},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @staticmethod
+    def _visitor(request) -> str:
+        if request.user.is_authenticated:
+            return f'u:{request.user.pk}'
+        return f"a:{get_client_ip(request)}:{request.META.get('HTTP_USER_AGENT', '')}"
+
+
 def _parse_days_param(request, default: int = 7) -> int:
     raw = request.query_params.get('days')
     if not raw:
@@ -112,30 +202,41 @@ def _parse_days_param(request, default: int = 7) -> int:
 
 
 class BeInspiredOverviewView(APIView):
+    """
+    Vue d'ensemble admin : uniquement des agrégats SQL (aucune ligne de POI
+    chargée), mise en cache `BE_INSPIRED_OVERVIEW_CACHE_TTL` secondes par fenêtre `days`.
+    """
     permission_classes = [permissions.IsAdminUser]
 
     def get(self, request):
         days = _parse_days_param(request, default=30)
-        since = timezone.now() - timedelta(days=days)
+        key = f'analytics:be-inspired:overview:{days}'
+        data = cache.get(key)
+        if data is None:
+            data = self._overview(days)
+            cache.set(key, data, getattr(settings, 'BE_INSPIRED_OVERVIEW_CACHE_TTL', 60))
+        return Response(data)
 
-        pois = TouristPoint.objects.all()
-        total_pois = pois.filter(is_active=True).count()
-        total_reviews = pois.aggregate(total=Sum('review_count'))['total'] or 0
-        avg_rating = pois.aggregate(avg=Avg('rating'))['avg'] or 0
-        total_favorites = sum(int((poi.metadata or {}).get('favorite_count', 0) or 0) for poi in pois)
+    @staticmethod
+    def _overview(days: int) -> dict:
+        since = timezone.now() - timedelta(days=days)
+        poi_totals = TouristPoint.objects.order_by().aggregate(
+            active=Count('pk', filter=Q(is_active=True)),
+            total_favorites=Sum('favorite_count'),
+            total_reviews=Sum('review_count'),
+            avg_rating=Avg('rating'),
+        )
         total_itineraries = TravelAnalytics.objects.filter(created_at__gte=since).count()
         active_users = User.objects.filter(is_active=True).count()
 
-        return Response(
-            {
-                'totalPOIs': total_pois,
-                'totalFavorites': total_favorites,
-                'totalReviews': total_reviews,
-                'totalItineraries': total_itineraries,
-                'avgRating': round(avg_rating or 0, 1),
-                'activeUsers': active_users,
-            }
-        )
+        return {
+            'totalPOIs': poi_totals['active'],
+            'totalFavorites': poi_totals['total_favorites'] or 0,
+            'totalReviews': poi_totals['total_reviews'] or 0,
+            'totalItineraries': total_itineraries,
+            'avgRating': round(float(poi_totals['avg_rating'] or 0), 1),
+            'activeUsers': active_users,
+        }
 
 
 class BeInspiredPOIStatsView(APIView):
@@ -148,21 +249,21 @@ class BeInspiredPOIStatsView(APIView):
 
         pois = (
             TouristPoint.objects.prefetch_related('tags')
+            .defer('metadata', 'search_vector')
             .filter(created_at__gte=since)
             .order_by('-rating', '-review_count', '-created_at')[:limit]
         )
 
         data = []
         for poi in pois:
-            metadata = poi.metadata or {}
             data.append(
                 {
                     'id': str(poi.id),
                     'name': poi.name,
                     'rating': float(poi.rating or 0),
                     'review_count': poi.review_count,
-                    'favorite_count': int(metadata.get('favorite_count', 0) or 0),
-                    'view_count': int(metadata.get('view_count', metadata.get('views', 0)) or 0),
+                    'favorite_count': poi.favorite_count,
+                    'view_count': poi.view_count,
                     'created_at': poi.created_at,
                     'is_active': poi.is_active,
                     'is_verified': poi.is_verified,
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Booking, RatePlan, Room
+from .models import Booking, IdempotencyKey, RatePlan, Room, RoomBlock
 
 
 class RatePlanInline(admin.TabularInline):
@@ -8,10 +8,15 @@ class RatePlanInline(admin.TabularInline):
     extra = 0
 
 
+class RoomBlockInline(admin.TabularInline):
+    model = RoomBlock
+    extra = 0
+
+
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
     list_display = ('name', 'tourist_point', 'capacity', 'base_price')
-    inlines = [RatePlanInline]
+    inlines = [RatePlanInline, RoomBlockInline]
 
 
 @admin.register(RatePlan)
@@ -19,8 +24,21 @@ class RatePlanAdmin(admin.ModelAdmin):
     list_display = ('name', 'room', 'code', 'is_refundable')
 
 
+@admin.register(RoomBlock)
+class RoomBlockAdmin(admin.ModelAdmin):
+    list_display = ('room', 'start_date', 'end_date', 'reason')
+    search_fields = ('room__name', 'reason')
+
+
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ('room', 'user', 'status', 'check_in', 'check_out', 'total_amount')
     list_filter = ('status',)
     search_fields = ('room__name', 'user__username')
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('key', 'user', 'booking', 'created_at')
+    search_fields = ('key', 'user__username')
+    raw_id_fields = ('user', 'booking')
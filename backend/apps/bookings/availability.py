@@ -0,0 +1,98 @@
+"""
+Recherche de disponibilité multi-hébergements.
+
+Une seule requête SQL : les chambres assez grandes des POI actifs, sans
+réservation active (`pending`, `confirmed`) ni blocage qui chevauche le séjour
+(`NOT EXISTS` sur les index (room, check_in, check_out) et (room, start_date,
+end_date)), puis une fonction fenêtre par POI pour garder la chambre la moins
+chère et compter les chambres libres.
+
+Chevauchement : une réservation [check_in, check_out) gêne le séjour
+[arrivée, départ) si check_in < départ et check_out > arrivée ; un blocage
+[start_date, end_date] (bornes incluses) si start_date < départ et end_date >= arrivée.
+"""
+from __future__ import annotations
+
+import datetime
+from typing import Iterable, List, Optional
+
+from django.db.models import Count, Exists, F, OuterRef, Window
+from django.db.models.functions import RowNumber
+
+from apps.poi.geo import radius_filter
+from apps.poi.models import TouristPoint
+
+from .models import Booking, Room, RoomBlock
+
+
+def overlapping_bookings(check_in: datetime.date, check_out: datetime.date):
+    return Booking.objects.filter(
+        room=OuterRef('pk'),
+        status__in=Booking.ACTIVE_STATUSES,
+        check_in__lt=check_out,
+        check_out__gt=check_in,
+    )
+
+
+def overlapping_blocks(check_in: datetime.date, check_out: datetime.date):
+    return RoomBlock.objects.filter(room=OuterRef('pk'), start_date__lt=check_out, end_date__gte=check_in)
+
+
+def available_rooms(check_in: datetime.date, check_out: datetime.date, guests: int = 1):
+    """Chambres libres sur tout le séjour pour `guests` personnes."""
+    return (
+        Room.objects.filter(capacity__gte=guests, tourist_point__is_active=True)
+        .filter(~Exists(overlapping_bookings(check_in, check_out)))
+        .filter(~Exists(overlapping_blocks(check_in, check_out)))
+    )
+
+
+def search_availability(
+    check_in: datetime.date,
+    check_out: datetime.date,
+    guests: int = 1,
+    tourist_point_ids: Optional[Iterable] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius_km: Optional[float] = None,
+    max_price=None,
+    limit: int = 50,
+) -> List[dict]:
+    """POI ayant au moins une chambre libre, avec leur chambre la moins chère, triés par prix."""
+    nights = (check_out - check_in).days
+    rooms = available_rooms(check_in, check_out, guests)
+    if tourist_point_ids is not None:
+        rooms = rooms.filter(tourist_point_id__in=list(tourist_point_ids))
+    if latitude is not None and longitude is not None and radius_km:
+        nearby = TouristPoint.objects.filter(radius_filter(latitude, longitude, radius_km)).values('pk')
+        rooms = rooms.filter(tourist_point_id__in=nearby)
+    if max_price is not None:
+        rooms = rooms.filter(base_price__lte=max_price)
+
+    partition = [F('tourist_point_id')]
+    cheapest = (
+        rooms.annotate(
+            price_rank=Window(RowNumber(), partition_by=partition, order_by=[F('base_price').asc(), F('pk').asc()]),
+            available_rooms=Window(Count('pk'), partition_by=partition),
+        )
+        .filter(price_rank=1)
+        .order_by('base_price', 'tourist_point_id')
+        .values_list(
+            'tourist_point_id', 'tourist_point__name', 'pk', 'name', 'capacity', 'base_price', 'available_rooms',
+        )[:limit]
+    )
+    return [
+        {
+            'tourist_point_id': str(point_id),
+            'tourist_point_name': point_name,
+            'available_rooms': count,
+            'room': {
+                'id': room_id,
+                'name': room_name,
+                'capacity': capacity,
+                'base_price': float(base_price),
+                'total_price': float(base_price * nights),
+            },
+        }
+        for point_id, point_name, room_id, room_name, capacity, base_price, count in cheapest
+    ]
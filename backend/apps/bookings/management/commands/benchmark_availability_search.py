@@ -0,0 +1,156 @@
+"""
+Benchmark de la recherche de disponibilité multi-hébergements.
+
+Génère des POI, des chambres et un an de réservations (environ 60 %
+d'occupation) plus quelques blocages, dans une transaction annulée à la fin.
+Mesure `search_availability` sur des séjours aléatoires et vérifie le résultat
+contre un calcul en mémoire sur les données générées.
+
+Usage:
+    docker-compose exec backend python manage.py benchmark_availability_search --rooms 10000 --days 365
+"""
+import datetime
+import random
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.bookings.availability import search_availability
+from apps.bookings.models import Booking, Room, RoomBlock
+from apps.poi.models import TouristPoint
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Mesure la latence de la recherche de chambres libres sur de nombreux hébergements'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=10_000, help='Nombre de chambres')
+        parser.add_argument('--rooms-per-poi', type=int, default=5, help='Chambres par hébergement')
+        parser.add_argument('--days', type=int, default=365, help='Horizon des réservations (jours)')
+        parser.add_argument('--queries', type=int, default=100, help='Nombre de recherches mesurées')
+        parser.add_argument('--verify', type=int, default=5, help='Recherches vérifiées en mémoire')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            state = self._populate(rng, options)
+            self._run(rng, state, options)
+            transaction.set_rollback(True)
+
+    def _populate(self, rng, options):
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        owner = User.objects.create(username=f'bench-{suffix}', email=f'bench-{suffix}@example.com')
+        start = datetime.date.today()
+        days = options['days']
+        room_count = options['rooms']
+        point_count = max(1, room_count // options['rooms_per_poi'])
+
+        self.stdout.write(f'Création de {point_count} hébergements et {room_count} chambres...')
+        points = TouristPoint.objects.bulk_create(
+            [
+                TouristPoint(owner=owner, name=f'Bench hôtel {index}', latitude=0, longitude=0,
+                             is_active=True, is_accommodation=True)
+                for index in range(point_count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        rooms = Room.objects.bulk_create(
+            [
+                Room(
+                    tourist_point=points[index % point_count], name=f'Chambre {index}',
+                    capacity=rng.randint(1, 5), base_price=Decimal(rng.randint(40, 400)),
+                )
+                for index in range(room_count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        self.stdout.write(f'Génération des réservations sur {days} jours...')
+        started = time.perf_counter()
+        busy = defaultdict(list)  # room_id -> [(début, fin exclue)]
+        bookings, blocks, booking_total = [], [], 0
+        for room in rooms:
+            day = rng.randint(0, 5)
+            while day < days:
+                length = rng.randint(1, 7)
+                check_in = start + datetime.timedelta(days=day)
+                check_out = check_in + datetime.timedelta(days=length)
+                status = 'cancelled' if rng.random() < 0.1 else rng.choice(Booking.ACTIVE_STATUSES)
+                bookings.append(Booking(
+                    room=room, user=owner, check_in=check_in, check_out=check_out,
+                    total_amount=room.base_price * length, status=status,
+                ))
+                booking_total += 1
+                if status in Booking.ACTIVE_STATUSES:
+                    busy[room.pk].append((check_in, check_out))
+                day += length + rng.randint(0, 5)
+                if len(bookings) >= BATCH_SIZE:
+                    Booking.objects.bulk_create(bookings)
+                    bookings = []
+            if rng.random() < 0.05:
+                block_start = start + datetime.timedelta(days=rng.randint(0, days - 1))
+                block_end = block_start + datetime.timedelta(days=rng.randint(0, 14))
+                blocks.append(RoomBlock(room=room, start_date=block_start, end_date=block_end))
+                busy[room.pk].append((block_start, block_end + datetime.timedelta(days=1)))
+        Booking.objects.bulk_create(bookings)
+        RoomBlock.objects.bulk_create(blocks, batch_size=BATCH_SIZE)
+        self.stdout.write(
+            f'{booking_total} réservations, {len(blocks)} blocages en {time.perf_counter() - started:.1f} s'
+        )
+        return {'start': start, 'days': days, 'points': points, 'rooms': rooms, 'busy': busy}
+
+    def _expected(self, state, check_in, check_out, guests):
+        best = {}
+        counts = defaultdict(int)
+        for room in state['rooms']:
+            if room.capacity < guests:
+                continue
+            if any(busy_in < check_out and busy_out > check_in for busy_in, busy_out in state['busy'][room.pk]):
+                continue
+            point_id = room.tourist_point_id
+            counts[point_id] += 1
+            current = best.get(point_id)
+            if current is None or (room.base_price, room.pk) < (current.base_price, current.pk):
+                best[point_id] = room
+        ranked = sorted(best.values(), key=lambda room: (room.base_price, room.tourist_point_id))
+        return [(str(room.tourist_point_id), room.pk, counts[room.tourist_point_id]) for room in ranked]
+
+    def _random_stay(self, rng, state):
+        check_in = state['start'] + datetime.timedelta(days=rng.randint(0, state['days'] - 8))
+        return check_in, check_in + datetime.timedelta(days=rng.randint(1, 7)), rng.randint(1, 4)
+
+    def _run(self, rng, state, options):
+        # Vérification limitée aux POI générés (la base peut contenir d'autres chambres).
+        point_ids = [point.pk for point in state['points']]
+        for _ in range(options['verify']):
+            check_in, check_out, guests = self._random_stay(rng, state)
+            got = [
+                (row['tourist_point_id'], row['room']['id'], row['available_rooms'])
+                for row in search_availability(check_in, check_out, guests, tourist_point_ids=point_ids, limit=50)
+            ]
+            if got != self._expected(state, check_in, check_out, guests)[:50]:
+                raise CommandError(f'Résultat incorrect pour {check_in} → {check_out}, {guests} pers.')
+        self.stdout.write(f'{options["verify"]} recherches vérifiées en mémoire.')
+
+        timings = []
+        for _ in range(options['queries']):
+            check_in, check_out, guests = self._random_stay(rng, state)
+            started = time.perf_counter()
+            results = search_availability(check_in, check_out, guests, limit=50)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(state["rooms"])} chambres : p50 {statistics.median(timings):.1f} ms, '
+            f'p95 {p95:.1f} ms, max {timings[-1]:.1f} ms ({len(results)} POI au dernier appel)'
+        ))
@@ -0,0 +1,139 @@
+"""
+Test de charge de la création de réservations (BookingViewSet.create).
+
+Lance N requêtes simultanées (un thread et une connexion chacune) sur la même
+chambre, en deux phases :
+
+1. dates qui se chevauchent, clés Idempotency-Key distinctes : exactement une
+   réservation doit être créée, les autres requêtes reçoivent 409 ;
+2. même requête et même clé Idempotency-Key (nouvel essai client) : une seule
+   réservation, toutes les réponses portent le même identifiant.
+
+Les données de test sont validées (visibles des autres connexions) puis
+supprimées. À lancer sur PostgreSQL : SQLite sérialise les écritures.
+
+Usage:
+    docker-compose exec backend python manage.py loadtest_booking_creation --requests 200
+"""
+import datetime
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.bookings.models import Booking, Room
+from apps.bookings.views import BookingViewSet
+from apps.poi.models import TouristPoint
+
+
+class Command(BaseCommand):
+    help = 'Requêtes de réservation simultanées sur une chambre : aucun double booking, aucun doublon'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requêtes simultanées par phase')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                'Base non PostgreSQL : écritures sérialisées, erreurs de verrou possibles.'
+            ))
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create(username=f'load-{suffix}', email=f'load-{suffix}@example.com')
+        point = TouristPoint.objects.create(owner=user, name=f'Load hôtel {suffix}', latitude=0, longitude=0)
+        room = Room.objects.create(tourist_point=point, name='Chambre', base_price=Decimal('100'))
+        try:
+            self._overlap_phase(user, room, options['requests'])
+            self._idempotency_phase(user, room, options['requests'])
+        finally:
+            Booking.objects.filter(room=room).delete()
+            point.delete()
+            user.delete()
+
+    def _fire(self, user, payloads):
+        """Envoie les requêtes en même temps ; retourne [(statut, corps, en-têtes, ms)]."""
+        view = BookingViewSet.as_view({'post': 'create'})
+        factory = APIRequestFactory()
+        barrier = threading.Barrier(len(payloads))
+        results = [None] * len(payloads)
+
+        def worker(index, payload, key):
+            try:
+                request = factory.post(
+                    '/api/v1/bookings/reservations/', payload, format='json', HTTP_IDEMPOTENCY_KEY=key,
+                )
+                force_authenticate(request, user=user)
+                barrier.wait()
+                started = time.perf_counter()
+                response = view(request)
+                response.render()
+                results[index] = (
+                    response.status_code, response.data, response.get('Idempotent-Replayed'),
+                    (time.perf_counter() - started) * 1000,
+                )
+            except Exception as exc:  # noqa: BLE001 - remonté dans le rapport
+                results[index] = ('error', repr(exc), None, 0.0)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, args=(index, payload, key))
+            for index, (payload, key) in enumerate(payloads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _report(self, label, results):
+        statuses = Counter(result[0] for result in results)
+        timings = sorted(result[3] for result in results if result[0] != 'error')
+        p95 = timings[int(len(timings) * 0.95) - 1] if timings else 0.0
+        self.stdout.write(
+            f'{label} : {dict(statuses)} - p50 {statistics.median(timings or [0]):.1f} ms, p95 {p95:.1f} ms'
+        )
+        errors = [result[1] for result in results if result[0] == 'error' or result[0] >= 500]
+        if errors:
+            raise CommandError(f'{len(errors)} requête(s) en erreur : {errors[0]}')
+        return statuses
+
+    def _overlap_phase(self, user, room, count):
+        start = datetime.date.today() + datetime.timedelta(days=30)
+        payloads = []
+        for index in range(count):
+            check_in = start + datetime.timedelta(days=index % 3)
+            payloads.append(({
+                'room': room.pk, 'check_in': check_in.isoformat(),
+                'check_out': (check_in + datetime.timedelta(days=3)).isoformat(),
+                'guests': 2, 'total_amount': '300.00', 'status': 'confirmed',
+            }, f'overlap-{index}'))
+        statuses = self._report('Chevauchements', self._fire(user, payloads))
+        active = Booking.objects.filter(room=room, status__in=Booking.ACTIVE_STATUSES)
+        if statuses[201] != 1 or active.count() != 1:
+            raise CommandError(f'Double booking : {statuses[201]} réponses 201, {active.count()} réservations actives')
+
+    def _idempotency_phase(self, user, room, count):
+        check_in = datetime.date.today() + datetime.timedelta(days=90)
+        payload = {
+            'room': room.pk, 'check_in': check_in.isoformat(),
+            'check_out': (check_in + datetime.timedelta(days=2)).isoformat(),
+            'guests': 1, 'total_amount': '200.00',
+        }
+        results = self._fire(user, [(payload, 'retry-key')] * count)
+        statuses = self._report('Même Idempotency-Key', results)
+        booking_ids = {result[1]['id'] for result in results if result[0] == 201}
+        replayed = sum(1 for result in results if result[2] == 'true')
+        stored = Booking.objects.filter(room=room, check_in=check_in).count()
+        if statuses[201] != count or len(booking_ids) != 1 or stored != 1 or replayed != count - 1:
+            raise CommandError(
+                f'Doublons : {len(booking_ids)} identifiants, {stored} réservations, {replayed} rejouées'
+            )
+        self.stdout.write(self.style.SUCCESS('Aucun double booking, aucun doublon sur nouvel essai.'))
@@ -0,0 +1,25 @@
+"""
+Supprime les clés `Idempotency-Key` de réservation expirées.
+
+Une clé n'est rejouable que `BOOKING_IDEMPOTENCY_KEY_TTL_HOURS` heures
+(24 par défaut) ; au-delà, elle est ignorée par la création de réservation et
+peut être supprimée. À planifier (cron) au moins une fois par jour.
+
+Usage:
+    docker-compose exec backend python manage.py purge_idempotency_keys
+    docker-compose exec backend python manage.py purge_idempotency_keys --batch-size 5000
+"""
+from django.core.management.base import BaseCommand
+
+from apps.bookings.services import purge_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = 'Supprime les clés Idempotency-Key de réservation expirées'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Clés supprimées par requête')
+
+    def handle(self, *args, **options):
+        deleted = purge_idempotency_keys(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{deleted} clé(s) Idempotency-Key expirée(s) supprimée(s)'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_alter_booking_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['start_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=['room', 'check_in', 'check_out'], name='booking_room_stay_active_idx'),
+        ),
+        migrations.AddField(
+            model_name='roomblock',
+            name='room',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocks', to='bookings.room'),
+        ),
+        migrations.AddIndex(
+            model_name='roomblock',
+            index=models.Index(fields=['room', 'start_date', 'end_date'], name='roomblock_room_dates_idx'),
+        ),
+    ]
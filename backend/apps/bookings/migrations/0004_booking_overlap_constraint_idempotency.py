@@ -0,0 +1,83 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:23
+
+"""
+Contrainte d'exclusion (btree_gist) contre le double booking d'une chambre,
+sur PostgreSQL uniquement (extension et contrainte ignorées ailleurs).
+
+La migration s'arrête si la base contient déjà des réservations actives qui
+se chevauchent ou des séjours vides : à corriger avant de relancer.
+"""
+import apps.bookings.models
+import django.contrib.postgres.fields.ranges
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+from django.db.models import Exists, F, OuterRef
+
+ACTIVE_STATUSES = ['pending', 'confirmed']
+
+
+def check_existing_bookings(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    invalid = list(Booking.objects.filter(check_out__lte=F('check_in')).values_list('pk', flat=True)[:20])
+    overlapping = Booking.objects.filter(
+        room=OuterRef('room'),
+        status__in=ACTIVE_STATUSES,
+        check_in__lt=OuterRef('check_out'),
+        check_out__gt=OuterRef('check_in'),
+    ).exclude(pk=OuterRef('pk'))
+    conflicts = list(
+        Booking.objects.filter(status__in=ACTIVE_STATUSES)
+        .filter(Exists(overlapping))
+        .values_list('pk', flat=True)[:20]
+    )
+    if invalid or conflicts:
+        raise RuntimeError(
+            'Réservations à corriger avant la contrainte anti-chevauchement : '
+            f'séjours vides {invalid}, chevauchements {conflicts}.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_room_blocks_and_stay_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(check_existing_bookings, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('request_hash', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=apps.bookings.models.PostgresExclusionConstraint(condition=models.Q(('status__in', ['pending', 'confirmed'])), expressions=[(models.F('room'), '='), (apps.bookings.models.StayRange('check_in', 'check_out', django.contrib.postgres.fields.ranges.RangeBoundary()), '&&')], name='booking_room_no_overlap', violation_error_message='Cette chambre est déjà réservée sur ces dates.'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.CheckConstraint(condition=models.Q(('check_out__gt', models.F('check_in'))), name='booking_check_out_after_check_in'),
+        ),
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='booking',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='idempotency_keys', to='bookings.booking'),
+        ),
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='idempotency_keys', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('user', 'key'), name='bookings_idempotency_user_key'),
+        ),
+    ]
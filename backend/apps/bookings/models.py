@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeBoundary, RangeOperators
+from django.db import DEFAULT_DB_ALIAS, connections, models
 
 from apps.poi.models import TouristPoint
 
@@ -34,6 +36,41 @@ class RatePlan(models.Model):
         unique_together = ('room', 'code')
 
 
+class StayRange(models.Func):
+    function = 'DATERANGE'
+    output_field = DateRangeField()
+
+
+class PostgresExclusionConstraint(ExclusionConstraint):
+    """
+    Contrainte d'exclusion créée et vérifiée sur PostgreSQL uniquement.
+
+    Les autres bases (SQLite en développement) n'ont ni `EXCLUDE` ni `DATERANGE` :
+    la contrainte y est ignorée, `BookingService` sérialisant déjà les écritures
+    d'une chambre sous `SELECT ... FOR UPDATE`.
+    """
+
+    def constraint_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().constraint_sql(model, schema_editor)
+
+    def create_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().create_sql(model, schema_editor)
+
+    def remove_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return None
+        return super().remove_sql(model, schema_editor)
+
+    def validate(self, model, instance, exclude=None, using=DEFAULT_DB_ALIAS):
+        if connections[using].vendor != 'postgresql':
+            return
+        super().validate(model, instance, exclude=exclude, using=using)
+
+
 class Booking(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -53,5 +90,78 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    ACTIVE_STATUSES = ('pending', 'confirmed')
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Listes paginées par curseur : réservations d'un client, ou toutes (staff).
+            models.Index(fields=['user', '-created_at', '-id'], name='booking_user_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='booking_created_idx'),
+            # Recherche de chevauchement : room = ? AND check_in < départ AND check_out > arrivée.
+            models.Index(
+                fields=['room', 'check_in', 'check_out'],
+                name='booking_room_stay_active_idx',
+                condition=models.Q(status__in=['pending', 'confirmed']),
+            ),
+        ]
+        constraints = [
+            # Filet de sécurité en base : deux réservations actives d'une même
+            # chambre ne peuvent pas se chevaucher (daterange [arrivée, départ)).
+            PostgresExclusionConstraint(
+                name='booking_room_no_overlap',
+                expressions=[
+                    (models.F('room'), RangeOperators.EQUAL),
+                    (StayRange('check_in', 'check_out', RangeBoundary()), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                violation_error_message='Cette chambre est déjà réservée sur ces dates.',
+            ),
+            models.CheckConstraint(
+                condition=models.Q(check_out__gt=models.F('check_in')),
+                name='booking_check_out_after_check_in',
+            ),
+        ]
+
+
+class RoomBlock(models.Model):
+    """Dates fermées à la vente pour une chambre (travaux, usage privé...), bornes incluses."""
+
+    room = models.ForeignKey(Room, related_name='blocks', on_delete=models.CASCADE)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    reason = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['start_date']
+        indexes = [models.Index(fields=['room', 'start_date', 'end_date'], name='roomblock_room_dates_idx')]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.room.name} : {self.start_date} → {self.end_date}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Clé `Idempotency-Key` d'une création de réservation : un nouvel essai renvoie la même réservation.
+
+    Conservée `BOOKING_IDEMPOTENCY_KEY_TTL_HOURS` heures (24 par défaut) ; au-delà la clé est
+    ignorée, et supprimée par `manage.py purge_idempotency_keys`.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='idempotency_keys', on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    booking = models.ForeignKey(Booking, related_name='idempotency_keys', null=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='bookings_idempotency_user_key'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='bookings_idempotency_age_idx'),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.key
@@ -5,6 +5,7 @@ from rest_framework import serializers
 from apps.accounts.serializers import UserSerializer
 from apps.poi.serializers import TouristPointSerializer
 from .models import Booking, RatePlan, Room
+from .services import BookingService
 
 
 class RatePlanSerializer(serializers.ModelSerializer):
@@ -47,6 +48,16 @@ class BookingSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ('created_at', 'updated_at', 'user', 'user_detail')
 
+    def validate(self, attrs):
+        check_in = attrs.get('check_in', getattr(self.instance, 'check_in', None))
+        check_out = attrs.get('check_out', getattr(self.instance, 'check_out', None))
+        if check_in and check_out and check_out <= check_in:
+            raise serializers.ValidationError({'check_out': 'La date de départ doit suivre la date d’arrivée.'})
+        return attrs
+
     def create(self, validated_data):  # type: ignore[override]
-        validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
+        booking, _ = BookingService.create_booking(self.context['request'].user, validated_data)
+        return booking
+
+    def update(self, instance, validated_data):  # type: ignore[override]
+        return BookingService.update_booking(instance, validated_data)
@@ -0,0 +1,156 @@
+"""
+Création et modification des réservations sans double booking.
+
+Chaque écriture verrouille la ligne de la chambre (`SELECT ... FOR UPDATE`) :
+les réservations concurrentes d'une même chambre sont sérialisées, celles de
+chambres différentes restent parallèles. Sous ce verrou, le chevauchement est
+vérifié sur l'index (room, check_in, check_out) ; la contrainte d'exclusion
+`booking_room_no_overlap` reste le filet de sécurité en base.
+
+Avec une clé `Idempotency-Key`, un nouvel essai de la même requête renvoie la
+réservation déjà créée au lieu d'en créer une seconde, pendant
+`BOOKING_IDEMPOTENCY_KEY_TTL_HOURS` heures ; une clé plus ancienne est
+considérée comme neuve et les clés expirées sont purgées par
+`manage.py purge_idempotency_keys`.
+"""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Booking, IdempotencyKey, Room
+
+
+class BookingConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Cette chambre est déjà réservée sur ces dates.'
+    default_code = 'booking_conflict'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'Cette clé Idempotency-Key a déjà été utilisée pour une autre requête.'
+    default_code = 'idempotency_key_reused'
+
+
+def request_fingerprint(data: dict) -> str:
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def idempotency_cutoff() -> datetime.datetime:
+    """Les clés créées avant cette date ont expiré."""
+    return timezone.now() - datetime.timedelta(hours=getattr(settings, 'BOOKING_IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
+
+def purge_idempotency_keys(batch_size: int = 1000) -> int:
+    """Supprime les clés expirées par lots ; renvoie le nombre de clés supprimées."""
+    expired = IdempotencyKey.objects.filter(created_at__lt=idempotency_cutoff()).order_by('pk')
+    deleted = 0
+    while True:
+        ids = list(expired.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(pk__in=ids).delete()[0]
+
+
+class BookingService:
+    """Pipeline de réservation : verrou par chambre, contrôle de chevauchement, idempotence."""
+
+    @staticmethod
+    def overlapping(room_id, check_in, check_out, exclude_pk=None):
+        queryset = Booking.objects.filter(
+            room_id=room_id,
+            status__in=Booking.ACTIVE_STATUSES,
+            check_in__lt=check_out,
+            check_out__gt=check_in,
+        )
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        return queryset
+
+    @staticmethod
+    def _lock_room(room_id) -> None:
+        Room.objects.select_for_update().filter(pk=room_id).values_list('pk', flat=True).first()
+
+    @classmethod
+    def _check_available(cls, room_id, check_in, check_out, booking_status, exclude_pk=None) -> None:
+        if booking_status not in Booking.ACTIVE_STATUSES:
+            return
+        if cls.overlapping(room_id, check_in, check_out, exclude_pk).exists():
+            raise BookingConflict()
+
+    @classmethod
+    def create_booking(cls, user, data: dict, idempotency_key: Optional[str] = None) -> Tuple[Booking, bool]:
+        """
+        Crée la réservation décrite par `data` (champs validés du serializer).
+        Retourne `(booking, created)` ; `created` est faux pour un nouvel essai idempotent.
+        """
+        fingerprint = request_fingerprint({**data, 'room': data['room'].pk}) if idempotency_key else ''
+        try:
+            with transaction.atomic():
+                cls._lock_room(data['room'].pk)
+                if idempotency_key:
+                    existing = (
+                        IdempotencyKey.objects.select_for_update()
+                        .select_related('booking')
+                        .filter(user=user, key=idempotency_key)
+                        .first()
+                    )
+                    if existing is not None and existing.created_at < idempotency_cutoff():
+                        # Expirée (pas encore purgée) : la clé redevient libre.
+                        existing.delete()
+                        existing = None
+                    if existing is not None:
+                        if existing.request_hash != fingerprint or existing.booking is None:
+                            raise IdempotencyKeyReused()
+                        return existing.booking, False
+
+                cls._check_available(
+                    data['room'].pk, data['check_in'], data['check_out'], data.get('status', 'pending'),
+                )
+                booking = Booking.objects.create(**{**data, 'user': user})
+                if idempotency_key:
+                    IdempotencyKey.objects.create(
+                        user=user, key=idempotency_key, request_hash=fingerprint, booking=booking,
+                    )
+                return booking, True
+        except IntegrityError:
+            # Même clé envoyée en parallèle sur une autre chambre, ou contrainte d'exclusion.
+            if idempotency_key:
+                existing = IdempotencyKey.objects.select_related('booking').filter(
+                    user=user, key=idempotency_key,
+                ).first()
+                if existing is not None:
+                    if existing.request_hash != fingerprint or existing.booking is None:
+                        raise IdempotencyKeyReused()
+                    return existing.booking, False
+            raise BookingConflict()
+
+    @classmethod
+    def update_booking(cls, booking: Booking, data: dict) -> Booking:
+        """Modifie dates, chambre ou statut en revérifiant la disponibilité sous verrou."""
+        room_id = data['room'].pk if 'room' in data else booking.room_id
+        try:
+            with transaction.atomic():
+                rooms = sorted({room_id, booking.room_id})
+                for locked_room in rooms:
+                    cls._lock_room(locked_room)
+                for attr, value in data.items():
+                    setattr(booking, attr, value)
+                cls._check_available(
+                    room_id, booking.check_in, booking.check_out, booking.status, exclude_pk=booking.pk,
+                )
+                booking.save()
+        except IntegrityError:
+            raise BookingConflict()
+        return booking
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import uuid
+from decimal import Decimal, InvalidOperation
+
 from django.db.models import Q
-from rest_framework import permissions, viewsets
+from django.utils.dateparse import parse_date
+from rest_framework import permissions, status, viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from .availability import search_availability
 from .models import Booking, RatePlan, Room
+from .services import BookingService
 from .serializers import BookingSerializer, RatePlanSerializer, RoomSerializer
 
 
@@ -51,3 +59,68 @@ class BookingViewSet(viewsets.ModelViewSet):
         if scope == 'partner':
             return qs.filter(partner_filter)
         return qs.filter(Q(user=user) | partner_filter)
+
+    def create(self, request, *args, **kwargs):
+        idempotency_key = request.headers.get('Idempotency-Key') or None
+        if idempotency_key and len(idempotency_key) > 255:
+            return Response({'detail': 'Idempotency-Key trop longue'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        booking, created = BookingService.create_booking(
+            request.user, serializer.validated_data, idempotency_key=idempotency_key,
+        )
+        response = Response(self.get_serializer(booking).data, status=status.HTTP_201_CREATED)
+        if not created:
+            response['Idempotent-Replayed'] = 'true'
+        return response
+
+
+class RoomAvailabilitySearchView(APIView):
+    """POI ayant une chambre libre pour ces dates et ce nombre de personnes (chambre la moins chère)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 200
+    MAX_NIGHTS = 90
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            check_in = parse_date(params.get('check_in') or '')
+            check_out = parse_date(params.get('check_out') or '')
+        except ValueError:
+            # Date bien formée mais impossible (2026-02-30)
+            return Response({'detail': 'Dates de séjour invalides'}, status=status.HTTP_400_BAD_REQUEST)
+        if not check_in or not check_out:
+            return Response({'detail': 'check_in et check_out requis'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < (check_out - check_in).days <= self.MAX_NIGHTS:
+            return Response({'detail': 'Dates de séjour invalides'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            guests = max(1, int(params.get('guests', 1)))
+            limit = max(1, min(int(params.get('limit', self.DEFAULT_LIMIT)), self.MAX_LIMIT))
+            point_ids = [uuid.UUID(value.strip()) for value in params.get('tourist_points', '').split(',') if value.strip()]
+            max_price = Decimal(params['max_price']) if params.get('max_price') else None
+            latitude = float(params['lat']) if params.get('lat') else None
+            longitude = float(params['lng']) if params.get('lng') else None
+            radius_km = float(params.get('radius_km', 30))
+        except (ValueError, InvalidOperation):
+            return Response({'detail': 'Paramètres invalides'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = search_availability(
+            check_in,
+            check_out,
+            guests=guests,
+            tourist_point_ids=point_ids or None,
+            latitude=latitude,
+            longitude=longitude,
+            radius_km=radius_km,
+            max_price=max_price,
+            limit=limit,
+        )
+        return Response({
+            'check_in': check_in.isoformat(),
+            'check_out': check_out.isoformat(),
+            'nights': (check_out - check_in).days,
+            'guests': guests,
+            'results': results,
+        })
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_saveditinerary'),
+        ('poi', '0017_cursor_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='discoveryitinerary',
+            index=models.Index(fields=['is_public', '-created_at', '-id'], name='itinerary_public_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='saveditinerary',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='saved_itinerary_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(fields=['is_public', '-created_at', '-id'], name='story_public_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='story_author_created_idx'),
+        ),
+    ]
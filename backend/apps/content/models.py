@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from django.conf import settings
 from django.db import models
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
 
 from apps.poi.models import TouristPoint
 
@@ -34,6 +36,11 @@ class Story(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Listes paginées par curseur (created_at, id).
+            models.Index(fields=['is_public', '-created_at', '-id'], name='story_public_created_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='story_author_created_idx'),
+        ]
 
 
 class StoryMedia(models.Model):
@@ -118,6 +125,9 @@ class DiscoveryItinerary(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_public', '-created_at', '-id'], name='itinerary_public_created_idx'),
+        ]
 
 
 class SavedItinerary(models.Model):
@@ -134,6 +144,22 @@ class SavedItinerary(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='saved_itinerary_user_idx'),
+        ]
 
     def __str__(self):  # pragma: no cover
         return self.title
+
+
+@receiver(post_save, sender=StoryLike)
+def taste_profile_like_added(sender, instance: StoryLike, created: bool, **kwargs):
+    if created and not kwargs.get('raw'):
+        from apps.accounts.services import TasteProfileService
+        TasteProfileService.like_added(instance.user_id, instance.story_id)
+
+
+@receiver(pre_delete, sender=StoryLike)
+def taste_profile_like_removed(sender, instance: StoryLike, **kwargs):
+    from apps.accounts.services import TasteProfileService
+    TasteProfileService.like_removed(instance.user_id, instance.story_id)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from rest_framework import serializers
 
+from apps.core.sparse_fields import SparseFieldsetsMixin
 from .models import (
     AdvertisementSetting,
     DiscoveryItinerary,
@@ -55,7 +56,7 @@ class AdvertisementSettingSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'updated_at')
 
 
-class StorySerializer(serializers.ModelSerializer):
+class StorySerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     media = StoryMediaSerializer(many=True, read_only=True)
     comments = StoryCommentSerializer(many=True, read_only=True)
     author_name = serializers.CharField(source='author.display_name', read_only=True)
@@ -110,6 +111,7 @@ class StorySerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         )
+        expandable_fields = ('comments', 'travel_story_links')
 
     def create(self, validated_data):
         links = validated_data.pop('links', [])
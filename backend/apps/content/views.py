@@ -9,6 +9,9 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.accounts.models import UserProfile
+from apps.core.sparse_fields import SparseFieldsetsViewMixin
+
 from .models import (
     AdvertisementSetting,
     DiscoveryItinerary,
@@ -27,7 +30,7 @@ from .serializers import (
 )
 
 
-class StoryViewSet(viewsets.ModelViewSet):
+class StoryViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     serializer_class = StorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filterset_fields = ['is_public', 'story_type', 'is_featured']
@@ -115,15 +118,6 @@ class StoryViewSet(viewsets.ModelViewSet):
         elif ordering:
             qs = qs.order_by(ordering)
 
-        limit = params.get('limit')
-        if limit:
-            try:
-                limit_value = max(int(limit), 0)
-                if limit_value:
-                    qs = qs[:limit_value]
-            except ValueError:
-                pass
-
         return qs
 
     def perform_create(self, serializer):  # type: ignore[override]
@@ -203,19 +197,16 @@ class StoryViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated], url_path='recommendations')
     def recommendations(self, request):
-        liked_story_ids = list(StoryLike.objects.filter(user=request.user).values_list('story_id', flat=True))
+        taste = (
+            UserProfile.objects.filter(user=request.user).values_list('taste_profile', flat=True).first() or {}
+        )
+        user_tags = set(taste.get('story_tags') or {})
+        user_locations = set(taste.get('locations') or {})
         base_queryset = self.get_queryset().exclude(author=request.user)
 
-        if liked_story_ids:
-            liked_stories = Story.objects.filter(id__in=liked_story_ids)
-            user_tags = {tag.lower() for story in liked_stories for tag in (story.tags or [])}
-            user_locations = {
-                story.location_name.lower()
-                for story in liked_stories
-                if story.location_name
-            }
-
-            candidate_qs = base_queryset.exclude(id__in=liked_story_ids)[:200]
+        if (taste.get('counts') or {}).get('likes'):
+            candidates = base_queryset.exclude(likes__user=request.user)
+            candidate_qs = candidates[:200]
             scored = []
             for story in candidate_qs:
                 score = 0.0
@@ -232,7 +223,7 @@ class StoryViewSet(viewsets.ModelViewSet):
                 scored.sort(key=lambda item: item[0], reverse=True)
                 recommended_stories = [story for _, story in scored[:10]]
             else:
-                recommended_stories = list(candidate_qs.order_by('-likes_count', '-created_at')[:10])
+                recommended_stories = list(candidates.order_by('-likes_count', '-created_at')[:10])
         else:
             recommended_stories = list(base_queryset.filter(is_featured=True)[:10])
             if not recommended_stories:
@@ -280,15 +271,6 @@ class DiscoveryItineraryViewSet(viewsets.ModelViewSet):
         if difficulty:
             qs = qs.filter(difficulty_level=difficulty)
 
-        limit = params.get('limit')
-        if limit:
-            try:
-                limit_value = max(int(limit), 0)
-                if limit_value:
-                    qs = qs[:limit_value]
-            except ValueError:
-                pass
-
         return qs
 
     def perform_create(self, serializer):  # type: ignore[override]
@@ -320,14 +302,6 @@ class SavedItineraryViewSet(viewsets.ModelViewSet):
             qs = qs.filter(is_favorite=True)
         if search:
             qs = qs.filter(title__icontains=search)
-        limit = params.get('limit')
-        if limit:
-            try:
-                limit_value = max(int(limit), 0)
-                if limit_value:
-                    qs = qs[:limit_value]
-            except ValueError:
-                pass
         return qs
 
     def perform_create(self, serializer):  # type: ignore[override]
@@ -407,6 +381,7 @@ class StoryCommentViewSet(viewsets.ModelViewSet):
 class AdvertisementSettingViewSet(viewsets.ModelViewSet):
     serializer_class = AdvertisementSettingSerializer
     queryset = AdvertisementSetting.objects.all().order_by('-created_at')
+    pagination_class = None
 
     def get_permissions(self):  # type: ignore[override]
         if self.request.method in permissions.SAFE_METHODS:
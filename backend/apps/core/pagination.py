@@ -0,0 +1,303 @@
+"""
+Pagination par curseur (keyset), classe par défaut de l'API.
+
+Le curseur porte la position de la dernière ligne rendue sur *toutes* les clés
+de tri (clé primaire comprise) : une page profonde est un
+`WHERE (k1, …, pk) après position ORDER BY k1, …, pk LIMIT n`, servi par
+l'index, aussi rapide que la première page (contrairement à OFFSET), y compris
+quand la première clé a beaucoup d'ex æquo (`-favorite_count`, `-likes_count`).
+La condition est complétée par une borne large sur la première clé
+(`k1 >= v1 AND (…)`) pour que PostgreSQL la serve par un parcours d'index.
+
+- Tri : celui du queryset filtré (`?ordering=` via OrderingFilter, `order_by`
+  de la vue ou `Meta.ordering`), complété par la clé primaire pour un ordre
+  stable. Les colonnes nullables sont triées NULLS LAST (dans les deux sens) et
+  restent utilisables comme curseur.
+- Un tri demandé par le client (`?ordering=` / `?sort=`) qui ne peut pas servir
+  de curseur (expression, relation multiple, aléatoire) est refusé (400) ; un
+  tri par défaut dans ce cas est remplacé par `-created_at, -pk` (ou `-pk`).
+- Le corps de la réponse reste une liste ; les pages suivante et précédente
+  sont annoncées dans l'en-tête `Link` (rel="next" / rel="prev").
+- Taille de page : `?page_size=` (ou `?limit=`, historique), bornée par
+  `max_page_size`.
+- Les querysets déjà tronqués (recherche plein texte limitée) ne sont pas paginés ;
+  les vues de petites tables de référence désactivent la pagination avec
+  `pagination_class = None`.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import contextlib
+import datetime
+import decimal
+import json
+import uuid
+from typing import List, NamedTuple, Optional
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+NEXT, PREVIOUS = 'n', 'p'
+
+
+class SortKey(NamedTuple):
+    # Chemin ORM filtrable (champ, relation avant `a__b`, annotation)
+    path: str
+    descending: bool
+    # Champ servant à relire la position décodée (`to_python`)
+    field: object
+    nullable: bool
+    # Nom sous lequel la valeur est lue sur une ligne (attribut ou clé de dict)
+    attribute: str
+
+
+class UnsupportedOrdering(Exception):
+    pass
+
+
+def _dump(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+class StableCursorPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    legacy_page_size_query_param = 'limit'
+    max_page_size = 200
+    default_ordering = ('-created_at', '-pk')
+    ordering_query_params = ('ordering', 'sort')
+    invalid_cursor_message = 'Curseur invalide.'
+
+    def get_page_size(self, request):
+        for param in (self.page_size_query_param, self.legacy_page_size_query_param):
+            with contextlib.suppress(KeyError, ValueError):
+                return _positive_int(request.query_params[param], strict=True, cutoff=self.max_page_size)
+        return self.page_size
+
+    # -- Clés de tri ---------------------------------------------------------
+
+    @staticmethod
+    def _sort_key(queryset, name: str, index: int) -> SortKey:
+        descending = name.startswith('-')
+        path = name.lstrip('-')
+        if path == '?':
+            raise UnsupportedOrdering(name)
+        opts = queryset.model._meta
+        if path == 'pk':
+            path = opts.pk.name
+        annotation = queryset.query.annotations.get(path)
+        if annotation is not None:
+            return SortKey(path, descending, annotation.output_field, True, path)
+        nullable, model, field = False, queryset.model, None
+        parts = path.split('__')
+        for position, part in enumerate(parts):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                raise UnsupportedOrdering(name) from None
+            if position < len(parts) - 1:
+                # Relations « vers un » seulement : pas de lignes dupliquées.
+                if not (field.many_to_one or field.one_to_one) or not field.concrete:
+                    raise UnsupportedOrdering(name)
+                nullable = nullable or field.null
+                model = field.related_model
+        if not field.concrete or field.is_relation:
+            raise UnsupportedOrdering(name)
+        attribute = path if len(parts) == 1 else f'_cursor_{index}'
+        return SortKey(path, descending, field, nullable or field.null, attribute)
+
+    def _sort_keys(self, queryset, ordering) -> List[SortKey]:
+        if not all(isinstance(name, str) for name in ordering):
+            raise UnsupportedOrdering(ordering)
+        keys = []
+        pk_name = queryset.model._meta.pk.name
+        for name in ordering:
+            key = self._sort_key(queryset, name, len(keys))
+            keys.append(key)
+            if key.path == pk_name:
+                # Clé unique : les suivantes ne départagent plus rien.
+                return keys
+        if not keys:
+            raise UnsupportedOrdering(ordering)
+        keys.append(self._sort_key(queryset, '-pk' if keys[0].descending else 'pk', len(keys)))
+        return keys
+
+    def _fallback_ordering(self, queryset):
+        try:
+            queryset.model._meta.get_field(self.default_ordering[0].lstrip('-'))
+        except FieldDoesNotExist:
+            return ('-pk',)
+        return self.default_ordering
+
+    def get_sort_keys(self, request, queryset) -> List[SortKey]:
+        ordering = tuple(queryset.query.order_by or queryset.model._meta.ordering)
+        try:
+            return self._sort_keys(queryset, ordering)
+        except UnsupportedOrdering:
+            if any(request.query_params.get(param) for param in self.ordering_query_params):
+                raise ValidationError({'ordering': 'Ce tri ne permet pas la pagination par curseur.'}) from None
+            return self._sort_keys(queryset, self._fallback_ordering(queryset))
+
+    @staticmethod
+    def _order_by(keys, reverse: bool):
+        expressions = []
+        for key in keys:
+            descending = key.descending != reverse
+            if key.nullable:
+                # NULLS LAST dans l'ordre demandé, donc NULLS FIRST en sens inverse.
+                nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+                expression = F(key.path)
+                expressions.append(expression.desc(**nulls) if descending else expression.asc(**nulls))
+            else:
+                expressions.append(f'-{key.path}' if descending else key.path)
+        return expressions
+
+    # -- Position --------------------------------------------------------------
+
+    @staticmethod
+    def _after(key: SortKey, value, forward: bool) -> Q:
+        """Lignes strictement après (`forward`) ou avant `value` sur cette clé, NULLS LAST."""
+        if value is None:
+            return Q(**{f'{key.path}__isnull': False}) if not forward else Q(pk__in=[])
+        lookup = 'lt' if key.descending == forward else 'gt'
+        condition = Q(**{f'{key.path}__{lookup}': value})
+        if forward and key.nullable:
+            condition |= Q(**{f'{key.path}__isnull': True})
+        return condition
+
+    @staticmethod
+    def _equal(key: SortKey, value) -> Q:
+        if value is None:
+            return Q(**{f'{key.path}__isnull': True})
+        return Q(**{key.path: value})
+
+    @staticmethod
+    def _bound(key: SortKey, value, forward: bool) -> Optional[Q]:
+        """Borne large (>= / <=) sur la clé : redondante, mais permet un parcours d'index par intervalle."""
+        if value is None:
+            return Q(**{f'{key.path}__isnull': True}) if forward else None
+        lookup = 'lte' if key.descending == forward else 'gte'
+        bound = Q(**{f'{key.path}__{lookup}': value})
+        if forward and key.nullable:
+            bound |= Q(**{f'{key.path}__isnull': True})
+        return bound
+
+    def _position_filter(self, keys, values, forward: bool) -> Q:
+        condition, prefix = Q(pk__in=[]), Q()
+        for key, value in zip(keys, values):
+            condition |= prefix & self._after(key, value, forward)
+            prefix &= self._equal(key, value)
+        # `k1 > v1 OR (k1 = v1 AND …)` seul n'est pas une borne d'index pour PostgreSQL.
+        bound = self._bound(keys[0], values[0], forward)
+        return condition & bound if bound is not None else condition
+
+    def _decode_cursor(self, request, keys):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            direction, raw_values = cursor['d'], cursor['v']
+            if direction not in (NEXT, PREVIOUS) or len(raw_values) != len(keys):
+                raise ValueError(direction)
+            values = [
+                None if raw is None else key.field.to_python(raw)
+                for key, raw in zip(keys, raw_values)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message) from None
+        return direction, values
+
+    def _encode_cursor(self, direction: str, row) -> str:
+        values = [_dump(self._value(row, key)) for key in self.keys]
+        encoded = base64.urlsafe_b64encode(json.dumps({'d': direction, 'v': values}).encode()).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def _value(row, key: SortKey):
+        return row[key.attribute] if isinstance(row, dict) else getattr(row, key.attribute)
+
+    # -- Pagination ------------------------------------------------------------
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if queryset.query.is_sliced:
+            return None
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.keys = self.get_sort_keys(request, queryset)
+        aliases = {key.attribute: F(key.path) for key in self.keys if key.attribute != key.path}
+        if aliases:
+            queryset = queryset.annotate(**aliases)
+
+        cursor = self._decode_cursor(request, self.keys)
+        direction = cursor[0] if cursor else NEXT
+        reverse = direction == PREVIOUS
+        queryset = queryset.order_by(*self._order_by(self.keys, reverse))
+        if cursor:
+            queryset = queryset.filter(self._position_filter(self.keys, cursor[1], forward=not reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self._encode_cursor(NEXT, self.page[-1])
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._encode_cursor(PREVIOUS, self.page[0])
+
+    def get_paginated_response(self, data):
+        links = [
+            f'<{url}>; rel="{rel}"'
+            for url, rel in ((self.get_next_link(), 'next'), (self.get_previous_link(), 'prev'))
+            if url
+        ]
+        headers = {'Link': ', '.join(links)} if links else None
+        return Response(data, headers=headers)
+
+    def get_paginated_response_schema(self, schema):
+        return schema
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Curseur de page (lien rel="next" / rel="prev" de l\'en-tête Link).',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Nombre de résultats par page (max. {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,189 @@
+"""
+Champs clairsemés pour les sérialiseurs lourds : `?fields=` et `?expand=`.
+
+- `?fields=id,name,managed_pois.name` : seuls ces champs sont rendus (la
+  notation pointée restreint les sérialiseurs imbriqués).
+- `?expand=managed_pois,comments` : les champs lourds déclarés dans
+  `Meta.expandable_fields` ne sont rendus en mode clairsemé que s'ils sont
+  demandés ici (ou nommés dans `fields`). `?expand=` seul renvoie donc tous les
+  champs sauf les champs lourds.
+- Sans aucun des deux paramètres, la réponse est inchangée.
+
+La vue (`SparseFieldsetsViewMixin`) élague aussi le queryset filtré : les
+`select_related` / `prefetch_related` des champs non rendus sont retirés et les
+colonnes volumineuses (texte, JSON) non rendues sont différées. Les champs
+calculés (`SerializerMethodField`) déclarent les relations qu'ils lisent dans
+`Meta.sparse_sources`.
+"""
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Optional
+
+from django.db import models
+from django.db.models import Prefetch
+from rest_framework import permissions
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+CONTEXT_KEY = 'sparse_fieldset'
+DEFERRABLE_FIELD_TYPES = (models.TextField, models.JSONField, models.BinaryField)
+
+FieldTree = Dict[str, 'FieldTree']
+
+
+def parse_field_paths(value: str) -> FieldTree:
+    """`'id,owner.email,owner.profile.bio'` -> `{'id': {}, 'owner': {'email': {}, 'profile': {'bio': {}}}}`."""
+    tree: FieldTree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(name, {})
+    return tree
+
+
+class Selection(NamedTuple):
+    fields: Optional[FieldTree]
+    expand: FieldTree
+
+    @classmethod
+    def from_request(cls, request) -> Optional['Selection']:
+        params = request.query_params
+        if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+            return None
+        fields = parse_field_paths(params[FIELDS_PARAM]) if params.get(FIELDS_PARAM) else None
+        return cls(fields=fields, expand=parse_field_paths(params.get(EXPAND_PARAM, '')))
+
+    def names(self, serializer_class, fields) -> set:
+        """Noms des champs lisibles à rendre parmi `fields`."""
+        expandable = set(getattr(getattr(serializer_class, 'Meta', None), 'expandable_fields', ()))
+        if self.fields is not None:
+            selected = set(self.fields)
+        else:
+            selected = {name for name in fields if name not in expandable}
+        return (selected | set(self.expand)) & set(fields)
+
+    def child(self, name: str) -> 'Selection':
+        nested = (self.fields or {}).get(name) or None
+        return Selection(fields=nested, expand=self.expand.get(name, {}))
+
+
+def _nested_serializer(field):
+    nested = getattr(field, 'child', field)
+    return nested if isinstance(nested, SparseFieldsetsMixin) else None
+
+
+def _select_related_paths(tree, prefix=''):
+    for name, children in tree.items():
+        path = f'{prefix}{name}'
+        yield path
+        yield from _select_related_paths(children, f'{path}__')
+
+
+class SparseFieldsetsMixin:
+    """
+    À placer avant `serializers.ModelSerializer`.
+
+    Meta :
+    - `expandable_fields` : champs lourds rendus en mode clairsemé seulement
+      s'ils sont demandés (`fields` ou `expand`) ;
+    - `sparse_sources` : pour les champs sans `source` exploitable (méthodes),
+      relations du modèle qu'ils lisent.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self._sparse_selection()
+        if selection is None:
+            return fields
+        keep = selection.names(type(self), fields)
+        for name in list(fields):
+            if name not in keep and not fields[name].write_only:
+                del fields[name]
+        for name, field in fields.items():
+            nested = _nested_serializer(field)
+            if nested is not None:
+                nested._sparse = selection.child(name)
+        return fields
+
+    def _sparse_selection(self) -> Optional[Selection]:
+        if hasattr(self, '_sparse'):
+            return self._sparse
+        # Sélection posée par la vue, pour son propre sérialiseur uniquement.
+        serializer_class, selection = self.context.get(CONTEXT_KEY, (None, None))
+        return selection if serializer_class is type(self) else None
+
+    @classmethod
+    def _source_roots(cls, name, field) -> tuple:
+        sources = getattr(cls.Meta, 'sparse_sources', {})
+        if name in sources:
+            return tuple(sources[name])
+        if field.source == '*':
+            return ()
+        return (field.source.split('.')[0],)
+
+    @classmethod
+    def sparse_queryset(cls, queryset, selection: Selection):
+        """Retire du queryset ce que la sélection ne rend pas."""
+        fields = cls().fields
+        keep = selection.names(cls, fields)
+        roots, nested = set(), {}
+        for name in keep:
+            for root in cls._source_roots(name, fields[name]):
+                roots.add(root)
+                serializer = _nested_serializer(fields[name])
+                if serializer is not None:
+                    nested[root] = (type(serializer), selection.child(name))
+
+        lookups = []
+        for lookup in queryset._prefetch_related_lookups:
+            path = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+            root = path.split('__')[0]
+            if root not in roots:
+                continue
+            if isinstance(lookup, Prefetch) and lookup.queryset is not None and root in nested and '__' not in path:
+                child_class, child_selection = nested[root]
+                lookup = Prefetch(
+                    lookup.prefetch_through,
+                    queryset=child_class.sparse_queryset(lookup.queryset, child_selection),
+                    to_attr=lookup.to_attr,
+                )
+            lookups.append(lookup)
+        queryset = queryset.prefetch_related(None).prefetch_related(*lookups)
+
+        if isinstance(queryset.query.select_related, dict):
+            related = {name: tree for name, tree in queryset.query.select_related.items() if name in roots}
+            queryset = queryset.select_related(None)
+            if related:
+                queryset = queryset.select_related(*_select_related_paths(related))
+
+        deferred = [
+            field.name for field in queryset.model._meta.concrete_fields
+            if isinstance(field, DEFERRABLE_FIELD_TYPES) and field.name not in roots
+        ]
+        return queryset.defer(*deferred) if deferred else queryset
+
+
+class SparseFieldsetsViewMixin:
+    """À placer avant la classe de vue DRF ; active `?fields=` / `?expand=` pour les lectures."""
+
+    def _sparse_selection(self) -> Optional[Selection]:
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+        if not issubclass(self.get_serializer_class(), SparseFieldsetsMixin):
+            return None
+        return Selection.from_request(request)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        selection = self._sparse_selection()
+        if selection is None or not isinstance(queryset, models.QuerySet):
+            return queryset
+        return self.get_serializer_class().sparse_queryset(queryset, selection)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        selection = self._sparse_selection()
+        if selection is not None:
+            context[CONTEXT_KEY] = (self.get_serializer_class(), selection)
+        return context
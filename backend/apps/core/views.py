@@ -28,6 +28,7 @@ class SystemSettingViewSet(viewsets.ModelViewSet):
     queryset = SystemSetting.objects.all()
     serializer_class = SystemSettingSerializer
     lookup_field = 'setting_key'
+    pagination_class = None
 
     def get_permissions(self):  # type: ignore[override]
         if self.action in {'list', 'retrieve'}:
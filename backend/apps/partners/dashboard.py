@@ -0,0 +1,110 @@
+"""
+Indicateurs du tableau de bord partenaire (`PartnerDashboardMetricsView`).
+
+- Une requête d'agrégation conditionnelle par table source (POI, agrégats
+  mensuels du partenaire, commissions) plus le POI le plus rentable (agrégats
+  mensuels par POI) : ni le nombre de requêtes ni le volume lu ne dépendent du
+  nombre de POI du partenaire ou de jours d'historique (apps.analytics.rollups).
+- Le résultat est mis en cache par partenaire (`PARTNER_DASHBOARD_CACHE_TTL`)
+  et invalidé après commit quand les analytics, les POI ou les commissions du
+  partenaire changent (receivers dans `apps.partners.models`, ou
+  `invalidate_dashboard_for_points` après une ingestion groupée).
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from apps.analytics.models import AnalyticsGrain, PartnerAnalyticsRollup, TouristPointAnalyticsRollup
+from apps.poi.models import TouristPoint
+
+from .models import PartnerCommission
+
+PENDING_PAYMENT_STATUSES = ('pending', 'processing')
+
+
+def dashboard_cache_key(user_id) -> str:
+    return f'partners:dashboard:{user_id}:{timezone.now().date():%Y-%m}'
+
+
+def compute_dashboard_metrics(user) -> dict:
+    start_month = timezone.now().date().replace(day=1)
+    pois = TouristPoint.objects.filter(owner=user).order_by()
+    this_month = Q(period_start=start_month)
+
+    poi_totals = pois.aggregate(
+        total=Count('pk'),
+        pending=Count('pk', filter=Q(is_active=False)),
+        avg_rating=Avg('rating'),
+    )
+    totals = PartnerAnalyticsRollup.objects.filter(partner=user, grain=AnalyticsGrain.MONTH).aggregate(
+        total_views=Sum('views'),
+        total_clicks=Sum('clicks'),
+        total_bookings=Sum('bookings'),
+        total_revenue=Sum('revenue'),
+        month_views=Sum('views', filter=this_month),
+        month_bookings=Sum('bookings', filter=this_month),
+        month_revenue=Sum('revenue', filter=this_month),
+    )
+    pending_payments = PartnerCommission.objects.filter(
+        partner=user, payment_status__in=PENDING_PAYMENT_STATUSES,
+    ).count()
+    top_poi = (
+        TouristPointAnalyticsRollup.objects.filter(owner=user, grain=AnalyticsGrain.MONTH)
+        .order_by()
+        .values('tourist_point_id')
+        .annotate(total_revenue=Sum('revenue'))
+        .order_by('-total_revenue')
+        .values('tourist_point__name', 'total_revenue')
+        .first()
+    )
+
+    return {
+        'total_pois': poi_totals['total'],
+        'pending_pois': poi_totals['pending'],
+        'total_views': int(totals['total_views'] or 0),
+        'total_clicks': int(totals['total_clicks'] or 0),
+        'total_bookings': int(totals['total_bookings'] or 0),
+        'total_revenue': float(totals['total_revenue'] or 0),
+        'avg_rating': round(float(poi_totals['avg_rating'] or 0), 2),
+        'pending_payments': pending_payments,
+        'this_month': {
+            'views': int(totals['month_views'] or 0),
+            'bookings': int(totals['month_bookings'] or 0),
+            'revenue': float(totals['month_revenue'] or 0),
+        },
+        'top_poi': {
+            'name': top_poi['tourist_point__name'] if top_poi else '',
+            'revenue': float(top_poi['total_revenue'] or 0) if top_poi else 0.0,
+        },
+    }
+
+
+def get_dashboard_metrics(user) -> dict:
+    key = dashboard_cache_key(user.pk)
+    data = cache.get(key)
+    if data is None:
+        data = compute_dashboard_metrics(user)
+        cache.set(key, data, getattr(settings, 'PARTNER_DASHBOARD_CACHE_TTL', 300))
+    return data
+
+
+def invalidate_dashboard(owner_ids: Iterable) -> None:
+    """Invalide après commit le tableau de bord des partenaires donnés."""
+    keys = [dashboard_cache_key(owner_id) for owner_id in set(owner_ids) if owner_id is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_dashboard_for_points(point_ids: Iterable) -> None:
+    """Variante pour les écritures groupées d'analytics : une requête pour retrouver les propriétaires."""
+    point_ids = list(point_ids)
+    if point_ids:
+        invalidate_dashboard(
+            TouristPoint.objects.filter(pk__in=point_ids).values_list('owner_id', flat=True).distinct()
+        )
@@ -6,9 +6,13 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from django.utils import timezone
 
+from apps.analytics.models import TouristPointAnalytics
+from apps.poi.metadata_sections import write_key
 from apps.poi.models import TouristPoint
 
 
@@ -93,24 +97,19 @@ class PartnerBookingConfig(models.Model):
 
     def save(self, *args, **kwargs):  # pragma: no cover - deterministic side effects on related object
         super().save(*args, **kwargs)
-        metadata = self.tourist_point.metadata or {}
-        metadata['booking'] = {
+        # Écriture de la seule clé `booking`, sous verrou et avec incrément de révision.
+        write_key(self.tourist_point_id, 'booking', {
             'system_type': self.system_type,
             'is_active': self.is_active,
             'test_mode': self.test_mode,
             'endpoint_url': self.endpoint_url,
             'webhook_url': self.webhook_url,
-        }
-        self.tourist_point.metadata = metadata
-        self.tourist_point.save(update_fields=['metadata', 'updated_at'])
+        })
 
     def delete(self, *args, **kwargs):  # pragma: no cover - deterministic cleanup
-        poi = self.tourist_point
+        poi_id = self.tourist_point_id
         super().delete(*args, **kwargs)
-        metadata = poi.metadata or {}
-        if metadata.pop('booking', None) is not None:
-            poi.metadata = metadata
-            poi.save(update_fields=['metadata', 'updated_at'])
+        write_key(poi_id, 'booking', None)
 
 
 class PartnerPaymentMethod(models.Model):
@@ -210,3 +209,30 @@ class PartnerEndpointHealth(models.Model):
 
     class Meta:
         ordering = ['-updated_at']
+
+
+@receiver(post_save, sender=TouristPointAnalytics)
+@receiver(post_delete, sender=TouristPointAnalytics)
+def invalidate_dashboard_on_analytics(sender, instance: TouristPointAnalytics, **kwargs):
+    from .dashboard import invalidate_dashboard_for_points
+
+    if not kwargs.get('raw'):
+        invalidate_dashboard_for_points([instance.tourist_point_id])
+
+
+@receiver(post_save, sender=TouristPoint)
+@receiver(post_delete, sender=TouristPoint)
+def invalidate_dashboard_on_poi_change(sender, instance: TouristPoint, **kwargs):
+    from .dashboard import invalidate_dashboard
+
+    if not kwargs.get('raw'):
+        invalidate_dashboard([instance.owner_id])
+
+
+@receiver(post_save, sender=PartnerCommission)
+@receiver(post_delete, sender=PartnerCommission)
+def invalidate_dashboard_on_commission(sender, instance: PartnerCommission, **kwargs):
+    from .dashboard import invalidate_dashboard
+
+    if not kwargs.get('raw'):
+        invalidate_dashboard([instance.partner_id])
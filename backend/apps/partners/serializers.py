@@ -3,6 +3,7 @@ from __future__ import annotations
 from rest_framework import serializers
 
 from apps.accounts.serializers import UserSerializer
+from apps.core.sparse_fields import SparseFieldsetsMixin
 from apps.poi.models import TouristPoint
 from apps.poi.serializers import TouristPointSerializer
 from .models import (
@@ -17,7 +18,7 @@ from .models import (
 )
 
 
-class PartnerProfileSerializer(serializers.ModelSerializer):
+class PartnerProfileSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     managed_pois = TouristPointSerializer(many=True, read_only=True)
     owner_detail = UserSerializer(source='owner', read_only=True)
     managed_poi_ids = serializers.PrimaryKeyRelatedField(
@@ -45,6 +46,7 @@ class PartnerProfileSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ('id', 'owner', 'owner_detail', 'api_key', 'created_at', 'updated_at')
+        expandable_fields = ('managed_pois', 'owner_detail')
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
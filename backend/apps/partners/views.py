@@ -6,16 +6,21 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.utils import timezone
-from django.db.models import Q, Sum, Avg
+from django.db.models import Count, Prefetch, Q, Sum
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.sparse_fields import SparseFieldsetsViewMixin
+from apps.poi.metadata_sections import write_key
 from apps.poi.models import TouristPoint
-from apps.analytics.models import TouristPointAnalytics
+from apps.poi.serializers import TouristPointSerializer
+from apps.analytics.models import AnalyticsGrain, PartnerAnalyticsRollup
+from apps.analytics.rollups import period_start, unique_visitors_between
 
+from .dashboard import get_dashboard_metrics
 from .models import (
     PartnerApplication,
     PartnerBookingConfig,
@@ -54,8 +59,11 @@ class IsAdminOrOwner(permissions.BasePermission):
         return False
 
 
-class PartnerProfileViewSet(viewsets.ModelViewSet):
-    queryset = PartnerProfile.objects.select_related('owner', 'owner__profile').prefetch_related('managed_pois')
+class PartnerProfileViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
+    queryset = PartnerProfile.objects.select_related('owner', 'owner__profile').prefetch_related(
+        'owner__role_assignments',
+        Prefetch('managed_pois', queryset=TouristPointSerializer.with_related(TouristPoint.objects.defer('search_vector'))),
+    )
     serializer_class = PartnerProfileSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrOwner]
 
@@ -296,28 +304,24 @@ class PartnerAnalyticsView(APIView):
     serializer_class = PartnerAnalyticsSerializer
 
     def get(self, request, pk: str):
-        pois = TouristPoint.objects.filter(owner__public_id=pk)
-        total = pois.count()
-        pending = pois.filter(is_active=False).count()
+        totals = TouristPoint.objects.filter(owner__public_id=pk).order_by().aggregate(
+            total=Count('pk'),
+            pending=Count('pk', filter=Q(is_active=False)),
+            views=Sum('view_count'),
+        )
+        total, pending = totals['total'], totals['pending']
         approved = total - pending
         rejected = 0
         bookings = 0
         approval_rate = (approved / total * 100) if total else 0
         performance = min(100, round(approval_rate * 0.7 + bookings * 0.3))
 
-        # Calculate total views from metadata
-        total_views = 0
-        for poi in pois:
-            metadata = poi.metadata or {}
-            views = int(metadata.get('view_count', metadata.get('views', 0)) or 0)
-            total_views += views
-
         data = {
             'totalPOIs': total,
             'approvedPOIs': approved,
             'pendingPOIs': pending,
             'rejectedPOIs': rejected,
-            'totalViews': total_views,
+            'totalViews': totals['views'] or 0,
             'totalBookings': bookings,
             'monthlyRevenue': 0,
             'performanceScore': performance,
@@ -334,12 +338,9 @@ class PartnerBulkPOIStatusView(APIView):
         serializer.is_valid(raise_exception=True)
         poi_ids = serializer.validated_data['poi_ids']
         status_value = serializer.validated_data['status']
-        pois = TouristPoint.objects.filter(id__in=poi_ids)
         updated = 0
-        for poi in pois:
-            metadata = {**(poi.metadata or {}), 'status': status_value}
-            poi.metadata = metadata
-            poi.save(update_fields=['metadata'])
+        for poi_id in TouristPoint.objects.filter(id__in=poi_ids).values_list('id', flat=True):
+            write_key(poi_id, 'status', status_value)
             updated += 1
         return Response({'updated': updated})
 
@@ -355,58 +356,15 @@ class PartnerDashboardMetricsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        pois = TouristPoint.objects.filter(owner=user)
-        poi_ids = list(pois.values_list('id', flat=True))
-        analytics_qs = TouristPointAnalytics.objects.filter(tourist_point_id__in=poi_ids)
-        commissions_qs = PartnerCommission.objects.filter(partner=user)
-
-        total_views = analytics_qs.aggregate(total=Sum('views'))['total'] or 0
-        total_clicks = analytics_qs.aggregate(total=Sum('clicks'))['total'] or 0
-        total_bookings = analytics_qs.aggregate(total=Sum('bookings'))['total'] or 0
-        total_revenue = analytics_qs.aggregate(total=Sum('revenue'))['total'] or 0
-
-        avg_rating = pois.aggregate(avg=Avg('rating'))['avg'] or 0
-        pending_pois = pois.filter(is_active=False).count()
-        pending_payments = commissions_qs.filter(payment_status__in=['pending', 'processing']).count()
-
-        today = timezone.now().date()
-        start_month = today.replace(day=1)
-        month_analytics = analytics_qs.filter(date__gte=start_month)
-        month_revenue = month_analytics.aggregate(total=Sum('revenue'))['total'] or 0
-        month_views = month_analytics.aggregate(total=Sum('views'))['total'] or 0
-        month_bookings = month_analytics.aggregate(total=Sum('bookings'))['total'] or 0
-
-        top_poi_data = (
-            analytics_qs.values('tourist_point__name')
-            .annotate(total_revenue=Sum('revenue'))
-            .order_by('-total_revenue')
-            .first()
-        )
-
-        data = {
-            'total_pois': pois.count(),
-            'pending_pois': pending_pois,
-            'total_views': int(total_views),
-            'total_clicks': int(total_clicks),
-            'total_bookings': int(total_bookings),
-            'total_revenue': float(total_revenue),
-            'avg_rating': round(float(avg_rating or 0), 2),
-            'pending_payments': pending_payments,
-            'this_month': {
-                'views': int(month_views or 0),
-                'bookings': int(month_bookings or 0),
-                'revenue': float(month_revenue or 0),
-            },
-            'top_poi': {
-                'name': top_poi_data['tourist_point__name'] if top_poi_data else '',
-                'revenue': float(top_poi_data['total_revenue']) if top_poi_data else 0.0,
-            },
-        }
-        return Response(data)
+        return Response(get_dashboard_metrics(user))
 
 
 class PartnerAnalyticsSeriesView(APIView):
+    """Série temporelle lue dans les agrégats pré-calculés (apps.analytics.rollups)."""
     permission_classes = [permissions.IsAuthenticated]
+    MAX_DAYS = 3650
+    MAX_POINTS = 180
+    GRAINS = ((AnalyticsGrain.DAY, 1), (AnalyticsGrain.WEEK, 7), (AnalyticsGrain.MONTH, 31))
 
     def get(self, request):
         user = request.user
@@ -416,29 +374,34 @@ class PartnerAnalyticsSeriesView(APIView):
         except (TypeError, ValueError):
             days_int = 30
 
-        days_int = max(1, min(days_int, 180))
-        start_date = timezone.now().date() - timedelta(days=days_int - 1)
+        days_int = max(1, min(days_int, self.MAX_DAYS))
+        # Grain le plus fin qui reste sous MAX_POINTS points ; la première période peut déborder
+        # avant la fenêtre demandée (semaine ou mois entamé).
+        grain = next(
+            grain for grain, days_per_point in self.GRAINS
+            if days_int <= self.MAX_POINTS * days_per_point or grain == AnalyticsGrain.MONTH
+        )
+        today = timezone.now().date()
+        window_start = today - timedelta(days=days_int - 1)
+        start_date = period_start(grain, window_start)
 
         analytics = (
-            TouristPointAnalytics.objects.filter(tourist_point__owner=user, date__gte=start_date)
-            .values('date')
-            .annotate(
-                views=Sum('views'),
-                clicks=Sum('clicks'),
-                bookings=Sum('bookings'),
-                revenue=Sum('revenue'),
-            )
-            .order_by('date')
+            PartnerAnalyticsRollup.objects.filter(partner=user, grain=grain, period_start__gte=start_date)
+            .order_by('period_start')
+            .values('period_start', 'views', 'clicks', 'bookings', 'revenue', 'unique_visitors')
         )
 
         series = [
             {
-                'date': row['date'],
+                'date': row['period_start'],
                 'views': int(row['views'] or 0),
                 'clicks': int(row['clicks'] or 0),
                 'bookings': int(row['bookings'] or 0),
                 'revenue': float(row['revenue'] or 0),
+                'unique_visitors': int(row['unique_visitors'] or 0),
             }
             for row in analytics
         ]
-        return Response({'series': series})
+        # Visiteurs uniques sur toute la fenêtre : fusion des sketches, pas somme des points.
+        unique_visitors = unique_visitors_between(window_start, today, partner_id=user.pk)
+        return Response({'series': series, 'grain': grain, 'unique_visitors': unique_visitors})
@@ -0,0 +1,95 @@
+"""
+Compteurs dénormalisés de `TouristPoint` : `favorite_count` et `view_count`.
+
+- Mises à jour atomiques côté base (`F()`), jamais par lecture-modification-
+  écriture : favoris ajoutés / retirés (receivers de `apps.poi.models`), vues
+  écrites par l'ingestion groupée (apps.analytics.ingestion).
+- `TouristPoint.save()` n'écrit pas ces colonnes (sauf `update_fields`
+  explicite) : un enregistrement du POI n'écrase pas un incrément concurrent.
+- Les écritures qui contournent les signaux (`bulk_create`, `QuerySet.delete`
+  sans receiver, imports SQL) peuvent créer un écart : `reconcile_counters`
+  (commande `reconcile_poi_counters`) recalcule les valeurs à partir des
+  sources (`FavoriteTouristPoint`, `TouristPointAnalytics.views`).
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from apps.analytics.models import TouristPointAnalytics
+
+from .models import FavoriteTouristPoint, TouristPoint
+
+UPDATE_BATCH_SIZE = 500
+
+
+def add_favorites(point_id, delta: int) -> None:
+    queryset = TouristPoint.objects.filter(pk=point_id)
+    if delta < 0:
+        # Jamais négatif, même si le compteur a dérivé.
+        queryset = queryset.filter(favorite_count__gte=-delta)
+    queryset.update(favorite_count=F('favorite_count') + delta)
+
+
+def add_views(views_by_point: Dict[object, int]) -> None:
+    """Ajoute des vues à plusieurs POI : un UPDATE par lot (`CASE` sur la clé primaire)."""
+    # Triés : lignes verrouillées dans le même ordre que l'ingestion des autres workers.
+    items = sorted((point_id, views) for point_id, views in views_by_point.items() if views)
+    for start in range(0, len(items), UPDATE_BATCH_SIZE):
+        batch = items[start:start + UPDATE_BATCH_SIZE]
+        increment = Case(
+            *(When(pk=point_id, then=Value(views)) for point_id, views in batch),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        TouristPoint.objects.filter(pk__in=[point_id for point_id, _ in batch]).update(
+            view_count=F('view_count') + increment,
+        )
+
+
+def expected_favorites():
+    return Coalesce(
+        Subquery(
+            FavoriteTouristPoint.objects.filter(tourist_point=OuterRef('pk'))
+            .order_by()
+            .values('tourist_point')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def expected_views():
+    return Coalesce(
+        Subquery(
+            TouristPointAnalytics.objects.filter(tourist_point=OuterRef('pk'))
+            .order_by()
+            .values('tourist_point')
+            .annotate(total=Sum('views'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def reconcile_counters(queryset=None, batch_size: int = 1000) -> int:
+    """Recalcule les compteurs des POI qui ont dérivé ; renvoie le nombre de POI corrigés."""
+    queryset = (queryset if queryset is not None else TouristPoint.objects.all()).order_by('pk')
+    drifted = (
+        queryset.annotate(expected_favorites=expected_favorites(), expected_views=expected_views())
+        .exclude(favorite_count=F('expected_favorites'), view_count=F('expected_views'))
+        .values_list('pk', flat=True)
+    )
+    fixed, last_pk = 0, None
+    while True:
+        batch = drifted if last_pk is None else drifted.filter(pk__gt=last_pk)
+        ids = list(batch[:batch_size])
+        if not ids:
+            return fixed
+        fixed += TouristPoint.objects.filter(pk__in=ids).update(
+            favorite_count=expected_favorites(), view_count=expected_views(),
+        )
+        last_pk = ids[-1]
@@ -0,0 +1,204 @@
+"""
+Outils géospatiaux pour la sélection de POI dans un rayon.
+
+Chaque `TouristPoint` stocke un geohash (colonne indexée) calculé à la sauvegarde.
+Une recherche par rayon se fait en deux temps :
+
+1. pré-filtre SQL : bounding box du cercle + préfixes geohash qui la couvrent
+   (l'index sur `geohash` sert les `LIKE 'xxx%'`) ;
+2. passe de distance exacte (haversine) sur la liste courte, puis sélection
+   des k plus proches avec un tas.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from functools import reduce
+from operator import or_
+from typing import Iterable, List, Optional, Tuple
+
+from django.db.models import Q
+
+EARTH_RADIUS_KM = 6371.0
+GEOHASH_PRECISION = 9
+MAX_COVERING_CELLS = 32
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+BoundingBox = Tuple[float, float, float, float]
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Encode une coordonnée en geohash (base32) de `precision` caractères."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def geohash_for(latitude, longitude) -> str:
+    """Geohash d'un POI, ou chaîne vide si les coordonnées sont incomplètes."""
+    if latitude is None or longitude is None:
+        return ''
+    return encode_geohash(float(latitude), float(longitude))
+
+
+def _cell_size_degrees(precision: int) -> Tuple[float, float]:
+    total_bits = precision * 5
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def bounding_boxes(latitude: float, longitude: float, radius_km: float) -> List[BoundingBox]:
+    """
+    Bounding box(es) (min_lat, max_lat, min_lon, max_lon) englobant le cercle.
+    Le cercle est découpé en deux boîtes s'il traverse l'antiméridien.
+    """
+    angular = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = max(latitude - angular, -90.0)
+    max_lat = min(latitude + angular, 90.0)
+
+    cos_lat = math.cos(math.radians(latitude))
+    if max_lat >= 90.0 or min_lat <= -90.0 or cos_lat < 1e-6:
+        return [(min_lat, max_lat, -180.0, 180.0)]
+
+    # Demi-largeur en longitude à la latitude la plus défavorable du cercle.
+    ratio = math.sin(math.radians(angular)) / cos_lat
+    if ratio >= 1.0:
+        return [(min_lat, max_lat, -180.0, 180.0)]
+    delta_lon = math.degrees(math.asin(ratio))
+    min_lon = longitude - delta_lon
+    max_lon = longitude + delta_lon
+
+    if min_lon < -180.0:
+        return [(min_lat, max_lat, min_lon + 360.0, 180.0), (min_lat, max_lat, -180.0, max_lon)]
+    if max_lon > 180.0:
+        return [(min_lat, max_lat, min_lon, 180.0), (min_lat, max_lat, -180.0, max_lon - 360.0)]
+    return [(min_lat, max_lat, min_lon, max_lon)]
+
+
+def covering_cells(box: BoundingBox, max_cells: int = MAX_COVERING_CELLS) -> List[str]:
+    """
+    Préfixes geohash couvrant la boîte, à la précision la plus fine qui tient
+    dans `max_cells` cellules. Retourne [] si la boîte est trop large pour être
+    utilement découpée (on se rabat alors sur la seule bounding box).
+    """
+    min_lat, max_lat, min_lon, max_lon = box
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lon_step = _cell_size_degrees(precision)
+        lat_start = math.floor((min_lat + 90.0) / lat_step)
+        lat_end = math.floor((min(max_lat, 90.0 - 1e-9) + 90.0) / lat_step)
+        lon_start = math.floor((min_lon + 180.0) / lon_step)
+        lon_end = math.floor((min(max_lon, 180.0 - 1e-9) + 180.0) / lon_step)
+        count = (lat_end - lat_start + 1) * (lon_end - lon_start + 1)
+        if count > max_cells:
+            continue
+        cells = set()
+        for lat_index in range(lat_start, lat_end + 1):
+            center_lat = -90.0 + (lat_index + 0.5) * lat_step
+            for lon_index in range(lon_start, lon_end + 1):
+                center_lon = -180.0 + (lon_index + 0.5) * lon_step
+                cells.add(encode_geohash(center_lat, center_lon, precision))
+        return sorted(cells)
+    return []
+
+
+def radius_filter(latitude: float, longitude: float, radius_km: float) -> Q:
+    """Filtre SQL (bounding box + préfixes geohash) pour un cercle donné."""
+    clauses = []
+    for box in bounding_boxes(latitude, longitude, radius_km):
+        min_lat, max_lat, min_lon, max_lon = box
+        clause = Q(
+            latitude__gte=min_lat,
+            latitude__lte=max_lat,
+            longitude__gte=min_lon,
+            longitude__lte=max_lon,
+        )
+        cells = covering_cells(box)
+        if cells:
+            clause &= reduce(or_, (Q(geohash__startswith=cell) for cell in cells))
+        clauses.append(clause)
+    return reduce(or_, clauses)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def nearest_in_rows(
+    rows: Iterable[Tuple[object, object, object]],
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    limit: Optional[int] = None,
+) -> List[Tuple[float, object]]:
+    """
+    Passe de distance sur des tuples (pk, lat, lon) : renvoie [(distance_km, pk)]
+    triés par distance croissante, limités au rayon et aux `limit` plus proches.
+    """
+    phi0 = math.radians(latitude)
+    cos_phi0 = math.cos(phi0)
+    lambda0 = math.radians(longitude)
+    # Seuil sur le terme `a` de la formule haversine : évite asin/sqrt hors rayon.
+    max_a = math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2) ** 2
+    radians, sin, cos = math.radians, math.sin, math.cos
+
+    hits = []
+    for pk, lat, lon in rows:
+        phi = radians(float(lat))
+        half_d_phi = sin((phi - phi0) / 2)
+        half_d_lambda = sin((radians(float(lon)) - lambda0) / 2)
+        a = half_d_phi * half_d_phi + cos_phi0 * cos(phi) * half_d_lambda * half_d_lambda
+        if a <= max_a:
+            hits.append((a, pk))
+
+    if limit is not None:
+        hits = heapq.nsmallest(limit, hits, key=lambda hit: hit[0])
+    else:
+        hits.sort(key=lambda hit: hit[0])
+    return [(2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a))), pk) for a, pk in hits]
+
+
+def nearest_within_radius(queryset, latitude: float, longitude: float, radius_km: float, limit: Optional[int] = None):
+    """
+    Les `limit` POI du queryset les plus proches de (latitude, longitude) dans
+    `radius_km`, sous forme [(distance_km, pk)] triée par distance.
+    """
+    rows = (
+        queryset.filter(radius_filter(latitude, longitude, radius_km))
+        .order_by()
+        .prefetch_related(None)
+        .values_list('pk', 'latitude', 'longitude')
+    )
+    return nearest_in_rows(rows.iterator(chunk_size=5000), latitude, longitude, radius_km, limit)
@@ -0,0 +1,38 @@
+"""
+Crée les conversations manquantes des POI existants.
+
+Les nouveaux POI reçoivent leur conversation à l'enregistrement (signal
+`ensure_poi_conversation`) ; cette commande rattrape les POI créés avant,
+par lots, sans toucher aux conversations existantes.
+
+Usage:
+    docker-compose exec backend python manage.py backfill_poi_conversations --batch-size 1000
+"""
+from django.core.management.base import BaseCommand
+
+from apps.poi.models import POIConversation, TouristPoint
+
+
+class Command(BaseCommand):
+    help = 'Crée les conversations des POI qui n\'en ont pas encore'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='POI traités par lot')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        missing = TouristPoint.objects.filter(conversation__isnull=True).order_by('pk')
+        created = 0
+        last_pk = None
+        while True:
+            batch = missing if last_pk is None else missing.filter(pk__gt=last_pk)
+            ids = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            POIConversation.objects.bulk_create(
+                [POIConversation(tourist_point_id=pk) for pk in ids],
+                ignore_conflicts=True,
+            )
+            created += len(ids)
+            last_pk = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f'{created} conversation(s) créée(s)'))
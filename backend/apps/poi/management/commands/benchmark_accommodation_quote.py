@@ -0,0 +1,128 @@
+"""
+Benchmark du calcul de devis d'hébergement (apps.poi.pricing).
+
+Crée un hébergement synthétique (chambres, plans, saisons, tarifs historiques,
+calendrier d'un an, réservations) dans une transaction annulée à la fin, puis
+mesure `quote_rooms` pour toutes les chambres sur des séjours aléatoires.
+
+Usage:
+    docker-compose exec backend python manage.py benchmark_accommodation_quote --rooms 50 --nights 30
+"""
+import datetime
+import random
+import statistics
+import time
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.poi.models import (
+    AccommodationAvailability,
+    AccommodationBooking,
+    AccommodationLegacyRate,
+    AccommodationRatePlan,
+    AccommodationRateSeason,
+    AccommodationRoom,
+    TouristPoint,
+)
+from apps.poi.pricing import quote_rooms
+
+
+class Command(BaseCommand):
+    help = "Mesure la latence d'un devis de séjour sur toutes les chambres d'un hébergement"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=50, help='Nombre de chambres')
+        parser.add_argument('--nights', type=int, default=30, help='Durée du séjour')
+        parser.add_argument('--queries', type=int, default=100, help='Nombre de devis mesurés')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            rooms, start = self._populate(rng, options['rooms'])
+            self._run(rng, rooms, start, options)
+            transaction.set_rollback(True)
+
+    def _populate(self, rng, count):
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        owner = User.objects.create(username=f'bench-{suffix}', email=f'bench-{suffix}@example.com')
+        point = TouristPoint.objects.create(
+            owner=owner, name='Bench hébergement', latitude=0, longitude=0, is_accommodation=True,
+        )
+        start = datetime.date.today()
+        self.stdout.write(f'Création de {count} chambres avec un an de calendrier...')
+        rooms = AccommodationRoom.objects.bulk_create([
+            AccommodationRoom(
+                tourist_point=point, room_name=f'Chambre {index}', room_type='double',
+                capacity=rng.randint(1, 4), base_price_per_night=Decimal(rng.randint(60, 200)),
+                inventory_total=rng.randint(1, 3),
+            )
+            for index in range(count)
+        ])
+        plans, seasons, legacy, availability, bookings = [], [], [], [], []
+        for room in rooms:
+            plan = AccommodationRatePlan(
+                tourist_point=point, room_id=str(room.id), name='Standard', base_meal_plan='bb',
+            )
+            plans.append(plan)
+            for quarter in range(4):
+                season_start = start + datetime.timedelta(days=quarter * 91)
+                seasons.append(AccommodationRateSeason(
+                    tourist_point=point, rate_plan_id=str(plan.id), season_name=f'T{quarter + 1}',
+                    start_date=season_start, end_date=season_start + datetime.timedelta(days=90),
+                    base_price=Decimal(rng.randint(70, 250)), minimum_stay=rng.choice([None, 1, 2]),
+                    closed_to_arrival=rng.random() < 0.05, closed_to_departure=rng.random() < 0.05,
+                ))
+            legacy.append(AccommodationLegacyRate(
+                tourist_point=point, room_id=str(room.id), rate_name='Historique',
+                start_date=start, end_date=start + datetime.timedelta(days=365),
+                price_per_night=room.base_price_per_night,
+            ))
+            for offset in range(365):
+                if rng.random() < 0.3:
+                    availability.append(AccommodationAvailability(
+                        tourist_point=point, room_id=str(room.id), date=start + datetime.timedelta(days=offset),
+                        is_available=rng.random() > 0.05,
+                        special_price=Decimal(rng.randint(50, 300)) if rng.random() < 0.5 else None,
+                    ))
+            for _ in range(10):
+                booking_in = start + datetime.timedelta(days=rng.randint(0, 350))
+                bookings.append(AccommodationBooking(
+                    tourist_point=point, room_id=str(room.id), customer_name='Bench',
+                    customer_email='bench@example.com', check_in_date=booking_in,
+                    check_out_date=booking_in + datetime.timedelta(days=rng.randint(1, 7)),
+                    booking_status='confirmed',
+                ))
+        AccommodationRatePlan.objects.bulk_create(plans)
+        AccommodationRateSeason.objects.bulk_create(seasons, batch_size=5000)
+        AccommodationLegacyRate.objects.bulk_create(legacy, batch_size=5000)
+        AccommodationAvailability.objects.bulk_create(availability, batch_size=5000)
+        AccommodationBooking.objects.bulk_create(bookings, batch_size=5000)
+        return rooms, start
+
+    def _run(self, rng, rooms, start, options):
+        nights = options['nights']
+        timings = []
+        with CaptureQueriesContext(connection) as captured:
+            quote_rooms(rooms, start, start + datetime.timedelta(days=nights))
+        for _ in range(options['queries']):
+            check_in = start + datetime.timedelta(days=rng.randint(0, 365 - nights))
+            started = time.perf_counter()
+            quotes = quote_rooms(rooms, check_in, check_in + datetime.timedelta(days=nights), guests=2)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        available = sum(1 for quote in quotes if quote['available'])
+        self.stdout.write(
+            f'{len(rooms)} chambres x {nights} nuits : {len(captured.captured_queries)} requêtes par devis, '
+            f'{available}/{len(quotes)} disponibles au dernier devis'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'p50 {statistics.median(timings):.1f} ms, p95 {p95:.1f} ms, max {timings[-1]:.1f} ms'
+        ))
@@ -0,0 +1,100 @@
+"""
+Benchmark de la recherche plein texte des POI (`?q=`), PostgreSQL uniquement.
+
+Génère des POI synthétiques dans une transaction annulée à la fin, calcule
+leur tsvector puis mesure la latence de `search_tourist_points` (requêtes
+exactes et avec fautes de frappe pour le repli trigramme).
+
+Usage:
+    docker-compose exec backend python manage.py benchmark_poi_search --points 500000
+"""
+import random
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.poi.models import TouristPoint
+from apps.poi.search import refresh_search_vectors, search_tourist_points
+
+WORDS = [
+    'plage', 'médina', 'riad', 'jardin', 'musée', 'kasbah', 'désert', 'montagne', 'cascade',
+    'souk', 'mosquée', 'palais', 'oasis', 'surf', 'randonnée', 'hammam', 'terrasse', 'port',
+    'beach', 'garden', 'museum', 'mountain', 'waterfall', 'market', 'palace', 'hiking',
+]
+CITIES = ['Marrakech', 'Agadir', 'Essaouira', 'Fès', 'Chefchaouen', 'Tanger', 'Ouarzazate', 'Rabat']
+
+
+def _typo(word: str, rng) -> str:
+    index = rng.randrange(1, len(word))
+    return word[:index - 1] + word[index] + word[index - 1] + word[index + 1:]
+
+
+class Command(BaseCommand):
+    help = 'Mesure la latence de la recherche plein texte des POI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=100_000, help='Nombre de POI synthétiques')
+        parser.add_argument('--queries', type=int, default=200, help='Nombre de requêtes mesurées')
+        parser.add_argument('--limit', type=int, default=20, help='Résultats par requête')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Ce benchmark nécessite PostgreSQL.')
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            self._populate(rng, options['points'])
+            self._run(rng, options)
+            transaction.set_rollback(True)
+
+    def _populate(self, rng, count):
+        owner = get_user_model().objects.create(
+            username=f'bench-{uuid.uuid4().hex[:8]}',
+            email=f'bench-{uuid.uuid4().hex[:8]}@example.com',
+        )
+        self.stdout.write(f'Création de {count} POI synthétiques...')
+        started = time.perf_counter()
+        batch = []
+        for index in range(count):
+            city = rng.choice(CITIES)
+            batch.append(TouristPoint(
+                owner=owner,
+                name=f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {city} {index}",
+                description=' '.join(rng.choice(WORDS) for _ in range(12)),
+                address=f'{rng.randint(1, 200)} rue {rng.choice(WORDS)}, {city}',
+            ))
+            if len(batch) >= 5000:
+                TouristPoint.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            TouristPoint.objects.bulk_create(batch)
+        refresh_search_vectors(TouristPoint.objects.filter(owner=owner))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE poi_touristpoint')
+        self.stdout.write(f'   {count} POI indexés en {time.perf_counter() - started:.1f}s')
+
+    def _run(self, rng, options):
+        queryset = TouristPoint.objects.filter(is_active=True).defer('search_vector')
+        queries = []
+        for index in range(options['queries']):
+            words = [rng.choice(WORDS), rng.choice(CITIES).lower()]
+            if index % 4 == 0:
+                # Faute de frappe sur un nom : doit passer par le repli trigramme.
+                words = [_typo(rng.choice(WORDS), rng)]
+            queries.append(' '.join(words))
+
+        timings = []
+        for text in queries:
+            started = time.perf_counter()
+            list(search_tourist_points(queryset, text)[:options['limit']])
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(queries)} requêtes : p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {timings[-1]:.1f} ms'
+        ))
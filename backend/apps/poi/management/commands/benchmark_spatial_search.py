@@ -0,0 +1,114 @@
+"""
+Benchmark de la recherche par rayon (geohash + bounding box + passe haversine).
+
+Génère des POI synthétiques dans une transaction annulée à la fin, mesure la
+latence de `nearest_within_radius` et vérifie le résultat contre un calcul
+exhaustif sur toutes les lignes.
+
+Usage:
+    docker-compose exec backend python manage.py benchmark_spatial_search --points 1000000
+"""
+import random
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.poi.geo import encode_geohash, nearest_in_rows, nearest_within_radius
+from apps.poi.models import TouristPoint
+
+# Zones denses (lat, lon, écart en degrés) pour simuler des villes.
+CLUSTERS = [
+    (33.5731, -7.5898, 0.6),   # Casablanca
+    (31.6295, -7.9811, 0.5),   # Marrakech
+    (34.0209, -6.8416, 0.4),   # Rabat
+    (48.8566, 2.3522, 0.5),    # Paris
+    (41.9028, 12.4964, 0.4),   # Rome
+]
+
+
+class Command(BaseCommand):
+    help = 'Mesure la latence de la recherche des POI les plus proches dans un rayon'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=100_000, help='Nombre de POI synthétiques')
+        parser.add_argument('--queries', type=int, default=200, help='Nombre de requêtes mesurées')
+        parser.add_argument('--radius', type=float, default=50.0, help='Rayon en km')
+        parser.add_argument('--limit', type=int, default=100, help='Nombre de POI retournés (k)')
+        parser.add_argument('--verify', type=int, default=10, help='Requêtes vérifiées par calcul exhaustif')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            self._populate(rng, options['points'])
+            self._run(rng, options)
+            transaction.set_rollback(True)
+
+    def _random_point(self, rng):
+        if rng.random() < 0.7:
+            lat, lon, spread = rng.choice(CLUSTERS)
+            return lat + rng.gauss(0, spread), lon + rng.gauss(0, spread)
+        return rng.uniform(-60.0, 70.0), rng.uniform(-180.0, 180.0)
+
+    def _populate(self, rng, count):
+        User = get_user_model()
+        owner = User.objects.create(
+            username=f'bench-{uuid.uuid4().hex[:8]}',
+            email=f'bench-{uuid.uuid4().hex[:8]}@example.com',
+        )
+        self.stdout.write(f'Création de {count} POI synthétiques...')
+        started = time.perf_counter()
+        batch = []
+        for index in range(count):
+            lat, lon = self._random_point(rng)
+            lat = round(max(-89.9, min(89.9, lat)), 6)
+            lon = round(((lon + 180.0) % 360.0) - 180.0, 6)
+            batch.append(TouristPoint(
+                owner=owner,
+                name=f'Bench POI {index}',
+                latitude=lat,
+                longitude=lon,
+                geohash=encode_geohash(lat, lon),
+                is_active=True,
+            ))
+            if len(batch) >= 5000:
+                TouristPoint.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            TouristPoint.objects.bulk_create(batch)
+        self.stdout.write(f'   {count} POI insérés en {time.perf_counter() - started:.1f}s')
+
+    def _run(self, rng, options):
+        radius, limit = options['radius'], options['limit']
+        queryset = TouristPoint.objects.filter(is_active=True)
+        queries = [self._random_point(rng) for _ in range(options['queries'])]
+
+        timings = []
+        results = []
+        for lat, lon in queries:
+            started = time.perf_counter()
+            results.append(nearest_within_radius(queryset, lat, lon, radius, limit=limit))
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        hits = sum(len(result) for result in results) / len(results)
+        self.stdout.write(
+            f'{len(queries)} requêtes, rayon {radius} km, k={limit} : '
+            f'p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {timings[-1]:.1f} ms, {hits:.0f} POI/requête'
+        )
+
+        to_verify = min(options['verify'], len(queries))
+        if not to_verify:
+            return
+        all_rows = list(queryset.values_list('pk', 'latitude', 'longitude'))
+        for (lat, lon), result in zip(queries[:to_verify], results):
+            expected = nearest_in_rows(all_rows, lat, lon, radius, limit)
+            if [pk for _, pk in expected] != [pk for _, pk in result]:
+                self.stdout.write(self.style.ERROR(f'Résultat incorrect pour ({lat:.4f}, {lon:.4f})'))
+                return
+        self.stdout.write(self.style.SUCCESS(f'{to_verify} requêtes vérifiées contre le calcul exhaustif'))
@@ -0,0 +1,116 @@
+"""
+Benchmark de la liste des POI : représentation complète contre `?view=card`.
+
+Crée des POI synthétiques (tags, médias, metadata volumineuse) dans une
+transaction annulée à la fin, puis appelle `GET /tourist-points/` page par
+page avec les deux représentations : débit (POI/s), requêtes SQL par page et
+taille de la réponse JSON.
+
+Usage:
+    docker-compose exec backend python manage.py benchmark_tourist_point_cards --points 2000
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.poi.models import BudgetLevel, DifficultyLevel, POIMedia, Tag, TouristPoint
+
+PAGE_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = 'Compare la liste complète des POI et la représentation carte (?view=card)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=2000, help='POI synthétiques')
+        parser.add_argument('--dishes', type=int, default=40, help='Plats dans la metadata de chaque POI')
+        parser.add_argument('--rounds', type=int, default=3, help='Parcours complets mesurés par représentation')
+
+    def handle(self, *args, **options):
+        from apps.poi.views import TouristPointViewSet
+
+        with transaction.atomic():
+            owner = self._populate(options['points'], options['dishes'])
+            view = TouristPointViewSet.as_view({'get': 'list'})
+            results = {
+                label: self._walk(view, owner, params, options['rounds'])
+                for label, params in (('complète', {}), ('carte', {'view': 'card'}))
+            }
+            transaction.set_rollback(True)
+
+        for label, (rows, elapsed, size, queries) in results.items():
+            self.stdout.write(
+                f'{label:>8} : {rows / elapsed:,.0f} POI/s, {size / rows:,.0f} octets/POI, '
+                f'{queries} requêtes/page'
+            )
+        full, card = results['complète'], results['carte']
+        self.stdout.write(self.style.SUCCESS(
+            f'Carte : débit x{(card[0] / card[1]) / (full[0] / full[1]):.1f}, charge utile /{full[2] / card[2]:.1f}'
+        ))
+
+    def _populate(self, count, dishes):
+        suffix = uuid.uuid4().hex[:8]
+        owner = get_user_model().objects.create(username=f'cards-{suffix}', email=f'cards-{suffix}@example.com')
+        budget = BudgetLevel.objects.create(code=f'bench-{suffix}', label_fr='Moyen', label_en='Medium')
+        difficulty = DifficultyLevel.objects.create(code=f'bench-{suffix}', label_fr='Facile', label_en='Easy')
+        tags = [Tag.objects.create(code=f'bench-{suffix}-{index}', label_fr=f'Tag {index}') for index in range(5)]
+        metadata = {
+            'restaurant': {
+                'dishes': [
+                    {'name': f'Plat {index}', 'description': 'Tajine aux pruneaux et amandes ' * 3, 'price': '95.00'}
+                    for index in range(dishes)
+                ],
+            },
+        }
+        points = TouristPoint.objects.bulk_create([
+            TouristPoint(
+                owner=owner, name=f'POI {index}', description='Riad au cœur de la médina. ' * 10,
+                address=f'{index} derb Dabachi, Marrakech', latitude='31.629500', longitude='-7.981100',
+                rating='4.50', budget_level=budget, difficulty_level=difficulty,
+                is_active=True, is_restaurant=True, metadata=metadata,
+            )
+            for index in range(count)
+        ])
+        TouristPoint.tags.through.objects.bulk_create([
+            TouristPoint.tags.through(touristpoint_id=point.pk, tag_id=tag.pk)
+            for point in points for tag in tags[:3]
+        ])
+        POIMedia.objects.bulk_create([
+            POIMedia(tourist_point=point, kind='image', external_url=f'https://cdn.example.com/poi/{point.pk}.jpg')
+            for point in points for _ in range(2)
+        ])
+        return owner
+
+    def _walk(self, view, owner, params, rounds):
+        factory = APIRequestFactory()
+        rows = size = 0
+        queries = set()
+        started = time.perf_counter()
+        for _ in range(rounds):
+            url, query = '/api/v1/tourist-points/', {**params, 'owner': 'me', 'page_size': PAGE_SIZE}
+            while url:
+                request = factory.get(url, query)
+                force_authenticate(request, user=owner)
+                with CaptureQueriesContext(connection) as captured:
+                    response = view(request)
+                    response.render()
+                if response.status_code != 200:
+                    raise CommandError(f'Réponse {response.status_code} : {response.content[:200]!r}')
+                queries.add(len(captured))
+                rows += len(response.data)
+                size += len(response.content)
+                url, query = self._next(response), None
+        elapsed = time.perf_counter() - started
+        return rows, elapsed, size, '/'.join(str(count) for count in sorted(queries))
+
+    @staticmethod
+    def _next(response):
+        for link in response.get('Link', '').split(','):
+            if 'rel="next"' in link:
+                return link.split(';')[0].strip().strip('<>')
+        return None
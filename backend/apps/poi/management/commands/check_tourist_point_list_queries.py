@@ -0,0 +1,81 @@
+"""
+Vérifie que la liste des POI s'exécute en un nombre constant de requêtes SQL.
+
+Dans une transaction annulée à la fin, crée des POI pour plusieurs
+partenaires puis appelle `GET /tourist-points/` avec des tailles de page
+différentes (en administrateur et en partenaire) : le nombre de requêtes ne
+doit pas dépendre du nombre de lignes sérialisées, et la lecture ne doit
+rien écrire.
+
+Usage:
+    docker-compose exec backend python manage.py check_tourist_point_list_queries --points 60
+"""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.poi.models import POIConversation, TouristPoint
+from apps.poi.views import TouristPointViewSet
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class Command(BaseCommand):
+    help = 'Compte les requêtes SQL de la liste des POI selon la taille de page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=60, help='POI créés par partenaire')
+        parser.add_argument('--partners', type=int, default=3, help='Partenaires propriétaires')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options['points'], options['partners'])
+            transaction.set_rollback(True)
+
+    def _run(self, point_count, partner_count):
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        admin = User.objects.create(
+            username=f'list-admin-{suffix}', email=f'list-admin-{suffix}@example.com', is_staff=True,
+        )
+        partners = [
+            User.objects.create(username=f'list-{index}-{suffix}', email=f'list-{index}-{suffix}@example.com')
+            for index in range(partner_count)
+        ]
+        for partner in partners:
+            for index in range(point_count):
+                TouristPoint.objects.create(owner=partner, name=f'POI {index}', is_active=True)
+        # POI sans conversation (créés avant le signal) : la lecture ne doit pas la créer.
+        POIConversation.objects.filter(tourist_point__owner=partners[0]).delete()
+
+        view = TouristPointViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        scenarios = [
+            ('administrateur', admin, {'owner': str(partners[0].pk)}),
+            ('partenaire', partners[-1], {'owner': 'me'}),
+        ]
+        sizes = (1, 10, min(point_count, 50))
+        for label, user, params in scenarios:
+            counts = []
+            for size in sizes:
+                request = factory.get('/api/v1/tourist-points/', {**params, 'page_size': size})
+                force_authenticate(request, user=user)
+                with CaptureQueriesContext(connection) as queries:
+                    response = view(request)
+                    response.render()
+                if response.status_code != 200 or len(response.data) != size:
+                    raise CommandError(f'{label} : réponse {response.status_code}, {len(response.data)} POI')
+                writes = [q['sql'] for q in queries.captured_queries if q['sql'].lstrip().upper().startswith(WRITE_PREFIXES)]
+                if writes:
+                    raise CommandError(f'{label} : écriture pendant la lecture : {writes[0][:120]}')
+                counts.append(len(queries))
+            self.stdout.write(
+                f'{label} : ' + ', '.join(f'{size} POI -> {count} requêtes' for size, count in zip(sizes, counts))
+            )
+            if len(set(counts)) != 1:
+                raise CommandError(f'{label} : le nombre de requêtes dépend de la taille de page {counts}')
+        self.stdout.write(self.style.SUCCESS('Nombre de requêtes constant pour la liste des POI'))
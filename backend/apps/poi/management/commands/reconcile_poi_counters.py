@@ -0,0 +1,24 @@
+"""
+Recalcule `favorite_count` et `view_count` des POI qui ont dérivé.
+
+Les compteurs sont incrémentés en base à chaque favori et à chaque écriture
+des vues (apps.poi.counters) ; les écritures qui contournent les signaux
+(imports, `bulk_create`) peuvent les décaler. À planifier chaque nuit.
+
+Usage:
+    docker-compose exec backend python manage.py reconcile_poi_counters --batch-size 1000
+"""
+from django.core.management.base import BaseCommand
+
+from apps.poi.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Corrige les compteurs de favoris et de vues des POI à partir des tables sources'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='POI corrigés par requête')
+
+    def handle(self, *args, **options):
+        fixed = reconcile_counters(batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f'{fixed} POI corrigé(s)'))
@@ -0,0 +1,143 @@
+"""
+Test de charge des écritures concurrentes sur une section JSON d'un POI.
+
+Plusieurs threads (une connexion chacun) ajoutent des éléments à la même
+section (par défaut `metadata['restaurant']['dishes']`) via `mutate_section`.
+À la fin, chaque élément écrit doit être présent (aucune mise à jour perdue),
+`metadata_revision` doit avoir avancé d'autant et les autres sections de
+`metadata` doivent être intactes. Avec `--if-match`, les écrivains utilisent
+le versionnement optimiste (relecture + nouvel essai sur 412).
+
+Le POI de test est créé puis supprimé (les threads doivent voir des données
+validées). À lancer sur PostgreSQL : SQLite sérialise les écritures.
+
+Usage:
+    docker-compose exec backend python manage.py stress_metadata_sections --writers 32 --writes 50
+"""
+import statistics
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from apps.poi.metadata_sections import PreconditionFailed, mutate_section, read_section
+from apps.poi.models import TouristPoint
+
+
+class Command(BaseCommand):
+    help = 'Écrivains concurrents sur une section de metadata : pertes de mises à jour et latence'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=16, help='Nombre de threads écrivains')
+        parser.add_argument('--writes', type=int, default=25, help='Écritures par thread')
+        parser.add_argument('--root', default='restaurant', help='Racine dans metadata (activity, restaurant)')
+        parser.add_argument('--section', default='dishes', help='Clé de la section')
+        parser.add_argument('--if-match', action='store_true', help='Versionnement optimiste avec nouvel essai')
+        parser.add_argument('--max-p95-ms', type=float, default=250.0, help='Seuil de latence p95 (ms)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                'Base non PostgreSQL : les écritures sont sérialisées, latences non représentatives.'
+            ))
+        point, owner = self._create_point(options)
+        try:
+            self._run(point, options)
+        finally:
+            point.delete()
+            owner.delete()
+
+    def _create_point(self, options):
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        owner = User.objects.create(username=f'stress-{suffix}', email=f'stress-{suffix}@example.com')
+        metadata = {
+            options['root']: {options['section']: [], 'sentinel': [{'id': 'keep'}]},
+            'other': {'value': 1},
+        }
+        point = TouristPoint.objects.create(
+            owner=owner, name=f'Stress POI {suffix}', latitude=0, longitude=0, metadata=metadata,
+        )
+        return point, owner
+
+    def _run(self, point, options):
+        root, key = options['root'], options['section']
+        writers, writes = options['writers'], options['writes']
+        latencies, conflicts, errors = [], [], []
+        lock = threading.Lock()
+        start_barrier = threading.Barrier(writers)
+
+        def append(entry):
+            return lambda items: (items + [entry], None)
+
+        def worker(index):
+            local_latencies, local_conflicts = [], 0
+            try:
+                start_barrier.wait()
+                for position in range(writes):
+                    entry = {'id': f'{index}-{position}', 'name': f'Plat {index}-{position}'}
+                    started = time.perf_counter()
+                    while True:
+                        expected = None
+                        if options['if_match']:
+                            _, expected = read_section(point.pk, root, key)
+                        try:
+                            mutate_section(point.pk, root, key, append(entry), expected_revision=expected)
+                            break
+                        except PreconditionFailed:
+                            local_conflicts += 1
+                    local_latencies.append((time.perf_counter() - started) * 1000)
+            except Exception as exc:  # noqa: BLE001 - remonté dans le rapport
+                with lock:
+                    errors.append(repr(exc))
+            finally:
+                connections.close_all()
+            with lock:
+                latencies.extend(local_latencies)
+                conflicts.append(local_conflicts)
+
+        self.stdout.write(f'{writers} écrivains x {writes} écritures sur metadata[{root!r}][{key!r}]...')
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if errors:
+            raise CommandError(f'{len(errors)} écrivain(s) en erreur : {errors[0]}')
+
+        point.refresh_from_db(fields=['metadata', 'metadata_revision'])
+        items = point.metadata[root][key]
+        expected_ids = {f'{index}-{position}' for index in range(writers) for position in range(writes)}
+        written_ids = {item['id'] for item in items}
+        lost = expected_ids - written_ids
+        total = writers * writes
+
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+        self.stdout.write(
+            f'{total} écritures en {elapsed:.2f} s ({total / elapsed:.0f}/s) - '
+            f'p50 {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms, max {latencies[-1]:.1f} ms'
+        )
+        if options['if_match']:
+            self.stdout.write(f'Conflits 412 rejoués : {sum(conflicts)}')
+
+        problems = []
+        if lost:
+            problems.append(f'{len(lost)} mise(s) à jour perdue(s)')
+        if len(items) != total:
+            problems.append(f'{len(items)} éléments au lieu de {total}')
+        if point.metadata_revision != total:
+            problems.append(f'révision {point.metadata_revision} au lieu de {total}')
+        if point.metadata[root].get('sentinel') != [{'id': 'keep'}] or point.metadata.get('other') != {'value': 1}:
+            problems.append('sections voisines modifiées')
+        if p95 > options['max_p95_ms']:
+            problems.append(f'p95 {p95:.1f} ms > {options["max_p95_ms"]} ms')
+        if problems:
+            raise CommandError(' ; '.join(problems))
+        self.stdout.write(self.style.SUCCESS('Aucune mise à jour perdue, latence dans la limite.'))
@@ -0,0 +1,203 @@
+"""
+Mises à jour atomiques des sections JSON de `TouristPoint.metadata`
+(`metadata['activity'][...]`, `metadata['restaurant'][...]`) et de ses clés
+de premier niveau (`metadata['admin_message']`, `write_key`).
+
+Chaque écriture :
+- verrouille la ligne du POI (`SELECT ... FOR UPDATE`) et relit la section à jour ;
+- applique la modification à cette seule liste ;
+- réécrit uniquement le chemin concerné avec `jsonb_set` sur PostgreSQL,
+  et incrémente `metadata_revision` dans la même requête.
+
+`metadata_revision` sert de version optimiste : le client renvoie l'ETag lu
+dans `If-Match` et l'écriture est refusée (412) si le POI a changé entre-temps.
+"""
+from __future__ import annotations
+
+import json
+from typing import Callable, List, Optional, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models.fields.json import KeyTransform
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import TouristPoint
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'La section a été modifiée entre-temps. Rechargez puis réessayez.'
+    default_code = 'precondition_failed'
+
+
+def format_etag(revision: int) -> str:
+    return f'"{revision}"'
+
+
+def parse_if_match(header: Optional[str]) -> Optional[int]:
+    """Révision attendue d'après l'en-tête If-Match (None si absent ou `*`)."""
+    if not header or header.strip() == '*':
+        return None
+    value = header.strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise PreconditionFailed('En-tête If-Match invalide.')
+
+
+def _section_expression(root: str, key: str):
+    return KeyTransform(key, KeyTransform(root, 'metadata'))
+
+
+def read_section(point_id, root: str, key: str) -> Tuple[List[dict], int]:
+    """Liste d'une section et révision courante, sans charger tout `metadata`."""
+    row = (
+        TouristPoint.objects.filter(pk=point_id)
+        .annotate(section=_section_expression(root, key))
+        .values_list('section', 'metadata_revision')
+        .first()
+    )
+    if row is None:
+        raise TouristPoint.DoesNotExist
+    items, revision = row
+    return _as_list(items), revision
+
+
+def _as_list(value) -> List[dict]:
+    if isinstance(value, str):
+        value = json.loads(value)
+    return list(value) if isinstance(value, list) else []
+
+
+def _write_section_postgres(point_id, root: str, key: str, items: List[dict]) -> int:
+    table = TouristPoint._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table}
+               SET metadata = jsonb_set(
+                       jsonb_set(
+                           COALESCE(metadata, '{{}}'::jsonb),
+                           ARRAY[%s::text],
+                           CASE WHEN jsonb_typeof(metadata -> %s) = 'object'
+                                THEN metadata -> %s ELSE '{{}}'::jsonb END,
+                           true
+                       ),
+                       ARRAY[%s::text, %s::text],
+                       %s::jsonb,
+                       true
+                   ),
+                   metadata_revision = metadata_revision + 1,
+                   updated_at = %s
+             WHERE id = %s
+         RETURNING metadata_revision
+            """,
+            [root, root, root, root, key, json.dumps(items), timezone.now(), point_id],
+        )
+        return cursor.fetchone()[0]
+
+
+def _write_section_generic(point, root: str, key: str, items: List[dict]) -> int:
+    metadata = point.metadata or {}
+    section_root = metadata.get(root)
+    if not isinstance(section_root, dict):
+        section_root = {}
+    section_root[key] = items
+    metadata[root] = section_root
+    point.metadata = metadata
+    point.metadata_revision += 1
+    point.save(update_fields=['metadata', 'metadata_revision', 'updated_at'])
+    return point.metadata_revision
+
+
+def mutate_section(
+    point_id,
+    root: str,
+    key: str,
+    mutator: Callable[[List[dict]], Tuple[List[dict], object]],
+    expected_revision: Optional[int] = None,
+):
+    """
+    Applique `mutator(items) -> (new_items, result)` à la section sous verrou.
+    Retourne `(result, nouvelle_revision)`.
+    """
+    with transaction.atomic():
+        queryset = TouristPoint.objects.select_for_update().filter(pk=point_id)
+        if connection.vendor == 'postgresql':
+            row = (
+                queryset.annotate(section=_section_expression(root, key))
+                .values_list('section', 'metadata_revision')
+                .first()
+            )
+            if row is None:
+                raise TouristPoint.DoesNotExist
+            items, revision = _as_list(row[0]), row[1]
+            point = None
+        else:
+            point = queryset.only('id', 'metadata', 'metadata_revision').first()
+            if point is None:
+                raise TouristPoint.DoesNotExist
+            section_root = (point.metadata or {}).get(root)
+            items = _as_list(section_root.get(key) if isinstance(section_root, dict) else None)
+            revision = point.metadata_revision
+
+        if expected_revision is not None and expected_revision != revision:
+            raise PreconditionFailed()
+
+        new_items, result = mutator(items)
+        # UUID, dates, décimaux -> types JSON natifs, identiques sur les deux chemins.
+        new_items = json.loads(json.dumps(new_items, cls=DjangoJSONEncoder))
+        if point is None:
+            new_revision = _write_section_postgres(point_id, root, key, new_items)
+        else:
+            new_revision = _write_section_generic(point, root, key, new_items)
+    return result, new_revision
+
+
+def write_key(point_id, key: str, value) -> int:
+    """
+    Écrit une clé de premier niveau de `metadata` (la retire si `value` est
+    None) et incrémente `metadata_revision` ; retourne la nouvelle révision.
+    """
+    if connection.vendor == 'postgresql':
+        # Un seul UPDATE (verrou de ligne implicite) qui ne touche que cette clé.
+        if value is None:
+            expression, params = "COALESCE(metadata, '{}'::jsonb) - %s", [key]
+        else:
+            expression = "jsonb_set(COALESCE(metadata, '{}'::jsonb), ARRAY[%s::text], %s::jsonb, true)"
+            params = [key, json.dumps(value, cls=DjangoJSONEncoder)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {TouristPoint._meta.db_table}
+                   SET metadata = {expression},
+                       metadata_revision = metadata_revision + 1,
+                       updated_at = %s
+                 WHERE id = %s
+             RETURNING metadata_revision
+                """,
+                [*params, timezone.now(), point_id],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            raise TouristPoint.DoesNotExist
+        return row[0]
+
+    with transaction.atomic():
+        point = TouristPoint.objects.select_for_update().filter(pk=point_id).only('id', 'metadata', 'metadata_revision').first()
+        if point is None:
+            raise TouristPoint.DoesNotExist
+        metadata = point.metadata or {}
+        if value is None:
+            metadata.pop(key, None)
+        else:
+            metadata[key] = json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+        point.metadata = metadata
+        point.metadata_revision += 1
+        point.save(update_fields=['metadata', 'metadata_revision', 'updated_at'])
+        return point.metadata_revision
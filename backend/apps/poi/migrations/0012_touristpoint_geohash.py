@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:03
+
+from django.db import migrations, models
+
+from apps.poi.geo import geohash_for
+
+
+def backfill_geohash(apps, schema_editor):
+    TouristPoint = apps.get_model('poi', 'TouristPoint')
+    batch = []
+    queryset = (
+        TouristPoint.objects.exclude(latitude__isnull=True)
+        .exclude(longitude__isnull=True)
+        .only('id', 'latitude', 'longitude')
+    )
+    for point in queryset.iterator(chunk_size=2000):
+        point.geohash = geohash_for(point.latitude, point.longitude)
+        batch.append(point)
+        if len(batch) >= 2000:
+            TouristPoint.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        TouristPoint.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poi', '0011_touristpointreview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='touristpoint',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
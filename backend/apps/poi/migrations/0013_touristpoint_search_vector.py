@@ -0,0 +1,43 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:08
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from apps.poi.search import search_vector_expression
+
+
+def backfill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    TouristPoint = apps.get_model('poi', 'TouristPoint')
+    Tag = apps.get_model('poi', 'Tag')
+    TouristPoint.objects.update(search_vector=search_vector_expression(Tag))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poi', '0012_touristpoint_geohash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='touristpoint',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='touristpoint',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='poi_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='touristpoint',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='poi_name_trgm_gin', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,149 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:12
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poi', '0013_touristpoint_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccommodationAvailability',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('room_id', models.CharField(max_length=64)),
+                ('date', models.DateField()),
+                ('is_available', models.BooleanField(default=True)),
+                ('special_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('minimum_stay', models.PositiveIntegerField(blank=True, null=True)),
+                ('tourist_point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accommodation_availability', to='poi.touristpoint')),
+            ],
+            options={
+                'ordering': ['date', 'room_id'],
+                'indexes': [models.Index(fields=['tourist_point', 'date'], name='poi_accommo_tourist_e2bbba_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tourist_point', 'room_id', 'date'), name='poi_accommodation_availability_room_date')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccommodationBooking',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('room_id', models.CharField(max_length=64)),
+                ('customer_name', models.CharField(max_length=255)),
+                ('customer_email', models.EmailField(max_length=254)),
+                ('customer_phone', models.CharField(blank=True, max_length=64, null=True)),
+                ('check_in_date', models.DateField()),
+                ('check_out_date', models.DateField()),
+                ('number_of_guests', models.PositiveIntegerField(default=1)),
+                ('total_nights', models.PositiveIntegerField(default=1)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('booking_status', models.CharField(max_length=32)),
+                ('special_requests', models.TextField(blank=True, null=True)),
+                ('tourist_point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accommodation_bookings', to='poi.touristpoint')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['tourist_point', 'room_id', 'check_in_date'], name='poi_accommo_tourist_6305ad_idx'), models.Index(fields=['tourist_point', 'booking_status'], name='poi_accommo_tourist_9c99a2_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccommodationLegacyRate',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('room_id', models.CharField(max_length=64)),
+                ('rate_name', models.CharField(max_length=255)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('price_per_night', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('minimum_stay', models.PositiveIntegerField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('meal_plan_pricing', models.JSONField(blank=True, null=True)),
+                ('tourist_point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accommodation_legacy_rates', to='poi.touristpoint')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['tourist_point', 'room_id', 'start_date'], name='poi_accommo_tourist_100001_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccommodationRatePlan',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('room_id', models.CharField(max_length=64)),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('base_meal_plan', models.CharField(choices=[('bb', 'Bed & Breakfast'), ('half_board', 'Demi-pension'), ('full_board', 'Pension complète'), ('all_inclusive', 'Tout inclus')], max_length=32)),
+                ('pricing_strategy', models.CharField(blank=True, max_length=120, null=True)),
+                ('currency', models.CharField(default='EUR', max_length=8)),
+                ('is_active', models.BooleanField(default=True)),
+                ('display_order', models.IntegerField(default=0)),
+                ('tourist_point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accommodation_rate_plans', to='poi.touristpoint')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['tourist_point', 'room_id'], name='poi_accommo_tourist_bd5f6b_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccommodationRateSeason',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('rate_plan_id', models.CharField(max_length=64)),
+                ('season_name', models.CharField(max_length=255)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('base_price', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('currency', models.CharField(default='EUR', max_length=8)),
+                ('meal_plan_pricing', models.JSONField(blank=True, null=True)),
+                ('minimum_stay', models.PositiveIntegerField(blank=True, null=True)),
+                ('maximum_stay', models.PositiveIntegerField(blank=True, null=True)),
+                ('closed_to_arrival', models.BooleanField(blank=True, null=True)),
+                ('closed_to_departure', models.BooleanField(blank=True, null=True)),
+                ('advance_purchase_days', models.IntegerField(blank=True, null=True)),
+                ('cutoff_hours', models.IntegerField(blank=True, null=True)),
+                ('restrictions', models.JSONField(blank=True, null=True)),
+                ('tourist_point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accommodation_rate_seasons', to='poi.touristpoint')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['tourist_point', 'rate_plan_id', 'start_date'], name='poi_accommo_tourist_28df53_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccommodationRoom',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('room_name', models.CharField(max_length=255)),
+                ('room_type', models.CharField(max_length=120)),
+                ('capacity', models.PositiveIntegerField(default=1)),
+                ('base_price_per_night', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('amenities', models.JSONField(blank=True, default=list)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('images', models.JSONField(blank=True, default=list)),
+                ('is_available', models.BooleanField(default=True)),
+                ('inventory_total', models.PositiveIntegerField(default=1)),
+                ('tourist_point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accommodation_rooms', to='poi.touristpoint')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['tourist_point', 'created_at'], name='poi_accommo_tourist_bcf351_idx')],
+            },
+        ),
+    ]
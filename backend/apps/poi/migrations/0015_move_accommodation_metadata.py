@@ -0,0 +1,179 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:14
+"""
+Déplace TouristPoint.metadata['accommodation'] vers les tables dédiées.
+
+Les éléments impossibles à convertir (date invalide, champ obligatoire
+manquant) restent dans metadata['accommodation'] pour ne rien perdre.
+"""
+import datetime
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+# section JSON -> (modèle, champs date, champs décimaux, champs obligatoires)
+SECTIONS = {
+    'rooms': ('AccommodationRoom', (), ('base_price_per_night',), ('room_name',)),
+    'bookings': (
+        'AccommodationBooking',
+        ('check_in_date', 'check_out_date'),
+        ('total_amount',),
+        ('room_id', 'customer_name', 'customer_email'),
+    ),
+    'availability': ('AccommodationAvailability', ('date',), ('special_price',), ('room_id',)),
+    'rate_plans': ('AccommodationRatePlan', (), (), ('room_id', 'name')),
+    'rate_seasons': ('AccommodationRateSeason', ('start_date', 'end_date'), ('base_price',), ('rate_plan_id',)),
+    'legacy_rates': ('AccommodationLegacyRate', ('start_date', 'end_date'), ('price_per_night',), ('room_id',)),
+}
+
+
+class _Invalid(Exception):
+    pass
+
+
+def _uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        return uuid.uuid4()
+
+
+def _decimal(value):
+    if value in (None, ''):
+        return None
+    try:
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise _Invalid(value)
+
+
+def _convert(model, item, date_fields, decimal_fields, required, point_id, fallback_created):
+    names = {field.name for field in model._meta.concrete_fields}
+    row = {}
+    for key, value in item.items():
+        if key in names and key not in {'id', 'tourist_point', 'created_at', 'updated_at'}:
+            row[key] = value
+    for key in required:
+        if not row.get(key):
+            raise _Invalid(key)
+    for key in date_fields:
+        parsed = parse_date(str(row.get(key) or '')[:10])
+        if parsed is None:
+            raise _Invalid(key)
+        row[key] = parsed
+    for key in decimal_fields:
+        if key in row:
+            row[key] = _decimal(row[key])
+            if row[key] is None and not model._meta.get_field(key).null:
+                row.pop(key)
+    for key in ('room_id', 'rate_plan_id'):
+        if key in row:
+            row[key] = str(row[key])
+    created = parse_datetime(str(item.get('created_at') or '')) or fallback_created
+    if timezone.is_naive(created):
+        created = timezone.make_aware(created, datetime.timezone.utc)
+    updated = parse_datetime(str(item.get('updated_at') or '')) or created
+    if timezone.is_naive(updated):
+        updated = timezone.make_aware(updated, datetime.timezone.utc)
+    return model(
+        id=_uuid(item.get('id')),
+        tourist_point_id=point_id,
+        created_at=created,
+        updated_at=updated,
+        **row,
+    )
+
+
+def move_accommodation_metadata(apps, schema_editor):
+    TouristPoint = apps.get_model('poi', 'TouristPoint')
+    models = {key: apps.get_model('poi', spec[0]) for key, spec in SECTIONS.items()}
+    # Conserver les horodatages d'origine (l'ordre d'affichage en dépend).
+    for model in models.values():
+        for name in ('created_at', 'updated_at'):
+            field = model._meta.get_field(name)
+            field.auto_now = field.auto_now_add = False
+
+    points = TouristPoint.objects.filter(metadata__has_key='accommodation').only('id', 'metadata')
+    for point in points.iterator(chunk_size=200):
+        metadata = point.metadata or {}
+        accommodation = metadata.get('accommodation') or {}
+        leftovers = {}
+        base = timezone.now()
+        for key, items in accommodation.items():
+            if key not in SECTIONS or not isinstance(items, list):
+                leftovers[key] = items
+                continue
+            _, date_fields, decimal_fields, required = SECTIONS[key]
+            model = models[key]
+            rows, rejected, seen_ids, seen_slots = [], [], set(), {}
+            for position, item in enumerate(items):
+                try:
+                    if not isinstance(item, dict):
+                        raise _Invalid(item)
+                    row = _convert(
+                        model, item, date_fields, decimal_fields, required, point.id,
+                        base + datetime.timedelta(microseconds=position),
+                    )
+                except _Invalid:
+                    rejected.append(item)
+                    continue
+                if row.id in seen_ids:
+                    row.id = uuid.uuid4()
+                seen_ids.add(row.id)
+                if key == 'availability':
+                    # Une seule ligne par (chambre, date) : la dernière saisie l'emporte.
+                    slot = (row.room_id, row.date)
+                    if slot in seen_slots:
+                        rows[seen_slots[slot]] = None
+                    seen_slots[slot] = len(rows)
+                rows.append(row)
+            model.objects.bulk_create([row for row in rows if row is not None], batch_size=1000)
+            if rejected:
+                leftovers[key] = rejected
+        if leftovers:
+            metadata['accommodation'] = leftovers
+        else:
+            metadata.pop('accommodation', None)
+        point.metadata = metadata
+        point.save(update_fields=['metadata'])
+
+
+def restore_accommodation_metadata(apps, schema_editor):
+    TouristPoint = apps.get_model('poi', 'TouristPoint')
+    sections = {}
+    for key, spec in SECTIONS.items():
+        model = apps.get_model('poi', spec[0])
+        fields = [field.name for field in model._meta.concrete_fields if field.name != 'tourist_point']
+        for obj in model.objects.order_by('created_at').iterator(chunk_size=2000):
+            item = {}
+            for name in fields:
+                value = getattr(obj, name)
+                if isinstance(value, (uuid.UUID, Decimal)):
+                    value = str(value) if isinstance(value, uuid.UUID) else float(value)
+                elif isinstance(value, (datetime.date, datetime.datetime)):
+                    value = value.isoformat()
+                item[name] = value
+            item['tourist_point_id'] = str(obj.tourist_point_id)
+            sections.setdefault(obj.tourist_point_id, {}).setdefault(key, []).append(item)
+    for point_id, data in sections.items():
+        point = TouristPoint.objects.only('id', 'metadata').get(pk=point_id)
+        metadata = point.metadata or {}
+        accommodation = metadata.get('accommodation') or {}
+        for key, items in data.items():
+            accommodation[key] = items + list(accommodation.get(key) or [])
+        metadata['accommodation'] = accommodation
+        point.metadata = metadata
+        point.save(update_fields=['metadata'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poi', '0014_accommodation_tables'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_accommodation_metadata, restore_accommodation_metadata),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poi', '0015_move_accommodation_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='touristpoint',
+            name='metadata_revision',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-17 01:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poi', '0016_touristpoint_metadata_revision'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='touristpoint',
+            index=models.Index(fields=['-created_at', '-id'], name='poi_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='touristpoint',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='poi_active_created_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.15 on 2026-10-17 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    TouristPoint = apps.get_model('poi', 'TouristPoint')
+    FavoriteTouristPoint = apps.get_model('poi', 'FavoriteTouristPoint')
+    TouristPointAnalytics = apps.get_model('analytics', 'TouristPointAnalytics')
+    favorites = (
+        FavoriteTouristPoint.objects.filter(tourist_point=OuterRef('pk'))
+        .order_by().values('tourist_point').annotate(total=Count('pk')).values('total')
+    )
+    views = (
+        TouristPointAnalytics.objects.filter(tourist_point=OuterRef('pk'))
+        .order_by().values('tourist_point').annotate(total=Sum('views')).values('total')
+    )
+    TouristPoint.objects.update(
+        favorite_count=Coalesce(Subquery(favorites), 0),
+        view_count=Coalesce(Subquery(views), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poi', '0017_cursor_pagination_indexes'),
+        ('analytics', '0002_touristpointanalytics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='touristpoint',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='touristpoint',
+            name='view_count',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='touristpoint',
+            index=models.Index(fields=['-favorite_count', '-id'], name='poi_favorites_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='touristpoint',
+            index=models.Index(fields=['-view_count', '-id'], name='poi_views_idx'),
+        ),
+    ]
@@ -3,9 +3,17 @@ from __future__ import annotations
 import uuid
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
 from django.utils import timezone
 
+from .geo import geohash_for
+from .search import SEARCHABLE_FIELDS, refresh_search_vectors
+from .suggest import invalidate_suggest_index
+
 
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -391,6 +399,7 @@ class TouristPoint(TimeStampedModel):
     description = models.TextField(blank=True)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
     address = models.CharField(max_length=255, blank=True)
     contact_email = models.EmailField(blank=True)
     contact_phone = models.CharField(max_length=64, blank=True)
@@ -414,13 +423,57 @@ class TouristPoint(TimeStampedModel):
     amenities = models.JSONField(default=list, blank=True)
     tags = models.ManyToManyField(Tag, blank=True, related_name='tourist_points')
     metadata = models.JSONField(default=dict, blank=True)
+    # Incrémenté à chaque écriture de `metadata` ; sert d'ETag (apps.poi.metadata_sections).
+    metadata_revision = models.PositiveIntegerField(default=0, editable=False)
+    # Maintenu par apps.poi.search.refresh_search_vectors (nom, tags, description, adresse).
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+    # Compteurs incrémentés en base (apps.poi.counters) ; non écrits par save().
+    favorite_count = models.PositiveIntegerField(default=0, editable=False)
+    view_count = models.PositiveBigIntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = ('favorite_count', 'view_count')
+    # Écrits sous verrou avec contrôle de révision (apps.poi.metadata_sections) ;
+    # jamais réécrits par un save() sans update_fields explicites.
+    METADATA_FIELDS = ('metadata', 'metadata_revision')
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='poi_search_vector_gin'),
+            GinIndex(fields=['name'], name='poi_name_trgm_gin', opclasses=['gin_trgm_ops']),
+            # Liste paginée par curseur (created_at, id), avec ou sans filtre is_active.
+            models.Index(fields=['-created_at', '-id'], name='poi_created_idx'),
+            models.Index(fields=['is_active', '-created_at', '-id'], name='poi_active_created_idx'),
+            # Tri par popularité (`?ordering=-favorite_count` / `-view_count`), paginé par curseur.
+            models.Index(fields=['-favorite_count', '-id'], name='poi_favorites_idx'),
+            models.Index(fields=['-view_count', '-id'], name='poi_views_idx'),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return self.name
 
+    def save(self, *args, **kwargs):
+        deferred = self.get_deferred_fields()
+        if not {'latitude', 'longitude'} & deferred:
+            # Garde la cellule geohash alignée sur les coordonnées (recherche par rayon).
+            self.geohash = geohash_for(self.latitude, self.longitude)
+            deferred.discard('geohash')
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            # Les compteurs en mémoire peuvent être périmés : seul apps.poi.counters les écrit.
+            # `metadata` aussi : une copie en mémoire écraserait une section écrite entre-temps.
+            # Les champs différés (`only()` / `defer()`) ne sont pas chargés : jamais réécrits.
+            update_fields = kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.name not in self.METADATA_FIELDS
+                and field.attname not in deferred
+            ]
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
 
 class POIMedia(TimeStampedModel):
     tourist_point = models.ForeignKey(TouristPoint, related_name='media', on_delete=models.CASCADE)
@@ -523,3 +576,298 @@ class TouristPointReview(TimeStampedModel):
 
     def __str__(self) -> str:  # pragma: no cover
         return f"Review by {self.reviewer_id} for {self.tourist_point.name}"
+
+
+# --- Hébergement : sections gérées par le partenaire ------------------------
+# Anciennement stockées dans TouristPoint.metadata['accommodation'] ; `room_id`
+# et `rate_plan_id` restent des identifiants libres comme dans l'API.
+
+MEAL_PLAN_CHOICES = [
+    ('bb', 'Bed & Breakfast'),
+    ('half_board', 'Demi-pension'),
+    ('full_board', 'Pension complète'),
+    ('all_inclusive', 'Tout inclus'),
+]
+
+
+class AccommodationRoom(TimeStampedModel):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tourist_point = models.ForeignKey(TouristPoint, related_name='accommodation_rooms', on_delete=models.CASCADE)
+    room_name = models.CharField(max_length=255)
+    room_type = models.CharField(max_length=120)
+    capacity = models.PositiveIntegerField(default=1)
+    base_price_per_night = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    amenities = models.JSONField(default=list, blank=True)
+    description = models.TextField(null=True, blank=True)
+    images = models.JSONField(default=list, blank=True)
+    is_available = models.BooleanField(default=True)
+    inventory_total = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['tourist_point', 'created_at'])]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.room_name
+
+
+class AccommodationBooking(TimeStampedModel):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tourist_point = models.ForeignKey(TouristPoint, related_name='accommodation_bookings', on_delete=models.CASCADE)
+    room_id = models.CharField(max_length=64)
+    customer_name = models.CharField(max_length=255)
+    customer_email = models.EmailField()
+    customer_phone = models.CharField(max_length=64, null=True, blank=True)
+    check_in_date = models.DateField()
+    check_out_date = models.DateField()
+    number_of_guests = models.PositiveIntegerField(default=1)
+    total_nights = models.PositiveIntegerField(default=1)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    booking_status = models.CharField(max_length=32)
+    special_requests = models.TextField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['tourist_point', 'room_id', 'check_in_date']),
+            models.Index(fields=['tourist_point', 'booking_status']),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.customer_name} ({self.check_in_date} → {self.check_out_date})"
+
+
+class AccommodationAvailability(TimeStampedModel):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tourist_point = models.ForeignKey(
+        TouristPoint, related_name='accommodation_availability', on_delete=models.CASCADE
+    )
+    room_id = models.CharField(max_length=64)
+    date = models.DateField()
+    is_available = models.BooleanField(default=True)
+    special_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    minimum_stay = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['date', 'room_id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tourist_point', 'room_id', 'date'],
+                name='poi_accommodation_availability_room_date',
+            ),
+        ]
+        indexes = [models.Index(fields=['tourist_point', 'date'])]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.room_id} - {self.date}"
+
+
+class AccommodationRatePlan(TimeStampedModel):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tourist_point = models.ForeignKey(TouristPoint, related_name='accommodation_rate_plans', on_delete=models.CASCADE)
+    room_id = models.CharField(max_length=64)
+    name = models.CharField(max_length=255)
+    description = models.TextField(null=True, blank=True)
+    base_meal_plan = models.CharField(max_length=32, choices=MEAL_PLAN_CHOICES)
+    pricing_strategy = models.CharField(max_length=120, null=True, blank=True)
+    currency = models.CharField(max_length=8, default='EUR')
+    is_active = models.BooleanField(default=True)
+    display_order = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['tourist_point', 'room_id'])]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.name
+
+
+class AccommodationRateSeason(TimeStampedModel):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tourist_point = models.ForeignKey(
+        TouristPoint, related_name='accommodation_rate_seasons', on_delete=models.CASCADE
+    )
+    rate_plan_id = models.CharField(max_length=64)
+    season_name = models.CharField(max_length=255)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    base_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    currency = models.CharField(max_length=8, default='EUR')
+    meal_plan_pricing = models.JSONField(null=True, blank=True)
+    minimum_stay = models.PositiveIntegerField(null=True, blank=True)
+    maximum_stay = models.PositiveIntegerField(null=True, blank=True)
+    closed_to_arrival = models.BooleanField(null=True, blank=True)
+    closed_to_departure = models.BooleanField(null=True, blank=True)
+    advance_purchase_days = models.IntegerField(null=True, blank=True)
+    cutoff_hours = models.IntegerField(null=True, blank=True)
+    restrictions = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['tourist_point', 'rate_plan_id', 'start_date'])]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.season_name
+
+
+class AccommodationLegacyRate(TimeStampedModel):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tourist_point = models.ForeignKey(
+        TouristPoint, related_name='accommodation_legacy_rates', on_delete=models.CASCADE
+    )
+    room_id = models.CharField(max_length=64)
+    rate_name = models.CharField(max_length=255)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    price_per_night = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    minimum_stay = models.PositiveIntegerField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    meal_plan_pricing = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['tourist_point', 'room_id', 'start_date'])]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.rate_name
+
+
+
+@receiver(post_save, sender=TouristPoint)
+def refresh_tourist_point_search_vector(sender, instance: TouristPoint, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('raw') or (update_fields is not None and not SEARCHABLE_FIELDS & set(update_fields)):
+        return
+    refresh_search_vectors(TouristPoint.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=TouristPoint)
+def ensure_poi_conversation(sender, instance: TouristPoint, created: bool, **kwargs):
+    # Créée à l'écriture : la sérialisation (GET) ne fait plus de get_or_create.
+    if created and not kwargs.get('raw'):
+        POIConversation.objects.get_or_create(tourist_point=instance)
+
+
+def _tag_change_points(instance, action: str, reverse: bool, pk_set):
+    """POI dont les tags viennent de changer (None si rien à faire pour cette action)."""
+    if reverse and action == 'pre_clear':
+        # `pk_set` est vide après un clear() depuis le tag : on retient les POI avant.
+        instance._cleared_point_pks = list(instance.tourist_points.values_list('pk', flat=True))
+        return None
+    if action not in {'post_add', 'post_remove', 'post_clear'}:
+        return None
+    if not reverse:
+        return [instance.pk]
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_point_pks', None)
+    return list(pk_set) if pk_set else None
+
+
+@receiver(m2m_changed, sender=TouristPoint.tags.through)
+def refresh_search_vector_on_tags_change(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    point_ids = _tag_change_points(instance, action, reverse, pk_set)
+    if point_ids:
+        refresh_search_vectors(TouristPoint.objects.filter(pk__in=point_ids))
+
+
+def _existing_tag_pairs(instance, reverse: bool, pk_set):
+    """Couples (POI, tag) réellement liés parmi ceux visés par un retrait ou un clear()."""
+    links = TouristPoint.tags.through.objects
+    if reverse:
+        links, field = links.filter(tag_id=instance.pk), 'touristpoint_id'
+    else:
+        links, field = links.filter(touristpoint_id=instance.pk), 'tag_id'
+    if pk_set is not None:
+        links = links.filter(**{f'{field}__in': pk_set})
+    return list(links.values_list('touristpoint_id', 'tag_id'))
+
+
+@receiver(m2m_changed, sender=TouristPoint.tags.through)
+def update_taste_profiles_on_tags_change(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    # Les retraits de favori / d'avis soustraient les tags actuels du POI :
+    # les profils qui l'incluent reçoivent l'écart de tags, dans la même transaction.
+    from apps.accounts.services import TasteProfileService
+
+    if action in {'pre_remove', 'pre_clear'}:
+        instance._removed_tag_pairs = _existing_tag_pairs(instance, reverse, pk_set)
+    elif action in {'post_remove', 'post_clear'}:
+        TasteProfileService.tags_changed(getattr(instance, '_removed_tag_pairs', []), -1)
+    elif action == 'post_add' and pk_set:
+        pairs = [(pk, instance.pk) for pk in pk_set] if reverse else [(instance.pk, pk) for pk in pk_set]
+        TasteProfileService.tags_changed(pairs, 1)
+
+
+@receiver(post_save, sender=Tag)
+def refresh_search_vector_on_tag_rename(sender, instance: Tag, created: bool, **kwargs):
+    if not created and not kwargs.get('raw'):
+        refresh_search_vectors(TouristPoint.objects.filter(tags=instance))
+
+
+
+SUGGEST_FIELDS = {'name', 'address', 'rating', 'is_active'}
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=TouristPoint)
+@receiver(post_delete, sender=TouristPoint)
+def invalidate_suggest_on_change(sender, instance, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if sender is TouristPoint and update_fields is not None and not SUGGEST_FIELDS & set(update_fields):
+        return
+    transaction.on_commit(invalidate_suggest_index)
+
+
+@receiver(post_save, sender=FavoriteTouristPoint)
+def count_favorite_added(sender, instance: FavoriteTouristPoint, created: bool, **kwargs):
+    if created and not kwargs.get('raw'):
+        from .counters import add_favorites
+        add_favorites(instance.tourist_point_id, 1)
+
+
+@receiver(post_delete, sender=FavoriteTouristPoint)
+def count_favorite_removed(sender, instance: FavoriteTouristPoint, **kwargs):
+    from .counters import add_favorites
+    add_favorites(instance.tourist_point_id, -1)
+
+
+@receiver(post_save, sender=FavoriteTouristPoint)
+def taste_profile_favorite_added(sender, instance: FavoriteTouristPoint, created: bool, **kwargs):
+    if created and not kwargs.get('raw'):
+        from apps.accounts.services import TasteProfileService
+        TasteProfileService.favorite_added(instance.user_id, instance.tourist_point_id)
+
+
+@receiver(pre_delete, sender=FavoriteTouristPoint)
+def taste_profile_favorite_removed(sender, instance: FavoriteTouristPoint, **kwargs):
+    # pre_delete : les tags du POI sont encore là lors d'une suppression en cascade.
+    from apps.accounts.services import TasteProfileService
+    TasteProfileService.favorite_removed(instance.user_id, instance.tourist_point_id)
+
+
+@receiver(pre_save, sender=TouristPointReview)
+def remember_previous_review_rating(sender, instance: TouristPointReview, **kwargs):
+    instance._previous_rating = None
+    if not instance._state.adding:
+        instance._previous_rating = (
+            TouristPointReview.objects.filter(pk=instance.pk).values_list('rating', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=TouristPointReview)
+def taste_profile_review_saved(sender, instance: TouristPointReview, created: bool, **kwargs):
+    if kwargs.get('raw'):
+        return
+    from apps.accounts.services import TasteProfileService
+    previous = None if created else getattr(instance, '_previous_rating', None)
+    TasteProfileService.review_changed(instance.reviewer_id, instance.tourist_point_id, previous, instance.rating)
+
+
+@receiver(pre_delete, sender=TouristPointReview)
+def taste_profile_review_removed(sender, instance: TouristPointReview, **kwargs):
+    from apps.accounts.services import TasteProfileService
+    TasteProfileService.review_changed(instance.reviewer_id, instance.tourist_point_id, instance.rating, None)
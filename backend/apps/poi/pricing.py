@@ -0,0 +1,299 @@
+"""
+Devis de séjour pour les chambres d'hébergement (tables `Accommodation*`).
+
+Pour chaque chambre et plan tarifaire, le séjour est représenté par des
+tableaux denses indexés par jour (0 = arrivée, `nights` = départ). Les règles
+sont appliquées par couches, de la moins à la plus prioritaire, en remplaçant
+des tranches entières du tableau :
+
+1. prix de base de la chambre ;
+2. tarifs historiques (`AccommodationLegacyRate`) actifs ;
+3. saisons du plan tarifaire (`AccommodationRateSeason`), la plus récente l'emporte ;
+4. calendrier (`AccommodationAvailability`) : prix spécial, fermeture, durée minimale.
+
+Les restrictions d'arrivée (durée minimale/maximale, fermeture à l'arrivée)
+sont lues sur le jour d'arrivée, la fermeture au départ sur le jour de départ.
+Les réservations actives occupent l'inventaire de la chambre nuit par nuit.
+
+Toutes les données d'un lot de chambres sont chargées en cinq requêtes,
+quel que soit le nombre de chambres ou de nuits.
+"""
+from __future__ import annotations
+
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from .models import (
+    AccommodationAvailability,
+    AccommodationBooking,
+    AccommodationLegacyRate,
+    AccommodationRatePlan,
+    AccommodationRateSeason,
+    AccommodationRoom,
+)
+
+MAX_NIGHTS = 365
+ACTIVE_BOOKING_STATUSES = ('pending', 'confirmed')
+DEFAULT_CURRENCY = 'EUR'
+
+
+class QuoteError(ValueError):
+    pass
+
+
+def validate_stay(check_in: Optional[datetime.date], check_out: Optional[datetime.date], guests: int) -> int:
+    if check_in is None or check_out is None:
+        raise QuoteError('check_in et check_out requis (AAAA-MM-JJ).')
+    nights = (check_out - check_in).days
+    if nights < 1:
+        raise QuoteError('check_out doit être postérieur à check_in.')
+    if nights > MAX_NIGHTS:
+        raise QuoteError(f'Séjour limité à {MAX_NIGHTS} nuits.')
+    if guests < 1:
+        raise QuoteError('guests doit être supérieur ou égal à 1.')
+    return nights
+
+
+class StayCalendar:
+    """Fenêtre du séjour : conversion d'une plage de dates en tranche d'indices."""
+
+    def __init__(self, check_in: datetime.date, check_out: datetime.date):
+        self.check_in = check_in
+        self.check_out = check_out
+        self.nights = (check_out - check_in).days
+        self.dates = [check_in + datetime.timedelta(days=offset) for offset in range(self.nights + 1)]
+
+    def span(self, start: datetime.date, end: datetime.date, size: int) -> tuple[int, int]:
+        """Indices [lo, hi) couverts par la plage inclusive [start, end], bornés à `size`."""
+        lo = max(0, (start - self.check_in).days)
+        hi = min(size, (end - self.check_in).days + 1)
+        return lo, max(lo, hi)
+
+    def index(self, day: datetime.date) -> int:
+        return (day - self.check_in).days
+
+
+def _fill(array: list, lo: int, hi: int, value) -> None:
+    if hi > lo:
+        array[lo:hi] = [value] * (hi - lo)
+
+
+class _StayData:
+    """Règles tarifaires d'un lot de chambres pour une fenêtre donnée."""
+
+    def __init__(self, rooms: List[AccommodationRoom], calendar: StayCalendar, rate_plan_id: Optional[str]):
+        point_ids = {room.tourist_point_id for room in rooms}
+        room_keys = [str(room.id) for room in rooms]
+        check_in, check_out = calendar.check_in, calendar.check_out
+
+        plans = AccommodationRatePlan.objects.filter(
+            tourist_point_id__in=point_ids, room_id__in=room_keys, is_active=True,
+        )
+        if rate_plan_id:
+            plans = plans.filter(pk=rate_plan_id)
+        self.plans: Dict[tuple, list] = defaultdict(list)
+        plan_ids = []
+        for plan_id, point_id, room_id, name, currency in plans.order_by('display_order', 'created_at').values_list(
+            'id', 'tourist_point_id', 'room_id', 'name', 'currency',
+        ):
+            self.plans[(point_id, room_id)].append((str(plan_id), name, currency))
+            plan_ids.append(str(plan_id))
+
+        self.seasons: Dict[str, list] = defaultdict(list)
+        if plan_ids:
+            seasons = AccommodationRateSeason.objects.filter(
+                tourist_point_id__in=point_ids, rate_plan_id__in=plan_ids,
+                start_date__lte=check_out, end_date__gte=check_in,
+            ).order_by('created_at')
+            for row in seasons.values_list(
+                'rate_plan_id', 'season_name', 'start_date', 'end_date', 'base_price',
+                'minimum_stay', 'maximum_stay', 'closed_to_arrival', 'closed_to_departure',
+            ):
+                self.seasons[row[0]].append(row[1:])
+
+        self.legacy: Dict[tuple, list] = defaultdict(list)
+        legacy = AccommodationLegacyRate.objects.filter(
+            tourist_point_id__in=point_ids, room_id__in=room_keys, is_active=True,
+            start_date__lte=check_out, end_date__gte=check_in,
+        ).order_by('created_at')
+        for point_id, room_id, *row in legacy.values_list(
+            'tourist_point_id', 'room_id', 'rate_name', 'start_date', 'end_date', 'price_per_night', 'minimum_stay',
+        ):
+            self.legacy[(point_id, room_id)].append(row)
+
+        self.availability: Dict[tuple, list] = defaultdict(list)
+        availability = AccommodationAvailability.objects.filter(
+            tourist_point_id__in=point_ids, room_id__in=room_keys, date__gte=check_in, date__lte=check_out,
+        ).order_by()
+        for point_id, room_id, *row in availability.values_list(
+            'tourist_point_id', 'room_id', 'date', 'is_available', 'special_price', 'minimum_stay',
+        ):
+            self.availability[(point_id, room_id)].append(row)
+
+        self.bookings: Dict[tuple, list] = defaultdict(list)
+        bookings = AccommodationBooking.objects.filter(
+            tourist_point_id__in=point_ids, room_id__in=room_keys, booking_status__in=ACTIVE_BOOKING_STATUSES,
+            check_in_date__lt=check_out, check_out_date__gt=check_in,
+        ).order_by()
+        for point_id, room_id, *row in bookings.values_list(
+            'tourist_point_id', 'room_id', 'check_in_date', 'check_out_date',
+        ):
+            self.bookings[(point_id, room_id)].append(row)
+
+
+def _occupancy(calendar: StayCalendar, bookings: Iterable[tuple]) -> List[int]:
+    """Nombre de réservations actives par nuit (tableau de différences puis cumul)."""
+    nights = calendar.nights
+    delta = [0] * (nights + 1)
+    for booking_in, booking_out in bookings:
+        lo = max(0, calendar.index(booking_in))
+        hi = min(nights, calendar.index(booking_out))
+        if hi > lo:
+            delta[lo] += 1
+            delta[hi] -= 1
+    occupied, running = [], 0
+    for value in delta[:nights]:
+        running += value
+        occupied.append(running)
+    return occupied
+
+
+def _quote_room(room, plan, data: _StayData, calendar: StayCalendar, guests: int, breakdown: bool) -> dict:
+    nights = calendar.nights
+    days = nights + 1
+    key = (room.tourist_point_id, str(room.id))
+
+    price = [room.base_price_per_night] * nights
+    source = ['base'] * nights
+    closed = [False] * nights
+    minimum_stay = [None] * days
+    maximum_stay = [None] * days
+    closed_to_arrival = [False] * days
+    closed_to_departure = [False] * days
+
+    for name, start, end, amount, min_stay in data.legacy.get(key, ()):
+        _fill(price, *calendar.span(start, end, nights), amount)
+        _fill(source, *calendar.span(start, end, nights), f'legacy:{name}')
+        if min_stay:
+            _fill(minimum_stay, *calendar.span(start, end, days), min_stay)
+
+    plan_id, plan_name, currency = plan if plan else (None, None, DEFAULT_CURRENCY)
+    for name, start, end, amount, min_stay, max_stay, cta, ctd in data.seasons.get(plan_id, ()):
+        _fill(price, *calendar.span(start, end, nights), amount)
+        _fill(source, *calendar.span(start, end, nights), f'season:{name}')
+        span = calendar.span(start, end, days)
+        if min_stay:
+            _fill(minimum_stay, *span, min_stay)
+        if max_stay:
+            _fill(maximum_stay, *span, max_stay)
+        if cta is not None:
+            _fill(closed_to_arrival, *span, cta)
+        if ctd is not None:
+            _fill(closed_to_departure, *span, ctd)
+
+    for day, is_available, special_price, min_stay in data.availability.get(key, ()):
+        index = calendar.index(day)
+        if min_stay:
+            minimum_stay[index] = min_stay
+        if index >= nights:
+            continue
+        if not is_available:
+            closed[index] = True
+        if special_price is not None:
+            price[index] = special_price
+            source[index] = 'special'
+
+    occupied = _occupancy(calendar, data.bookings.get(key, ()))
+    sold_out = [count >= room.inventory_total for count in occupied]
+
+    restrictions = []
+    if not room.is_available:
+        restrictions.append('room_unavailable')
+    if guests > room.capacity:
+        restrictions.append('capacity')
+    if any(closed):
+        restrictions.append('closed')
+    if any(sold_out):
+        restrictions.append('sold_out')
+    if minimum_stay[0] and nights < minimum_stay[0]:
+        restrictions.append('minimum_stay')
+    if maximum_stay[0] and nights > maximum_stay[0]:
+        restrictions.append('maximum_stay')
+    if closed_to_arrival[0]:
+        restrictions.append('closed_to_arrival')
+    if closed_to_departure[nights]:
+        restrictions.append('closed_to_departure')
+
+    total = sum(price, Decimal('0'))
+    quote = {
+        'tourist_point_id': str(room.tourist_point_id),
+        'room_id': str(room.id),
+        'room_name': room.room_name,
+        'rate_plan_id': plan_id,
+        'rate_plan_name': plan_name,
+        'currency': currency,
+        'nights': nights,
+        'guests': guests,
+        'available': not restrictions,
+        'restrictions': restrictions,
+        'minimum_stay': minimum_stay[0],
+        'maximum_stay': maximum_stay[0],
+        'total': float(total),
+        'average_per_night': float(total / nights),
+    }
+    if breakdown:
+        quote['breakdown'] = [
+            {
+                'date': calendar.dates[index].isoformat(),
+                'price': float(price[index]),
+                'source': source[index],
+                'available': not (closed[index] or sold_out[index]),
+            }
+            for index in range(nights)
+        ]
+    return quote
+
+
+def quote_rooms(
+    rooms: Iterable[AccommodationRoom],
+    check_in: datetime.date,
+    check_out: datetime.date,
+    guests: int = 1,
+    rate_plan_id: Optional[str] = None,
+    breakdown: bool = True,
+) -> List[dict]:
+    """
+    Un devis par chambre et plan tarifaire actif (un devis au prix de base si
+    la chambre n'a pas de plan), triés : disponibles d'abord, puis par total.
+    """
+    validate_stay(check_in, check_out, guests)
+    rooms = list(rooms)
+    if not rooms:
+        return []
+    calendar = StayCalendar(check_in, check_out)
+    data = _StayData(rooms, calendar, rate_plan_id)
+    quotes = []
+    for room in rooms:
+        plans = data.plans.get((room.tourist_point_id, str(room.id)))
+        if not plans:
+            if rate_plan_id:
+                continue
+            plans = [None]
+        for plan in plans:
+            quotes.append(_quote_room(room, plan, data, calendar, guests, breakdown))
+    quotes.sort(key=lambda quote: (not quote['available'], quote['total']))
+    return quotes
+
+
+def cheapest_by_point(quotes: Iterable[dict]) -> Dict[str, dict]:
+    """Meilleur devis disponible par POI (prix « à partir de » des résultats de recherche)."""
+    best: Dict[str, dict] = {}
+    for quote in quotes:
+        if not quote['available']:
+            continue
+        current = best.get(quote['tourist_point_id'])
+        if current is None or quote['total'] < current['total']:
+            best[quote['tourist_point_id']] = quote
+    return best
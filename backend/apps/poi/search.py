@@ -0,0 +1,90 @@
+"""
+Recherche plein texte des POI (PostgreSQL).
+
+`TouristPoint.search_vector` combine nom, tags, description et adresse en
+français et en anglais (poids A > B > C > D) et est indexé en GIN. Il est
+recalculé en SQL par `refresh_search_vectors` depuis les signaux (sauvegarde
+d'un POI, modification de ses tags ou du libellé d'un tag).
+
+La recherche classe les résultats par `ts_rank` ; si aucune ligne ne
+correspond (faute de frappe), on se rabat sur la similarité trigramme du nom
+(index GIN `gin_trgm_ops`).
+"""
+from __future__ import annotations
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import F, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+SEARCH_CONFIGS = ('french', 'english')
+SEARCHABLE_FIELDS = {'name', 'description', 'address'}
+
+
+def _tag_labels(tag_model, field: str):
+    """Sous-requête : libellés des tags d'un POI concaténés."""
+    labels = (
+        tag_model.objects.filter(tourist_points=OuterRef('pk'))
+        .order_by()
+        .values('tourist_points')
+        .annotate(labels=StringAgg(field, ' '))
+        .values('labels')
+    )
+    return Coalesce(Subquery(labels), Value(''), output_field=TextField())
+
+
+def search_vector_expression(tag_model):
+    """Expression SQL du tsvector d'un POI (utilisable avec des modèles historiques)."""
+    vector = None
+    for config in SEARCH_CONFIGS:
+        tag_field = 'label_fr' if config == 'french' else 'label_en'
+        parts = (
+            SearchVector('name', config=config, weight='A')
+            + SearchVector(_tag_labels(tag_model, tag_field), config=config, weight='B')
+            + SearchVector('description', config=config, weight='C')
+        )
+        vector = parts if vector is None else vector + parts
+    return vector + SearchVector('address', config='simple', weight='D')
+
+
+def refresh_search_vectors(queryset) -> int:
+    """Recalcule le tsvector des POI du queryset en une seule requête UPDATE."""
+    if connection.vendor != 'postgresql':
+        return 0
+    from .models import Tag
+
+    return queryset.order_by().update(search_vector=search_vector_expression(Tag))
+
+
+def build_search_query(text: str) -> SearchQuery:
+    query = None
+    for config in SEARCH_CONFIGS:
+        part = SearchQuery(text, config=config, search_type='websearch')
+        query = part if query is None else query | part
+    return query
+
+
+def search_tourist_points(queryset, text: str):
+    """
+    Filtre et classe le queryset par pertinence (annotation `search_rank`).
+    Repli trigramme sur le nom quand la recherche plein texte ne trouve rien.
+    """
+    query = build_search_query(text)
+    matches = (
+        queryset.filter(search_vector=query)
+        .annotate(search_rank=SearchRank(F('search_vector'), query))
+        .order_by('-search_rank', 'name')
+    )
+    if matches.exists():
+        return matches
+    return (
+        queryset.filter(name__trigram_word_similar=text)
+        .annotate(search_rank=TrigramWordSimilarity(text, 'name'))
+        .order_by('-search_rank', 'name')
+    )
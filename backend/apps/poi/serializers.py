@@ -1,9 +1,22 @@
 from __future__ import annotations
 
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Prefetch
 from rest_framework import serializers
 
-from apps.accounts.serializers import UserSerializer
+from apps.accounts.models import UserProfile
+from apps.accounts.serializers import UserProfileSerializer, UserSerializer
+from apps.core.sparse_fields import SparseFieldsetsMixin
 from .models import (
+    MEAL_PLAN_CHOICES,
+    AccommodationAvailability,
+    AccommodationBooking,
+    AccommodationLegacyRate,
+    AccommodationRatePlan,
+    AccommodationRateSeason,
+    AccommodationRoom,
     ActivityAvoidance,
     ActivityCategory,
     ActivityIntensityLevel,
@@ -35,6 +48,7 @@ from .models import (
     FavoriteTouristPoint,
     TouristPointReview,
 )
+from .metadata_sections import PreconditionFailed, parse_if_match
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -312,7 +326,7 @@ class POIMediaSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class TouristPointSerializer(serializers.ModelSerializer):
+class TouristPointSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     tag_ids = serializers.PrimaryKeyRelatedField(
         many=True,
@@ -358,6 +372,8 @@ class TouristPointSerializer(serializers.ModelSerializer):
             'price_range',
             'rating',
             'review_count',
+            'favorite_count',
+            'view_count',
             'budget_level',
             'budget_level_id',
             'difficulty_level',
@@ -375,6 +391,7 @@ class TouristPointSerializer(serializers.ModelSerializer):
             'is_activity',
             'amenities',
             'metadata',
+            'metadata_revision',
             'tags',
             'tag_ids',
             'media',
@@ -384,7 +401,9 @@ class TouristPointSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
-        read_only_fields = ('created_at', 'updated_at')
+        read_only_fields = ('metadata_revision', 'created_at', 'updated_at')
+        expandable_fields = ('metadata', 'media', 'owner_detail', 'partner_detail')
+        sparse_sources = {'owner_detail': ('owner',), 'partner_detail': ('owner',)}
 
     def create(self, validated_data):  # type: ignore[override]
         tags = validated_data.pop('tags', [])
@@ -395,13 +414,35 @@ class TouristPointSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):  # type: ignore[override]
         tags = validated_data.pop('tags', None)
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        has_metadata = 'metadata' in validated_data
+        metadata = validated_data.pop('metadata', None)
+        with transaction.atomic():
+            if has_metadata:
+                self._replace_metadata(instance, metadata)
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            # save() n'écrit jamais `metadata` implicitement (TouristPoint.METADATA_FIELDS).
+            instance.save()
         if tags is not None:
             instance.tags.set(tags)
         return instance
 
+    def _replace_metadata(self, instance, metadata):
+        """
+        Remplace `metadata` sous verrou de ligne et incrémente `metadata_revision`.
+        Si If-Match est fourni (révision lue dans `metadata_revision` ou l'ETag
+        d'une section), l'écriture est refusée (412) quand le POI a changé.
+        """
+        request = self.context.get('request')
+        expected = parse_if_match(request.headers.get('If-Match')) if request else None
+        locked = TouristPoint.objects.select_for_update().filter(pk=instance.pk)
+        revision = locked.values_list('metadata_revision', flat=True).get()
+        if expected is not None and expected != revision:
+            raise PreconditionFailed()
+        locked.update(metadata=metadata, metadata_revision=revision + 1)
+        instance.metadata = metadata
+        instance.metadata_revision = revision + 1
+
     def get_owner_detail(self, obj):
         request = self.context.get('request')
         if not request:
@@ -423,10 +464,162 @@ class TouristPointSerializer(serializers.ModelSerializer):
         }
 
     def get_conversation_id(self, obj):
-        conversation = getattr(obj, 'conversation', None)
-        if not conversation:
-            conversation, _ = POIConversation.objects.get_or_create(tourist_point=obj)
-        return str(conversation.id)
+        # Annoté par `with_related` ; la conversation est créée à l'enregistrement du POI
+        # (signal `ensure_poi_conversation`, commande `backfill_poi_conversations`).
+        if hasattr(obj, 'conversation_pk'):
+            conversation_id = obj.conversation_pk
+        else:
+            conversation = getattr(obj, 'conversation', None)
+            conversation_id = conversation.id if conversation else None
+        return str(conversation_id) if conversation_id else None
+
+    @staticmethod
+    def with_related(queryset):
+        """Charge en un nombre fixe de requêtes ce que la sérialisation lit pour chaque POI."""
+        return (
+            queryset.select_related('budget_level', 'difficulty_level', 'owner', 'owner__partner_profile')
+            .prefetch_related(
+                'tags',
+                'media',
+                'owner__role_assignments',
+                Prefetch(
+                    'owner__profile',
+                    queryset=UserProfileSerializer.with_follow_counts(UserProfile.objects.select_related('user')),
+                ),
+            )
+            .annotate(conversation_pk=F('conversation__id'))
+        )
+
+
+class TouristPointCardListSerializer(serializers.ListSerializer):
+    """Charge les tags et la couverture de toute la page en deux requêtes."""
+
+    def to_representation(self, data):
+        rows = list(data)
+        ids = [row['id'] for row in rows]
+        tags = defaultdict(list)
+        covers = {}
+        if ids:
+            links = (
+                TouristPoint.tags.through.objects.filter(touristpoint_id__in=ids)
+                .values_list('touristpoint_id', 'tag__id', 'tag__code', 'tag__label_fr', 'tag__label_en')
+                .order_by('touristpoint_id', 'tag__label_fr')
+            )
+            for point_id, tag_id, code, label_fr, label_en in links:
+                tags[point_id].append({'id': tag_id, 'code': code, 'label_fr': label_fr, 'label_en': label_en})
+            media = (
+                POIMedia.objects.filter(tourist_point_id__in=ids, kind='image')
+                .values_list('tourist_point_id', 'file', 'external_url', 'alt_text')
+                .order_by('tourist_point_id', 'created_at', 'pk')
+            )
+            for point_id, file, external_url, alt_text in media:
+                covers.setdefault(point_id, (file, external_url, alt_text))
+        self.child.tags_by_point = tags
+        self.child.covers_by_point = covers
+        return [self.child.to_representation(row) for row in rows]
+
+
+class TouristPointCardSerializer(serializers.BaseSerializer):
+    """
+    Représentation « carte » des POI pour les listes (`?view=card`).
+
+    Lecture seule, à partir de lignes `.values()` (voir `card_queryset`) : pas
+    d'instances de modèle, pas de `metadata`, pas de propriétaire ; niveaux de
+    budget et de difficulté réduits à leurs libellés, média réduit à l'image de
+    couverture.
+    """
+
+    FIELDS = (
+        'id',
+        'name',
+        'latitude',
+        'longitude',
+        'address',
+        'price_range',
+        'rating',
+        'review_count',
+        'favorite_count',
+        'view_count',
+        'status',
+        'is_active',
+        'is_verified',
+        'is_restaurant',
+        'is_accommodation',
+        'is_activity',
+        'created_at',
+        'budget_level__id',
+        'budget_level__code',
+        'budget_level__label_fr',
+        'budget_level__label_en',
+        'budget_level__icon_emoji',
+        'difficulty_level__id',
+        'difficulty_level__code',
+        'difficulty_level__label_fr',
+        'difficulty_level__label_en',
+        'difficulty_level__level_value',
+    )
+    coordinate_field = serializers.DecimalField(max_digits=9, decimal_places=6)
+    rating_field = serializers.DecimalField(max_digits=3, decimal_places=2)
+    datetime_field = serializers.DateTimeField()
+    media_file_field = POIMedia._meta.get_field('file')
+
+    class Meta:
+        list_serializer_class = TouristPointCardListSerializer
+
+    tags_by_point: dict = {}
+    covers_by_point: dict = {}
+
+    @classmethod
+    def card_queryset(cls, queryset):
+        return queryset.values(*cls.FIELDS)
+
+    @staticmethod
+    def _decimal(field, value):
+        return None if value is None else field.to_representation(value)
+
+    @staticmethod
+    def _level(row, prefix, keys):
+        if row[f'{prefix}__id'] is None:
+            return None
+        return {key: row[f'{prefix}__{key}'] for key in keys}
+
+    def _cover(self, point_id):
+        cover = self.covers_by_point.get(point_id)
+        if cover is None:
+            return None
+        file, external_url, alt_text = cover
+        url = self.media_file_field.storage.url(file) if file else external_url
+        request = self.context.get('request')
+        if file and request is not None:
+            url = request.build_absolute_uri(url)
+        return {'url': url, 'alt_text': alt_text}
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'latitude': self._decimal(self.coordinate_field, row['latitude']),
+            'longitude': self._decimal(self.coordinate_field, row['longitude']),
+            'address': row['address'],
+            'price_range': row['price_range'],
+            'rating': self._decimal(self.rating_field, row['rating']),
+            'review_count': row['review_count'],
+            'favorite_count': row['favorite_count'],
+            'view_count': row['view_count'],
+            'budget_level': self._level(row, 'budget_level', ('id', 'code', 'label_fr', 'label_en', 'icon_emoji')),
+            'difficulty_level': self._level(
+                row, 'difficulty_level', ('id', 'code', 'label_fr', 'label_en', 'level_value'),
+            ),
+            'is_active': row['is_active'],
+            'is_verified': row['is_verified'],
+            'status_enum': row['status'],
+            'is_restaurant': row['is_restaurant'],
+            'is_accommodation': row['is_accommodation'],
+            'is_activity': row['is_activity'],
+            'tags': self.tags_by_point.get(row['id'], []),
+            'cover': self._cover(row['id']),
+            'created_at': self.datetime_field.to_representation(row['created_at']),
+        }
 
 
 class MinimalTouristPointSerializer(serializers.ModelSerializer):
@@ -538,17 +731,20 @@ class ActivityBookingSerializer(serializers.Serializer):
     updated_at = serializers.CharField(required=False)
 
 
-MEAL_PLAN_CHOICES = [
-    ('bb', 'Bed & Breakfast'),
-    ('half_board', 'Demi-pension'),
-    ('full_board', 'Pension complète'),
-    ('all_inclusive', 'Tout inclus'),
-]
+class AccommodationSectionSerializer(serializers.ModelSerializer):
+    """Base des sections hébergement : identifiant fourni par le client accepté à la création."""
 
+    id = serializers.UUIDField(required=False)
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
 
-class AccommodationRoomSerializer(serializers.Serializer):
-    id = serializers.CharField(required=False)
-    tourist_point_id = serializers.CharField(required=False)
+    def update(self, instance, validated_data):  # type: ignore[override]
+        validated_data.pop('id', None)
+        return super().update(instance, validated_data)
+
+
+class AccommodationRoomSerializer(AccommodationSectionSerializer):
+    tourist_point_id = serializers.CharField(read_only=True)
     room_name = serializers.CharField(max_length=255)
     room_type = serializers.CharField(max_length=120)
     capacity = serializers.IntegerField(min_value=1)
@@ -558,86 +754,114 @@ class AccommodationRoomSerializer(serializers.Serializer):
     images = serializers.ListField(child=serializers.CharField(), default=list)
     is_available = serializers.BooleanField(default=True)
     inventory_total = serializers.IntegerField(min_value=0, default=1)
-    created_at = serializers.CharField(required=False)
-    updated_at = serializers.CharField(required=False)
 
+    class Meta:
+        model = AccommodationRoom
+        fields = [
+            'id', 'tourist_point_id', 'room_name', 'room_type', 'capacity', 'base_price_per_night',
+            'amenities', 'description', 'images', 'is_available', 'inventory_total', 'created_at', 'updated_at',
+        ]
 
-class AccommodationBookingSerializer(serializers.Serializer):
-    id = serializers.CharField(required=False)
-    tourist_point_id = serializers.CharField(required=False)
-    room_id = serializers.CharField()
+
+class AccommodationBookingSerializer(AccommodationSectionSerializer):
+    tourist_point_id = serializers.CharField(read_only=True)
+    room_id = serializers.CharField(max_length=64)
     customer_name = serializers.CharField(max_length=255)
     customer_email = serializers.EmailField()
     customer_phone = serializers.CharField(max_length=64, allow_blank=True, allow_null=True, required=False)
-    check_in_date = serializers.CharField()
-    check_out_date = serializers.CharField()
+    check_in_date = serializers.DateField()
+    check_out_date = serializers.DateField()
     number_of_guests = serializers.IntegerField(min_value=1)
     total_nights = serializers.IntegerField(min_value=1)
     total_amount = serializers.FloatField(min_value=0)
-    booking_status = serializers.CharField()
+    booking_status = serializers.CharField(max_length=32)
     special_requests = serializers.CharField(required=False, allow_blank=True, allow_null=True)
-    created_at = serializers.CharField(required=False)
-    updated_at = serializers.CharField(required=False)
+
+    class Meta:
+        model = AccommodationBooking
+        fields = [
+            'id', 'tourist_point_id', 'room_id', 'customer_name', 'customer_email', 'customer_phone',
+            'check_in_date', 'check_out_date', 'number_of_guests', 'total_nights', 'total_amount',
+            'booking_status', 'special_requests', 'created_at', 'updated_at',
+        ]
 
 
-class AccommodationAvailabilitySerializer(serializers.Serializer):
-    id = serializers.CharField(required=False)
-    room_id = serializers.CharField()
-    date = serializers.CharField()
+class AccommodationAvailabilitySerializer(AccommodationSectionSerializer):
+    room_id = serializers.CharField(max_length=64)
+    date = serializers.DateField()
     is_available = serializers.BooleanField(default=True)
     special_price = serializers.FloatField(required=False, allow_null=True)
-    minimum_stay = serializers.IntegerField(required=False, allow_null=True)
-    created_at = serializers.CharField(required=False)
-    updated_at = serializers.CharField(required=False)
+    minimum_stay = serializers.IntegerField(required=False, allow_null=True, min_value=1)
+
+    class Meta:
+        model = AccommodationAvailability
+        fields = [
+            'id', 'room_id', 'date', 'is_available', 'special_price', 'minimum_stay', 'created_at', 'updated_at',
+        ]
+        # L'unicité (POI, chambre, date) est gérée par la vue (création = mise à jour si existant).
+        validators = []
 
 
-class AccommodationRatePlanSerializer(serializers.Serializer):
-    id = serializers.CharField(required=False)
-    tourist_point_id = serializers.CharField(required=False)
-    room_id = serializers.CharField()
+class AccommodationRatePlanSerializer(AccommodationSectionSerializer):
+    tourist_point_id = serializers.CharField(read_only=True)
+    room_id = serializers.CharField(max_length=64)
     name = serializers.CharField(max_length=255)
     description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     base_meal_plan = serializers.ChoiceField(choices=MEAL_PLAN_CHOICES)
-    pricing_strategy = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    pricing_strategy = serializers.CharField(max_length=120, required=False, allow_blank=True, allow_null=True)
     currency = serializers.CharField(max_length=8, default='EUR')
     is_active = serializers.BooleanField(default=True)
     display_order = serializers.IntegerField(default=0)
-    created_at = serializers.CharField(required=False)
-    updated_at = serializers.CharField(required=False)
 
+    class Meta:
+        model = AccommodationRatePlan
+        fields = [
+            'id', 'tourist_point_id', 'room_id', 'name', 'description', 'base_meal_plan', 'pricing_strategy',
+            'currency', 'is_active', 'display_order', 'created_at', 'updated_at',
+        ]
 
-class AccommodationRateSeasonSerializer(serializers.Serializer):
-    id = serializers.CharField(required=False)
-    rate_plan_id = serializers.CharField()
+
+class AccommodationRateSeasonSerializer(AccommodationSectionSerializer):
+    rate_plan_id = serializers.CharField(max_length=64)
     season_name = serializers.CharField(max_length=255)
-    start_date = serializers.CharField()
-    end_date = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
     base_price = serializers.FloatField(min_value=0)
     currency = serializers.CharField(max_length=8, default='EUR')
     meal_plan_pricing = serializers.DictField(required=False, allow_null=True, default=None)
-    minimum_stay = serializers.IntegerField(required=False, allow_null=True)
-    maximum_stay = serializers.IntegerField(required=False, allow_null=True)
+    minimum_stay = serializers.IntegerField(required=False, allow_null=True, min_value=1)
+    maximum_stay = serializers.IntegerField(required=False, allow_null=True, min_value=1)
     closed_to_arrival = serializers.BooleanField(required=False, allow_null=True)
     closed_to_departure = serializers.BooleanField(required=False, allow_null=True)
     advance_purchase_days = serializers.IntegerField(required=False, allow_null=True)
     cutoff_hours = serializers.IntegerField(required=False, allow_null=True)
     restrictions = serializers.DictField(required=False, allow_null=True)
-    created_at = serializers.CharField(required=False)
-    updated_at = serializers.CharField(required=False)
 
+    class Meta:
+        model = AccommodationRateSeason
+        fields = [
+            'id', 'rate_plan_id', 'season_name', 'start_date', 'end_date', 'base_price', 'currency',
+            'meal_plan_pricing', 'minimum_stay', 'maximum_stay', 'closed_to_arrival', 'closed_to_departure',
+            'advance_purchase_days', 'cutoff_hours', 'restrictions', 'created_at', 'updated_at',
+        ]
 
-class AccommodationLegacyRateSerializer(serializers.Serializer):
-    id = serializers.CharField(required=False)
-    room_id = serializers.CharField()
+
+class AccommodationLegacyRateSerializer(AccommodationSectionSerializer):
+    room_id = serializers.CharField(max_length=64)
     rate_name = serializers.CharField(max_length=255)
-    start_date = serializers.CharField()
-    end_date = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
     price_per_night = serializers.FloatField(min_value=0)
-    minimum_stay = serializers.IntegerField(required=False, allow_null=True)
+    minimum_stay = serializers.IntegerField(required=False, allow_null=True, min_value=1)
     is_active = serializers.BooleanField(default=True)
     meal_plan_pricing = serializers.DictField(required=False, allow_null=True)
-    created_at = serializers.CharField(required=False)
-    updated_at = serializers.CharField(required=False)
+
+    class Meta:
+        model = AccommodationLegacyRate
+        fields = [
+            'id', 'room_id', 'rate_name', 'start_date', 'end_date', 'price_per_night', 'minimum_stay',
+            'is_active', 'meal_plan_pricing', 'created_at', 'updated_at',
+        ]
 
 
 class RestaurantMenuSerializer(serializers.Serializer):
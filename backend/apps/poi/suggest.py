@@ -0,0 +1,174 @@
+"""
+Index de préfixes en mémoire pour l'autocomplétion (POI, villes, pays, tags).
+
+Chaque worker garde des index triés (listes parallèles clés/entrées parcourues
+avec `bisect`) construits depuis la base : un pour les données de référence
+(pays, villes, tags), parcouru en entier, et un pour les POI, dont le parcours
+est borné pour les préfixes très courts. Une requête de suggestion ne touche
+pas la base : seul un numéro de version est lu dans le cache partagé.
+
+Invalidation : les signaux de `models.py` incrémentent la version dans le
+cache (`invalidate_suggest_index`). Un worker qui voit une version plus récente
+reconstruit son index en tâche de fond et continue de servir l'ancien en
+attendant. Au démarrage, la première construction se fait aussi en tâche de
+fond : les requêtes reçoivent une liste vide d'ici là, sans attendre le
+chargement de tous les POI. `SUGGEST_INDEX_TTL` (désactivé par défaut) force
+une reconstruction périodique quand le cache n'est pas partagé entre workers.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+VERSION_CACHE_KEY = 'poi:suggest:version'
+SUGGEST_TYPES = ('poi', 'city', 'country', 'tag')
+# Nombre maximal de clés parcourues pour un préfixe très court.
+SCAN_LIMIT = 2000
+# Délai minimal entre deux reconstructions (rafales de modifications de POI).
+MIN_REBUILD_INTERVAL = 30
+# Priorité d'affichage à pertinence égale.
+TYPE_WEIGHT = {'country': 3.0, 'city': 2.0, 'tag': 1.0, 'poi': 0.0}
+
+Entry = Tuple[str, str, str, str, float]  # (type, id, label, subtitle, weight)
+
+
+def normalize(text: str) -> str:
+    """Minuscules sans accents : « Fès » -> « fes »."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold().strip()
+
+
+def _keys_for(label: str) -> List[str]:
+    """Le libellé complet et chacun de ses suffixes commençant à un mot."""
+    words = normalize(label).split()
+    return [' '.join(words[index:]) for index in range(len(words))]
+
+
+class SuggestIndex:
+    def __init__(self, entries: List[Entry], scan_limit: Optional[int] = None):
+        self.scan_limit = scan_limit
+        pairs = []
+        for position, entry in enumerate(entries):
+            for rank, key in enumerate(_keys_for(entry[2])):
+                # rank 0 : le libellé commence par le préfixe (meilleur classement).
+                pairs.append((key, rank, position))
+        pairs.sort()
+        self.keys = [key for key, _, _ in pairs]
+        self.refs = [(rank, position) for _, rank, position in pairs]
+        self.entries = entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def scored(self, prefix: str, types: Optional[set] = None) -> List[Tuple[tuple, Entry]]:
+        """Entrées dont un mot commence par `prefix` (déjà normalisé), avec leur score."""
+        start = bisect_left(self.keys, prefix)
+        end = len(self.keys) if self.scan_limit is None else min(start + self.scan_limit, len(self.keys))
+        best: Dict[int, tuple] = {}
+        for index in range(start, end):
+            if not self.keys[index].startswith(prefix):
+                break
+            rank, position = self.refs[index]
+            entry = self.entries[position]
+            if types and entry[0] not in types:
+                continue
+            score = (min(rank, 1), -TYPE_WEIGHT[entry[0]], -entry[4], len(entry[2]))
+            if position not in best or score < best[position]:
+                best[position] = score
+        return [(score, self.entries[position]) for position, score in best.items()]
+
+
+class Suggester:
+    def __init__(self, reference: List[Entry], points: List[Entry]):
+        self.segments = [SuggestIndex(reference), SuggestIndex(points, scan_limit=SCAN_LIMIT)]
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments)
+
+    def search(self, text: str, limit: int = 8, types: Optional[set] = None) -> List[Entry]:
+        prefix = ' '.join(normalize(text).split())
+        if not prefix:
+            return []
+        scored = [item for segment in self.segments for item in segment.scored(prefix, types)]
+        scored.sort(key=lambda item: item[0])
+        return [entry for _, entry in scored[:limit]]
+
+
+def build_suggester() -> Suggester:
+    from .models import City, Country, Tag, TouristPoint
+
+    entries: List[Entry] = []
+    for pk, name in Country.objects.filter(is_active=True).values_list('pk', 'name'):
+        entries.append(('country', str(pk), name, '', 0.0))
+    for pk, name, country_name in City.objects.filter(is_active=True).values_list('pk', 'name', 'country__name'):
+        entries.append(('city', str(pk), name, country_name or '', 0.0))
+    for pk, label_fr, label_en in Tag.objects.values_list('pk', 'label_fr', 'label_en'):
+        entries.append(('tag', str(pk), label_fr, '', 0.0))
+        if label_en and normalize(label_en) != normalize(label_fr):
+            entries.append(('tag', str(pk), label_en, label_fr, 0.0))
+    rows = (
+        TouristPoint.objects.filter(is_active=True)
+        .order_by()
+        .values_list('pk', 'name', 'address', 'rating')
+        .iterator(chunk_size=5000)
+    )
+    points = [('poi', str(pk), name, address or '', float(rating or 0)) for pk, name, address, rating in rows]
+    return Suggester(entries, points)
+
+
+def invalidate_suggest_index() -> None:
+    """Signale à tous les workers que les données de référence ont changé."""
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, None)
+
+
+class _SuggestState:
+    def __init__(self):
+        self.index: Optional[Suggester] = None
+        self.version = None
+        self.built_at = 0.0
+        self.rebuilding = False
+        self.lock = threading.Lock()
+
+    def _rebuild(self, version) -> None:
+        try:
+            index = build_suggester()
+            with self.lock:
+                self.index, self.version, self.built_at = index, version, time.monotonic()
+        finally:
+            self.rebuilding = False
+            connections.close_all()
+
+    def get(self) -> Suggester:
+        version = cache.get(VERSION_CACHE_KEY, 0)
+        ttl = getattr(settings, 'SUGGEST_INDEX_TTL', 0)
+        age = time.monotonic() - self.built_at
+        stale = (
+            self.index is None
+            or (version != self.version and age >= MIN_REBUILD_INTERVAL)
+            or (ttl > 0 and age > ttl)
+        )
+        if stale and not self.rebuilding:
+            with self.lock:
+                if not self.rebuilding:
+                    self.rebuilding = True
+                    # L'ancien index (ou un index vide au démarrage) reste servi pendant la construction.
+                    threading.Thread(target=self._rebuild, args=(version,), daemon=True).start()
+        return self.index if self.index is not None else EMPTY_SUGGESTER
+
+
+EMPTY_SUGGESTER = Suggester([], [])
+_state = _SuggestState()
+
+
+def get_suggester() -> Suggester:
+    return _state.get()
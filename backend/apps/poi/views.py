@@ -1,18 +1,26 @@
 from __future__ import annotations
 
-import copy
 import uuid
 
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.text import slugify
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.sparse_fields import SparseFieldsetsViewMixin
 from .models import (
+    AccommodationAvailability,
+    AccommodationBooking,
+    AccommodationLegacyRate,
+    AccommodationRatePlan,
+    AccommodationRateSeason,
+    AccommodationRoom,
     ActivityAvoidance,
     ActivityCategory,
     ActivityIntensityLevel,
@@ -63,6 +71,7 @@ from .serializers import (
     POIMediaSerializer,
     RestaurantCategorySerializer,
     TagSerializer,
+    TouristPointCardSerializer,
     TouristPointSerializer,
     TravelGroupTypeSerializer,
     TravelGroupSubtypeSerializer,
@@ -93,11 +102,17 @@ from .serializers import (
     RestaurantOperatingHoursSerializer,
     RestaurantTableSerializer,
 )
+from .metadata_sections import format_etag, mutate_section, parse_if_match, read_section, write_key
+from .pricing import QuoteError, quote_rooms, validate_stay
+from .search import search_tourist_points
+from .suggest import SUGGEST_TYPES, get_suggester
 
 
 class BaseReadOnlyViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     http_method_names = ['get', 'head', 'options']
+    # Tables de référence : listes courtes, renvoyées en entier.
+    pagination_class = None
 
 
 class TagViewSet(BaseReadOnlyViewSet):
@@ -110,7 +125,9 @@ class TagViewSet(BaseReadOnlyViewSet):
 class AdminManageableViewSet(viewsets.ModelViewSet):
     """
     Allows read access to authenticated users but restricts mutations to admins.
+    Reference tables: lists are short and returned unpaginated.
     """
+    pagination_class = None
 
     def get_permissions(self):  # type: ignore[override]
         if self.request.method in permissions.SAFE_METHODS:
@@ -189,6 +206,37 @@ class AccommodationAmbianceViewSet(AdminManageableViewSet):
     search_fields = ['code', 'label_fr', 'label_en']
 
 
+class SearchSuggestView(APIView):
+    """Autocomplétion (POI, villes, pays, tags) servie depuis l'index en mémoire."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    DEFAULT_LIMIT = 8
+    MAX_LIMIT = 20
+
+    def get(self, request):
+        text = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', self.DEFAULT_LIMIT))
+        except ValueError:
+            limit = self.DEFAULT_LIMIT
+        limit = max(1, min(limit, self.MAX_LIMIT))
+        types = {
+            value.strip() for value in request.query_params.get('types', '').split(',')
+            if value.strip() in SUGGEST_TYPES
+        }
+
+        results = get_suggester().search(text, limit=limit, types=types or None)
+        return Response(
+            {
+                'query': text,
+                'results': [
+                    {'type': kind, 'id': pk, 'label': label, 'subtitle': subtitle}
+                    for kind, pk, label, subtitle, _ in results
+                ],
+            }
+        )
+
+
 class LocationResolveView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = LocationResolveSerializer
@@ -326,8 +374,8 @@ class DifficultyLevelViewSet(BaseReadOnlyViewSet):
     search_fields = ['code', 'label_fr', 'label_en']
 
 
-class TouristPointViewSet(viewsets.ModelViewSet):
-    queryset = TouristPoint.objects.select_related('budget_level', 'difficulty_level').prefetch_related('tags', 'media')
+class TouristPointViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
+    queryset = TouristPoint.objects.defer('search_vector')
     serializer_class = TouristPointSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = {
@@ -342,10 +390,41 @@ class TouristPointViewSet(viewsets.ModelViewSet):
         'price_range': ['exact'],
     }
     search_fields = ['name', 'description', 'address', 'tags__label_fr']
-    ordering_fields = ['name', 'rating', 'created_at']
+    ordering_fields = ['name', 'rating', 'created_at', 'favorite_count', 'view_count']
+    ordering = ['-created_at']
+    SEARCH_DEFAULT_LIMIT = 20
+    SEARCH_MAX_LIMIT = 100
+    CARD_VIEW = 'card'
+
+    @property
+    def is_card_view(self) -> bool:
+        # `?view=card` : représentation allégée pour les listes (sans metadata ni propriétaire).
+        return self.action == 'list' and self.request.query_params.get('view') == self.CARD_VIEW
+
+    def get_serializer_class(self):
+        if self.is_card_view:
+            return TouristPointCardSerializer
+        return super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        text = (self.request.query_params.get('q') or '').strip()
+        if self.action != 'list' or not text:
+            return queryset
+        # Mode recherche : tsvector classé par pertinence, repli trigramme sur le nom.
+        try:
+            limit = int(self.request.query_params.get('limit', self.SEARCH_DEFAULT_LIMIT))
+        except ValueError:
+            limit = self.SEARCH_DEFAULT_LIMIT
+        limit = max(1, min(limit, self.SEARCH_MAX_LIMIT))
+        return search_tourist_points(queryset, text)[:limit]
 
     def get_queryset(self):  # type: ignore[override]
         qs = super().get_queryset()
+        if self.is_card_view:
+            qs = TouristPointCardSerializer.card_queryset(qs)
+        else:
+            qs = TouristPointSerializer.with_related(qs)
         user = self.request.user
 
         if self.request.method in ('GET', 'HEAD', 'OPTIONS'):
@@ -394,21 +473,19 @@ class TouristPointViewSet(viewsets.ModelViewSet):
             point.rejection_reason = ''
             point.blocked_reason = ''
 
-        metadata = point.metadata or {}
-        if admin_message:
-            metadata['admin_message'] = admin_message
-        elif 'admin_message' in metadata:
-            del metadata['admin_message']
-        point.metadata = metadata
-        point.save(update_fields=[
-            'status',
-            'is_active',
-            'is_verified',
-            'rejection_reason',
-            'blocked_reason',
-            'metadata',
-            'updated_at',
-        ])
+        with transaction.atomic():
+            point.save(update_fields=[
+                'status',
+                'is_active',
+                'is_verified',
+                'rejection_reason',
+                'blocked_reason',
+                'updated_at',
+            ])
+            # Écriture de la seule clé, sous verrou : n'écrase pas une section
+            # modifiée entre-temps et invalide les ETag (metadata_revision).
+            write_key(point.pk, 'admin_message', admin_message or None)
+        point.refresh_from_db(fields=['metadata', 'metadata_revision', 'updated_at'])
         return Response(self.get_serializer(point).data)
 
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
@@ -420,62 +497,79 @@ class TouristPointViewSet(viewsets.ModelViewSet):
         if point.owner != request.user and not request.user.is_staff:
             raise permissions.PermissionDenied('Accès refusé.')
 
-        metadata = point.metadata or {}
-        views_count = int(metadata.get('view_count', metadata.get('views', 0)) or 0)
-        favorite_count = int(metadata.get('favorite_count', 0) or 0)
-
         return Response({
             'poi_id': str(point.id),
-            'views': views_count,
-            'favorites': favorite_count,
+            'views': point.view_count,
+            'favorites': point.favorite_count,
             'reviews': point.review_count,
             'rating': float(point.rating or 0),
         })
 
 
-class ActivityMetadataMixin:
-    SECTION_CONFIG = {
-        'equipment': {'metadata_key': 'equipment', 'serializer': ActivityEquipmentSerializer},
-        'requirements': {'metadata_key': 'requirements', 'serializer': ActivityRequirementSerializer},
-        'time-slots': {'metadata_key': 'time_slots', 'serializer': ActivityTimeSlotSerializer},
-        'pricing': {'metadata_key': 'pricing', 'serializer': ActivityPricingSerializer},
-        'bookings': {'metadata_key': 'bookings', 'serializer': ActivityBookingSerializer},
-    }
+class JSONMetadataSectionMixin:
+    """
+    Sections stockées dans `TouristPoint.metadata[metadata_root][clé]`.
+
+    Les écritures passent par `mutate_section` (ligne verrouillée, seule la
+    section concernée est réécrite) ; l'ETag renvoyé correspond à
+    `metadata_revision` et peut être fourni dans `If-Match`.
+    """
+    metadata_root = ''
+    SECTION_CONFIG: dict = {}
+    unknown_section_message = 'Section inconnue.'
+    revision = None
 
     def normalize_section(self, raw_section: str) -> tuple[str, dict]:
         normalized = raw_section.replace('_', '-').lower()
         if normalized not in self.SECTION_CONFIG:
-            raise NotFound('Section d’activité inconnue.')
+            raise NotFound(self.unknown_section_message)
         return normalized, self.SECTION_CONFIG[normalized]
 
     def get_tourist_point(self, pk):
-        point = get_object_or_404(TouristPoint, pk=pk)
+        point = get_object_or_404(TouristPoint.objects.only('id', 'owner_id'), pk=pk)
         user = self.request.user
         if user.is_staff or point.owner_id == user.id:
             return point
         raise permissions.PermissionDenied('Accès refusé.')
 
     def get_section_items(self, point, metadata_key: str):
-        metadata = point.metadata or {}
-        activity = metadata.get('activity') or {}
-        return copy.deepcopy(activity.get(metadata_key, []))
+        items, self.revision = read_section(point.pk, self.metadata_root, metadata_key)
+        return items
+
+    def mutate_section_items(self, point, metadata_key: str, mutator):
+        expected = parse_if_match(self.request.headers.get('If-Match'))
+        try:
+            result, self.revision = mutate_section(
+                point.pk, self.metadata_root, metadata_key, mutator, expected_revision=expected,
+            )
+        except TouristPoint.DoesNotExist:
+            raise NotFound('Élément introuvable.')
+        return result
 
-    def save_section_items(self, point, metadata_key: str, items):
-        metadata = point.metadata or {}
-        activity = metadata.get('activity') or {}
-        activity[metadata_key] = items
-        metadata['activity'] = activity
-        point.metadata = metadata
-        point.save(update_fields=['metadata', 'updated_at'])
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.revision is not None and response.status_code < 400:
+            response['ETag'] = format_etag(self.revision)
+        return response
 
+    def prepare_entry(self, point, entry: dict) -> dict:
+        return entry
 
-class ActivityMetadataCollectionView(ActivityMetadataMixin, APIView):
+    def prepare_update(self, point, item: dict, updated: dict) -> dict:
+        return updated
+
+
+class JSONMetadataCollectionView(JSONMetadataSectionMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    def apply_filters(self, section: str, items: list[dict]):
+        return items
+
     def get(self, request, pk, section):
-        _, config = self.normalize_section(section)
+        section, config = self.normalize_section(section)
         point = self.get_tourist_point(pk)
         items = self.get_section_items(point, config['metadata_key'])
+        items = self.apply_filters(section, items)
         serializer = config['serializer'](items, many=True)
         return Response(serializer.data)
 
@@ -490,13 +584,12 @@ class ActivityMetadataCollectionView(ActivityMetadataMixin, APIView):
         timestamp = timezone.now().isoformat()
         entry.setdefault('created_at', timestamp)
         entry['updated_at'] = timestamp
-        items = self.get_section_items(point, config['metadata_key'])
-        items.append(entry)
-        self.save_section_items(point, config['metadata_key'], items)
+        entry = self.prepare_entry(point, entry)
+        self.mutate_section_items(point, config['metadata_key'], lambda items: (items + [entry], entry))
         return Response(serializer_class(entry).data, status=status.HTTP_201_CREATED)
 
 
-class ActivityMetadataDetailView(ActivityMetadataMixin, APIView):
+class JSONMetadataDetailView(JSONMetadataSectionMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def patch(self, request, pk, section, item_id):
@@ -506,40 +599,69 @@ class ActivityMetadataDetailView(ActivityMetadataMixin, APIView):
         serializer = serializer_class(data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         updates = dict(serializer.validated_data)
-        items = self.get_section_items(point, config['metadata_key'])
         str_id = str(item_id)
-        for idx, item in enumerate(items):
-            if str(item.get('id')) == str_id:
-                updated = {**item, **updates}
-                updated['id'] = item.get('id', str_id)
-                updated['updated_at'] = timezone.now().isoformat()
-                if 'tourist_point_id' in item or 'tourist_point_id' in updates:
-                    updated['tourist_point_id'] = str(point.id)
-                items[idx] = updated
-                self.save_section_items(point, config['metadata_key'], items)
-                return Response(serializer_class(updated).data)
-        raise NotFound('Élément introuvable.')
+
+        def update(items):
+            for idx, item in enumerate(items):
+                if str(item.get('id')) == str_id:
+                    updated = {**item, **updates}
+                    updated['id'] = item.get('id', str_id)
+                    updated['updated_at'] = timezone.now().isoformat()
+                    items[idx] = self.prepare_update(point, item, updated)
+                    return items, items[idx]
+            raise NotFound('Élément introuvable.')
+
+        updated = self.mutate_section_items(point, config['metadata_key'], update)
+        return Response(serializer_class(updated).data)
 
     def delete(self, request, pk, section, item_id):
         _, config = self.normalize_section(section)
         point = self.get_tourist_point(pk)
-        items = self.get_section_items(point, config['metadata_key'])
         str_id = str(item_id)
-        new_items = [item for item in items if str(item.get('id')) != str_id]
-        if len(new_items) == len(items):
-            raise NotFound('Élément introuvable.')
-        self.save_section_items(point, config['metadata_key'], new_items)
+
+        def remove(items):
+            new_items = [item for item in items if str(item.get('id')) != str_id]
+            if len(new_items) == len(items):
+                raise NotFound('Élément introuvable.')
+            return new_items, None
+
+        self.mutate_section_items(point, config['metadata_key'], remove)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class ActivityMetadataMixin:
+    metadata_root = 'activity'
+    unknown_section_message = 'Section d’activité inconnue.'
+    SECTION_CONFIG = {
+        'equipment': {'metadata_key': 'equipment', 'serializer': ActivityEquipmentSerializer},
+        'requirements': {'metadata_key': 'requirements', 'serializer': ActivityRequirementSerializer},
+        'time-slots': {'metadata_key': 'time_slots', 'serializer': ActivityTimeSlotSerializer},
+        'pricing': {'metadata_key': 'pricing', 'serializer': ActivityPricingSerializer},
+        'bookings': {'metadata_key': 'bookings', 'serializer': ActivityBookingSerializer},
+    }
+
+    def prepare_update(self, point, item: dict, updated: dict) -> dict:
+        if 'tourist_point_id' in item or 'tourist_point_id' in updated:
+            updated['tourist_point_id'] = str(point.id)
+        return updated
+
+
+class ActivityMetadataCollectionView(ActivityMetadataMixin, JSONMetadataCollectionView):
+    pass
+
+
+class ActivityMetadataDetailView(ActivityMetadataMixin, JSONMetadataDetailView):
+    pass
+
+
 class AccommodationMetadataMixin:
     SECTION_CONFIG = {
-        'rooms': {'metadata_key': 'rooms', 'serializer': AccommodationRoomSerializer},
-        'bookings': {'metadata_key': 'bookings', 'serializer': AccommodationBookingSerializer},
-        'availability': {'metadata_key': 'availability', 'serializer': AccommodationAvailabilitySerializer},
-        'rate-plans': {'metadata_key': 'rate_plans', 'serializer': AccommodationRatePlanSerializer},
-        'rate-seasons': {'metadata_key': 'rate_seasons', 'serializer': AccommodationRateSeasonSerializer},
-        'legacy-rates': {'metadata_key': 'legacy_rates', 'serializer': AccommodationLegacyRateSerializer},
+        'rooms': {'model': AccommodationRoom, 'serializer': AccommodationRoomSerializer},
+        'bookings': {'model': AccommodationBooking, 'serializer': AccommodationBookingSerializer},
+        'availability': {'model': AccommodationAvailability, 'serializer': AccommodationAvailabilitySerializer},
+        'rate-plans': {'model': AccommodationRatePlan, 'serializer': AccommodationRatePlanSerializer},
+        'rate-seasons': {'model': AccommodationRateSeason, 'serializer': AccommodationRateSeasonSerializer},
+        'legacy-rates': {'model': AccommodationLegacyRate, 'serializer': AccommodationLegacyRateSerializer},
     }
 
     def normalize_section(self, raw_section: str) -> tuple[str, dict]:
@@ -549,53 +671,62 @@ class AccommodationMetadataMixin:
         return normalized, self.SECTION_CONFIG[normalized]
 
     def get_tourist_point(self, pk):
-        point = get_object_or_404(TouristPoint, pk=pk)
+        point = get_object_or_404(TouristPoint.objects.only('id', 'owner_id'), pk=pk)
         user = self.request.user
         if user.is_staff or point.owner_id == user.id:
             return point
         raise permissions.PermissionDenied('Accès refusé.')
 
-    def get_section_items(self, point, metadata_key: str):
-        metadata = point.metadata or {}
-        accommodation = metadata.get('accommodation') or {}
-        return copy.deepcopy(accommodation.get(metadata_key, []))
-
-    def save_section_items(self, point, metadata_key: str, items):
-        metadata = point.metadata or {}
-        accommodation = metadata.get('accommodation') or {}
-        accommodation[metadata_key] = items
-        metadata['accommodation'] = accommodation
-        point.metadata = metadata
-        point.save(update_fields=['metadata', 'updated_at'])
+    def get_section_queryset(self, point, config: dict):
+        return config['model'].objects.filter(tourist_point=point)
 
-    def apply_filters(self, section: str, items: list[dict]):
+    def get_section_item(self, point, config: dict, item_id):
+        item = self.get_section_queryset(point, config).filter(pk=item_id).first()
+        if item is None:
+            raise NotFound('Élément introuvable.')
+        return item
+
+    def apply_filters(self, section: str, queryset):
         params = self.request.query_params
         room_id = params.get('room_id')
-        if room_id:
-            items = [item for item in items if str(item.get('room_id')) == room_id]
+        if room_id and section not in {'rooms', 'rate-seasons'}:
+            queryset = queryset.filter(room_id=room_id)
 
         if section == 'bookings':
             status_filter = params.get('status')
             if status_filter:
-                items = [item for item in items if item.get('booking_status') == status_filter]
+                queryset = queryset.filter(booking_status=status_filter)
 
         if section == 'availability':
-            date_filter = params.get('date')
+            date_filter = self._date_param('date')
             if date_filter:
-                items = [item for item in items if item.get('date') == date_filter]
-            start_date = params.get('start_date')
-            end_date = params.get('end_date')
+                queryset = queryset.filter(date=date_filter)
+            start_date = self._date_param('start_date')
+            end_date = self._date_param('end_date')
             if start_date:
-                items = [item for item in items if item.get('date') and item['date'] >= start_date]
+                queryset = queryset.filter(date__gte=start_date)
             if end_date:
-                items = [item for item in items if item.get('date') and item['date'] <= end_date]
+                queryset = queryset.filter(date__lte=end_date)
 
         if section == 'rate-seasons':
             rate_plan_id = params.get('rate_plan_id')
             if rate_plan_id:
-                items = [item for item in items if str(item.get('rate_plan_id')) == rate_plan_id]
+                queryset = queryset.filter(rate_plan_id=rate_plan_id)
 
-        return items
+        return queryset
+
+    def _date_param(self, name: str):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            # Bien formée mais impossible (2026-02-30)
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: 'Date invalide (AAAA-MM-JJ).'})
+        return parsed
 
 
 class AccommodationMetadataCollectionView(AccommodationMetadataMixin, APIView):
@@ -604,27 +735,37 @@ class AccommodationMetadataCollectionView(AccommodationMetadataMixin, APIView):
     def get(self, request, pk, section):
         section, config = self.normalize_section(section)
         point = self.get_tourist_point(pk)
-        items = self.get_section_items(point, config['metadata_key'])
-        items = self.apply_filters(section, items)
-        serializer = config['serializer'](items, many=True)
+        queryset = self.apply_filters(section, self.get_section_queryset(point, config))
+        serializer = config['serializer'](queryset, many=True)
         return Response(serializer.data)
 
     def post(self, request, pk, section):
-        _, config = self.normalize_section(section)
+        section, config = self.normalize_section(section)
         point = self.get_tourist_point(pk)
         serializer_class = config['serializer']
         serializer = serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        entry = dict(serializer.validated_data)
-        entry.setdefault('id', str(uuid.uuid4()))
-        timestamp = timezone.now().isoformat()
-        entry.setdefault('created_at', timestamp)
-        entry['updated_at'] = timestamp
-        entry['tourist_point_id'] = str(point.id)
-        items = self.get_section_items(point, config['metadata_key'])
-        items.append(entry)
-        self.save_section_items(point, config['metadata_key'], items)
-        return Response(serializer_class(entry).data, status=status.HTTP_201_CREATED)
+        data = serializer.validated_data
+        if section == 'availability':
+            # Une seule entrée par (chambre, date) : une nouvelle saisie remplace l'ancienne
+            # (201 si créée, 200 si mise à jour).
+            defaults = {key: value for key, value in data.items() if key not in ('id', 'room_id', 'date')}
+            entry, created = config['model'].objects.update_or_create(
+                tourist_point=point, room_id=data['room_id'], date=data['date'],
+                defaults=defaults,
+                create_defaults={**defaults, **({'id': data['id']} if 'id' in data else {})},
+            )
+            return Response(
+                serializer_class(entry).data,
+                status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+            )
+        try:
+            with transaction.atomic():
+                serializer.save(tourist_point=point)
+        except IntegrityError:
+            return Response({'detail': 'Une disponibilité existe déjà pour cette chambre et cette date.'},
+                            status=status.HTTP_409_CONFLICT)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
 class AccommodationMetadataDetailView(AccommodationMetadataMixin, APIView):
@@ -633,37 +774,75 @@ class AccommodationMetadataDetailView(AccommodationMetadataMixin, APIView):
     def patch(self, request, pk, section, item_id):
         _, config = self.normalize_section(section)
         point = self.get_tourist_point(pk)
-        serializer_class = config['serializer']
-        serializer = serializer_class(data=request.data, partial=True)
+        item = self.get_section_item(point, config, item_id)
+        serializer = config['serializer'](item, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        updates = dict(serializer.validated_data)
-        items = self.get_section_items(point, config['metadata_key'])
-        str_id = str(item_id)
-        for idx, item in enumerate(items):
-            if str(item.get('id')) == str_id:
-                updated = {**item, **updates}
-                updated['id'] = item.get('id', str_id)
-                updated['updated_at'] = timezone.now().isoformat()
-                if 'tourist_point_id' in item or 'tourist_point_id' in updates:
-                    updated['tourist_point_id'] = str(point.id)
-                items[idx] = updated
-                self.save_section_items(point, config['metadata_key'], items)
-                return Response(serializer_class(updated).data)
-        raise NotFound('Élément introuvable.')
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            return Response({'detail': 'Une disponibilité existe déjà pour cette chambre et cette date.'},
+                            status=status.HTTP_409_CONFLICT)
+        return Response(serializer.data)
 
     def delete(self, request, pk, section, item_id):
         _, config = self.normalize_section(section)
         point = self.get_tourist_point(pk)
-        items = self.get_section_items(point, config['metadata_key'])
-        str_id = str(item_id)
-        new_items = [item for item in items if str(item.get('id')) != str_id]
-        if len(new_items) == len(items):
+        deleted, _ = self.get_section_queryset(point, config).filter(pk=item_id).delete()
+        if not deleted:
             raise NotFound('Élément introuvable.')
-        self.save_section_items(point, config['metadata_key'], new_items)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class AccommodationQuoteView(APIView):
+    """Devis d'un séjour (total et détail par nuit) pour les chambres d'un hébergement."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        point = get_object_or_404(TouristPoint.objects.only('id', 'owner_id', 'is_active'), pk=pk)
+        user = request.user
+        if not point.is_active and not (user.is_staff or point.owner_id == user.id):
+            raise permissions.PermissionDenied('Accès refusé.')
+
+        params = request.query_params
+        try:
+            # `parse_date` lève ValueError pour une date bien formée mais impossible (2026-02-30).
+            check_in = parse_date(params.get('check_in') or '')
+            check_out = parse_date(params.get('check_out') or '')
+            guests = int(params.get('guests', 1))
+            room_ids = [
+                uuid.UUID(value.strip())
+                for raw in params.getlist('room_id')
+                for value in raw.split(',') if value.strip()
+            ]
+            rate_plan_id = params.get('rate_plan_id')
+            if rate_plan_id:
+                rate_plan_id = str(uuid.UUID(rate_plan_id))
+            validate_stay(check_in, check_out, guests)
+        except QuoteError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({'detail': 'Paramètres invalides'}, status=status.HTTP_400_BAD_REQUEST)
+
+        rooms = AccommodationRoom.objects.filter(tourist_point=point)
+        if room_ids:
+            rooms = rooms.filter(pk__in=room_ids)
+        breakdown = params.get('breakdown', '1').lower() not in {'0', 'false', 'no'}
+        quotes = quote_rooms(rooms, check_in, check_out, guests, rate_plan_id=rate_plan_id, breakdown=breakdown)
+        return Response({
+            'tourist_point_id': str(point.id),
+            'check_in': check_in.isoformat(),
+            'check_out': check_out.isoformat(),
+            'nights': (check_out - check_in).days,
+            'guests': guests,
+            'quotes': quotes,
+        })
+
+
 class RestaurantMetadataMixin:
+    metadata_root = 'restaurant'
+    unknown_section_message = 'Section restaurant inconnue.'
     SECTION_CONFIG = {
         'menus': {'metadata_key': 'menus', 'serializer': RestaurantMenuSerializer},
         'dishes': {'metadata_key': 'dishes', 'serializer': RestaurantDishSerializer},
@@ -672,31 +851,13 @@ class RestaurantMetadataMixin:
         'tables': {'metadata_key': 'tables', 'serializer': RestaurantTableSerializer},
     }
 
-    def normalize_section(self, raw_section: str) -> tuple[str, dict]:
-        normalized = raw_section.replace('_', '-').lower()
-        if normalized not in self.SECTION_CONFIG:
-            raise NotFound('Section restaurant inconnue.')
-        return normalized, self.SECTION_CONFIG[normalized]
-
-    def get_tourist_point(self, pk):
-        point = get_object_or_404(TouristPoint, pk=pk)
-        user = self.request.user
-        if user.is_staff or point.owner_id == user.id:
-            return point
-        raise permissions.PermissionDenied('Accès refusé.')
+    def prepare_entry(self, point, entry: dict) -> dict:
+        entry.setdefault('restaurant_id', str(point.id))
+        return entry
 
-    def get_section_items(self, point, metadata_key: str):
-        metadata = point.metadata or {}
-        restaurant = metadata.get('restaurant') or {}
-        return copy.deepcopy(restaurant.get(metadata_key, []))
-
-    def save_section_items(self, point, metadata_key: str, items):
-        metadata = point.metadata or {}
-        restaurant = metadata.get('restaurant') or {}
-        restaurant[metadata_key] = items
-        metadata['restaurant'] = restaurant
-        point.metadata = metadata
-        point.save(update_fields=['metadata', 'updated_at'])
+    def prepare_update(self, point, item: dict, updated: dict) -> dict:
+        updated['restaurant_id'] = str(point.id)
+        return updated
 
     def apply_filters(self, section: str, items: list[dict]):
         params = self.request.query_params
@@ -728,68 +889,12 @@ class RestaurantMetadataMixin:
         return items
 
 
-class RestaurantMetadataCollectionView(RestaurantMetadataMixin, APIView):
-    permission_classes = [permissions.IsAuthenticated]
-
-    def get(self, request, pk, section):
-        section, config = self.normalize_section(section)
-        point = self.get_tourist_point(pk)
-        items = self.get_section_items(point, config['metadata_key'])
-        items = self.apply_filters(section, items)
-        serializer = config['serializer'](items, many=True)
-        return Response(serializer.data)
-
-    def post(self, request, pk, section):
-        _, config = self.normalize_section(section)
-        point = self.get_tourist_point(pk)
-        serializer_class = config['serializer']
-        serializer = serializer_class(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        entry = dict(serializer.validated_data)
-        entry.setdefault('id', str(uuid.uuid4()))
-        timestamp = timezone.now().isoformat()
-        entry.setdefault('created_at', timestamp)
-        entry['updated_at'] = timestamp
-        entry.setdefault('restaurant_id', str(point.id))
-        items = self.get_section_items(point, config['metadata_key'])
-        items.append(entry)
-        self.save_section_items(point, config['metadata_key'], items)
-        return Response(serializer_class(entry).data, status=status.HTTP_201_CREATED)
-
-
-class RestaurantMetadataDetailView(RestaurantMetadataMixin, APIView):
-    permission_classes = [permissions.IsAuthenticated]
+class RestaurantMetadataCollectionView(RestaurantMetadataMixin, JSONMetadataCollectionView):
+    pass
 
-    def patch(self, request, pk, section, item_id):
-        _, config = self.normalize_section(section)
-        point = self.get_tourist_point(pk)
-        serializer_class = config['serializer']
-        serializer = serializer_class(data=request.data, partial=True)
-        serializer.is_valid(raise_exception=True)
-        updates = dict(serializer.validated_data)
-        items = self.get_section_items(point, config['metadata_key'])
-        str_id = str(item_id)
-        for idx, item in enumerate(items):
-            if str(item.get('id')) == str_id:
-                updated = {**item, **updates}
-                updated['id'] = item.get('id', str_id)
-                updated['updated_at'] = timezone.now().isoformat()
-                updated['restaurant_id'] = str(point.id)
-                items[idx] = updated
-                self.save_section_items(point, config['metadata_key'], items)
-                return Response(serializer_class(updated).data)
-        raise NotFound('Élément introuvable.')
 
-    def delete(self, request, pk, section, item_id):
-        _, config = self.normalize_section(section)
-        point = self.get_tourist_point(pk)
-        items = self.get_section_items(point, config['metadata_key'])
-        str_id = str(item_id)
-        new_items = [item for item in items if str(item.get('id')) != str_id]
-        if len(new_items) == len(items):
-            raise NotFound('Élément introuvable.')
-        self.save_section_items(point, config['metadata_key'], new_items)
-        return Response(status=status.HTTP_204_NO_CONTENT)
+class RestaurantMetadataDetailView(RestaurantMetadataMixin, JSONMetadataDetailView):
+    pass
 
 
 class POIConversationViewSet(viewsets.ModelViewSet):
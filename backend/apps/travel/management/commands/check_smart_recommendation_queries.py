@@ -0,0 +1,102 @@
+"""
+Vérifie que les recommandations personnalisées s'exécutent en un nombre
+constant de requêtes SQL.
+
+Dans une transaction annulée à la fin, crée des POI tagués autour d'une
+position isolée et des utilisateurs avec plus ou moins de favoris, puis appelle
+`POST /travel/smart-recommendations/` (avec et sans position) : le nombre de
+requêtes ne doit dépendre ni du nombre de candidats ni du nombre de favoris.
+
+Usage:
+    docker-compose exec backend python manage.py check_smart_recommendation_queries --candidates 60 --favorites 20
+"""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.poi.models import FavoriteTouristPoint, Tag, TouristPoint
+from apps.travel.views import SmartRecommendationsView
+
+# Zone peu dense (Pacifique sud) : les candidats sont surtout ceux créés ici.
+ORIGIN = (-48.0, -123.0)
+TAGS_PER_POINT = 3
+
+
+class Command(BaseCommand):
+    help = 'Compte les requêtes SQL des recommandations personnalisées selon le nombre de candidats et de favoris'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=60, help='POI candidats du plus grand scénario')
+        parser.add_argument('--favorites', type=int, default=20, help='Favoris du plus grand scénario')
+
+    def handle(self, *args, **options):
+        candidates, favorites = options['candidates'], options['favorites']
+        if not 0 < favorites <= candidates <= SmartRecommendationsView.CANDIDATE_LIMIT:
+            raise CommandError(
+                f'Il faut 0 < favoris <= candidats <= {SmartRecommendationsView.CANDIDATE_LIMIT}'
+            )
+        with transaction.atomic():
+            self._run(candidates, favorites)
+            transaction.set_rollback(True)
+
+    def _run(self, candidate_count, favorite_count):
+        suffix = uuid.uuid4().hex[:8]
+        tags = [
+            Tag.objects.create(code=f'reco-{index}-{suffix}', label_fr=f'Tag {index}')
+            for index in range(TAGS_PER_POINT * 4)
+        ]
+        scenarios = [(1, min(5, candidate_count)), (favorite_count, candidate_count)]
+        view = SmartRecommendationsView.as_view()
+        factory = APIRequestFactory()
+        counts = {}
+        for index, (favorites, candidates) in enumerate(scenarios):
+            # Une position par scénario, à ~50 km des autres (rayon de 30 km).
+            latitude, longitude = ORIGIN[0] + index * 0.5, ORIGIN[1]
+            user = self._user(index, suffix, latitude, longitude, candidates, favorites, tags)
+            for label, body in (
+                ('avec position', {'userLat': latitude, 'userLon': longitude, 'radiusKm': 30}),
+                ('sans position', {}),
+            ):
+                request = factory.post('/api/v1/travel/smart-recommendations/', body, format='json')
+                force_authenticate(request, user=user)
+                with CaptureQueriesContext(connection) as queries:
+                    response = view(request)
+                    response.render()
+                if response.status_code != 200:
+                    raise CommandError(f'{label} : réponse {response.status_code} {response.data}')
+                if label == 'avec position' and len(response.data['recommendations']) < min(candidates, 10):
+                    raise CommandError(f"{label} : {len(response.data['recommendations'])} recommandations")
+                counts.setdefault(label, []).append(len(queries))
+
+        for label, values in counts.items():
+            self.stdout.write(
+                f'{label} : ' + ', '.join(
+                    f'{candidates} candidats / {favorites} favoris -> {count} requêtes'
+                    for (favorites, candidates), count in zip(scenarios, values)
+                )
+            )
+            if len(set(values)) != 1:
+                raise CommandError(f'{label} : le nombre de requêtes dépend des données {values}')
+        self.stdout.write(self.style.SUCCESS('Nombre de requêtes constant pour les recommandations'))
+
+    @staticmethod
+    def _user(index, suffix, latitude, longitude, candidates, favorites, tags):
+        user = get_user_model().objects.create(
+            username=f'reco-{index}-{suffix}', email=f'reco-{index}-{suffix}@example.com',
+        )
+        points = [
+            TouristPoint.objects.create(
+                owner=user, name=f'POI {position}', is_active=True, rating=4,
+                latitude=latitude + position * 0.001, longitude=longitude,
+            )
+            for position in range(candidates)
+        ]
+        for position, point in enumerate(points):
+            point.tags.set(tags[position % len(tags):][:TAGS_PER_POINT])
+        for point in points[:favorites]:
+            FavoriteTouristPoint.objects.create(user=user, tourist_point=point)
+        return user
@@ -0,0 +1,72 @@
+"""
+Contexte de recommandation construit une seule fois par requête.
+
+Les préférences de l'utilisateur sont lues dans son profil de goûts matérialisé
+(UserProfile.taste_profile, voir TasteProfileService) ; les tags des POI
+candidats sont chargés en une requête via la table de liaison
+TouristPoint.tags. Tout le scoring lit ensuite ces structures en mémoire.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from apps.accounts.models import UserProfile
+from apps.accounts.services import TasteProfileService
+from apps.poi.models import FavoriteTouristPoint, Tag, TouristPoint
+
+PoiTag = TouristPoint.tags.through
+
+
+class RecommendationContext:
+    def __init__(self, user):
+        self.user = user
+        # tag_id -> label_fr, alimenté par chaque chargement de tags.
+        self.tag_labels: Dict[int, str] = {}
+        self.taste_profile: dict = (
+            UserProfile.objects.filter(user=user).values_list('taste_profile', flat=True).first() or {}
+        )
+        self.tag_weights: Dict[int, int] = {
+            int(tag_id): weight for tag_id, weight in (self.taste_profile.get('tags') or {}).items()
+        }
+        self.visited_ids: List = list(
+            FavoriteTouristPoint.objects.filter(user=user).values_list('tourist_point_id', flat=True)
+        )
+        self._candidate_tags: Dict = {}
+
+    def _load_tags(self, poi_ids: Iterable) -> Dict:
+        """Une requête : {poi_id: [tag_id, ...]} et complète `tag_labels`."""
+        poi_ids = list(poi_ids)
+        tags_by_poi = defaultdict(list)
+        if not poi_ids:
+            return tags_by_poi
+        rows = (
+            PoiTag.objects.filter(touristpoint_id__in=poi_ids)
+            .order_by('touristpoint_id', 'tag_id')
+            .values_list('touristpoint_id', 'tag_id', 'tag__label_fr')
+        )
+        for poi_id, tag_id, label in rows:
+            tags_by_poi[poi_id].append(tag_id)
+            self.tag_labels[tag_id] = label
+        return tags_by_poi
+
+    def load_candidates(self, poi_ids: Iterable) -> None:
+        self._candidate_tags = self._load_tags(poi_ids)
+
+    def tag_labels_for(self, poi_id) -> List[str]:
+        return [self.tag_labels[tag_id] for tag_id in self._candidate_tags.get(poi_id, ())]
+
+    def favorite_overlap(self, poi_id) -> int:
+        return sum(1 for tag_id in self._candidate_tags.get(poi_id, ()) if tag_id in self.tag_weights)
+
+    def preferred_tags(self, limit: int = 10) -> List[str]:
+        """Libellés des tags les plus pondérés du profil de goûts."""
+        tag_ids = [int(tag_id) for tag_id in TasteProfileService.top(self.taste_profile, 'tags', limit)]
+        missing = [tag_id for tag_id in tag_ids if tag_id not in self.tag_labels]
+        if missing:
+            self.tag_labels.update(Tag.objects.filter(id__in=missing).values_list('id', 'label_fr'))
+        return [self.tag_labels[tag_id] for tag_id in tag_ids if tag_id in self.tag_labels]
+
+    def preferred(self, section: str) -> Optional[str]:
+        top = TasteProfileService.top(self.taste_profile, section, 1)
+        return top[0] if top else None
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import math
 import random
 import uuid
 from datetime import datetime, timedelta
@@ -11,7 +10,10 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.poi.models import FavoriteTouristPoint, TouristPoint
+from apps.poi.geo import nearest_within_radius
+from apps.poi.models import TouristPoint
+
+from .recommendations import RecommendationContext
 
 
 class EnhancedTripPlannerView(APIView):
@@ -288,6 +290,7 @@ class TravelAIAssistantView(APIView):
 
 class SmartRecommendationsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    CANDIDATE_LIMIT = 100
 
     def post(self, request):
         user = request.user
@@ -296,45 +299,53 @@ class SmartRecommendationsView(APIView):
         radius_km = float(request.data.get('radiusKm') or 30)
 
         try:
-            recommendations = self._build_recommendations(user, user_lat, user_lon, radius_km)
-            profile = self._build_user_profile(user)
+            context = RecommendationContext(user)
+            recommendations = self._build_recommendations(context, user_lat, user_lon, radius_km)
+            profile = self._build_user_profile(context)
         except Exception as exc:  # pragma: no cover - defensive
             return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({'recommendations': recommendations, 'userProfile': profile})
 
-    def _build_recommendations(self, user, user_lat, user_lon, radius_km):
+    def _build_recommendations(self, context, user_lat, user_lon, radius_km):
         qs = (
             TouristPoint.objects.filter(is_active=True)
             .exclude(latitude__isnull=True)
             .exclude(longitude__isnull=True)
-            .select_related('budget_level', 'difficulty_level')
-            .prefetch_related('tags')
+            .only('id', 'name', 'description', 'rating', 'price_range', 'latitude', 'longitude')
         )
+        distances = None
+        if user_lat is not None and user_lon is not None:
+            # Pré-filtre geohash/bounding box en SQL, puis les k plus proches dans le rayon.
+            nearest = nearest_within_radius(
+                qs, float(user_lat), float(user_lon), radius_km, limit=self.CANDIDATE_LIMIT
+            )
+            distances = {pk: distance for distance, pk in nearest}
+            candidates = qs.filter(pk__in=list(distances))
+        else:
+            candidates = qs[: self.CANDIDATE_LIMIT]
+        candidates = list(candidates)
+        context.load_candidates(poi.pk for poi in candidates)
+
         poi_entries = []
-        for poi in qs[:100]:
+        for poi in candidates:
             score = 60
             reason_parts = []
 
-            if user_lat is not None and user_lon is not None:
-                distance = self._distance_km(float(user_lat), float(user_lon), float(poi.latitude), float(poi.longitude))
-                if distance <= radius_km:
-                    score += 20
-                    reason_parts.append(f"À {distance:.1f} km de vous")
-                else:
-                    continue
+            if distances is not None:
+                distance = distances[poi.pk]
+                score += 20
+                reason_parts.append(f"À {distance:.1f} km de vous")
 
             if poi.rating:
                 score += min(float(poi.rating) * 5, 15)
                 reason_parts.append(f"Note {poi.rating}/5")
 
-            tag_labels = list(poi.tags.values_list('label_fr', flat=True))
-            favorite_tags = self._favorite_tags(user)
-            if favorite_tags and tag_labels:
-                overlap = len(set(t.lower() for t in tag_labels) & favorite_tags)
+            tag_labels = context.tag_labels_for(poi.pk)
+            overlap = context.favorite_overlap(poi.pk)
+            if overlap:
                 score += overlap * 5
-                if overlap:
-                    reason_parts.append('Correspond à vos goûts')
+                reason_parts.append('Correspond à vos goûts')
 
             poi_entries.append(
                 {
@@ -357,38 +368,15 @@ class SmartRecommendationsView(APIView):
         poi_entries.sort(key=lambda entry: entry['score'], reverse=True)
         return poi_entries[:10]
 
-    def _favorite_tags(self, user):
-        tags = set()
-        favorites = FavoriteTouristPoint.objects.filter(user=user).select_related('tourist_point').prefetch_related('tourist_point__tags')
-        for favorite in favorites:
-            tags.update(tag.label_fr.lower() for tag in favorite.tourist_point.tags.all())
-        return tags
-
-    def _build_user_profile(self, user):
-        favorites = FavoriteTouristPoint.objects.filter(user=user).select_related('tourist_point')
-        preferred_tags = []
-        visited_ids = []
-        for favorite in favorites:
-            visited_ids.append(str(favorite.tourist_point_id))
-            preferred_tags.extend([tag.label_fr for tag in favorite.tourist_point.tags.all()])
-
+    def _build_user_profile(self, context):
         return {
-            'preferredTags': preferred_tags[:10],
-            'preferredPriceRange': 'mid',
-            'preferredDifficulty': 'medium',
+            'preferredTags': context.preferred_tags(10),
+            'preferredPriceRange': context.preferred('price') or 'mid',
+            'preferredDifficulty': context.preferred('difficulty') or 'medium',
             'avgDuration': 2,
-            'visitedPOIs': visited_ids,
+            'visitedPOIs': [str(poi_id) for poi_id in context.visited_ids],
         }
 
-    def _distance_km(self, lat1, lon1, lat2, lon2):
-        R = 6371
-        phi1, phi2 = math.radians(lat1), math.radians(lat2)
-        d_phi = math.radians(lat2 - lat1)
-        d_lambda = math.radians(lon2 - lon1)
-        a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return R * c
-
 
 class AmadeusProxyView(APIView):
     permission_classes = [permissions.AllowAny]
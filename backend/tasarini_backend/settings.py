@@ -93,6 +93,44 @@ DATABASES = {
     'default': env.db(),
 }
 
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Ingestion des vues/clics de POI (apps.analytics.ingestion) : écriture du tampon toutes les N secondes
+# ou dès N couples (POI, jour) en attente ; précision des sketches HyperLogLog (2**N octets)
+ANALYTICS_FLUSH_INTERVAL = env.int('ANALYTICS_FLUSH_INTERVAL', default=10)
+ANALYTICS_FLUSH_MAX_KEYS = env.int('ANALYTICS_FLUSH_MAX_KEYS', default=20000)
+ANALYTICS_HLL_PRECISION = env.int('ANALYTICS_HLL_PRECISION', default=12)
+# Couples (POI, jour) gardés au plus dans le tampon quand les écritures échouent (les plus anciens sont abandonnés)
+ANALYTICS_BUFFER_MAX_KEYS = env.int('ANALYTICS_BUFFER_MAX_KEYS', default=100000)
+
+# Tableau de bord partenaire (apps.partners.dashboard) : durée de vie du cache en secondes
+PARTNER_DASHBOARD_CACHE_TTL = env.int('PARTNER_DASHBOARD_CACHE_TTL', default=300)
+
+# Vue d'ensemble admin « Be Inspired » (apps.analytics.views) : durée de vie du cache en secondes
+BE_INSPIRED_OVERVIEW_CACHE_TTL = env.int('BE_INSPIRED_OVERVIEW_CACHE_TTL', default=60)
+
+# Autocomplétion : reconstruction de l'index en mémoire au plus tard après ce délai (secondes) ;
+# 0 = jamais (la version du cache partagé suffit), à activer si le cache n'est pas partagé entre workers
+SUGGEST_INDEX_TTL = env.int('SUGGEST_INDEX_TTL', default=0)
+
+# Géolocalisation des sessions (apps.accounts.geolocation) : ipapi, file ou none
+GEOIP_BACKEND = env('GEOIP_BACKEND', default='ipapi')
+GEOIP_RANGES_FILE = env('GEOIP_RANGES_FILE', default='')
+GEOIP_HTTP_TIMEOUT = env.float('GEOIP_HTTP_TIMEOUT', default=3)
+GEOIP_CACHE_SIZE = env.int('GEOIP_CACHE_SIZE', default=10000)
+GEOIP_CACHE_TTL = env.int('GEOIP_CACHE_TTL', default=86400)
+
+# Activité des sessions (apps.accounts.session_activity) : écriture de last_activity au plus toutes les N secondes
+SESSION_ACTIVITY_GRANULARITY = env.int('SESSION_ACTIVITY_GRANULARITY', default=60)
+# Cache LRU des User-Agent analysés (apps.accounts.device_detection)
+USER_AGENT_CACHE_SIZE = env.int('USER_AGENT_CACHE_SIZE', default=1024)
+
+# Idempotence des réservations (apps.bookings.services) : une clé Idempotency-Key est rejouable
+# pendant N heures, puis oubliée (purge : manage.py purge_idempotency_keys)
+BOOKING_IDEMPOTENCY_KEY_TTL_HOURS = env.int('BOOKING_IDEMPOTENCY_KEY_TTL_HOURS', default=24)
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {
@@ -143,6 +181,13 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
+    # Pagination par curseur (apps.core.pagination) ; pagination_class = None pour les tables de référence
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.StableCursorPagination',
+    'PAGE_SIZE': 50,
+    # Limites par utilisateur (ou IP pour les anonymes) des vues à `throttle_scope`
+    'DEFAULT_THROTTLE_RATES': {
+        'analytics-events': env('ANALYTICS_EVENTS_THROTTLE_RATE', default='120/min'),
+    },
 }
 
 SPECTACULAR_SETTINGS = {
@@ -160,6 +205,8 @@ SIMPLE_JWT = {
 
 CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS', default=['http://localhost:5173'])
 CORS_ALLOW_CREDENTIALS = True
+# Liens de pagination (StableCursorPagination)
+CORS_EXPOSE_HEADERS = ['Link']
 
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -173,6 +220,11 @@ DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='Tasarini <no-reply@tasar
 SERVER_EMAIL = env('SERVER_EMAIL', default='no-reply@tasarini.com')
 EMAIL_TIMEOUT = env.int('EMAIL_TIMEOUT', default=10)
 EMAIL_USE_LOCALTIME = True
+# File d'envoi (apps.accounts.email_queue) : thread d'envoi dans le processus web,
+# désactivé si `manage.py send_queued_emails` tourne dans un processus dédié
+EMAIL_QUEUE_WORKER = env.bool('EMAIL_QUEUE_WORKER', default=True)
+EMAIL_QUEUE_BATCH_SIZE = env.int('EMAIL_QUEUE_BATCH_SIZE', default=50)
+EMAIL_QUEUE_MAX_ATTEMPTS = env.int('EMAIL_QUEUE_MAX_ATTEMPTS', default=6)
 
 # Frontend URL for email links
 FRONTEND_URL = env('FRONTEND_URL', default='http://localhost:5173')
@@ -46,6 +46,7 @@ from apps.accounts.views import (
 from apps.analytics.views import (
     TouristPointAnalyticsViewSet,
     TravelAnalyticsViewSet,
+    TouristPointEventIngestView,
     BeInspiredOverviewView,
     BeInspiredPOIStatsView,
     BeInspiredUserActivityView,
@@ -75,6 +76,7 @@ from apps.poi.views import (
     POIMediaViewSet,
     RestaurantCategoryViewSet,
     LocationResolveView,
+    SearchSuggestView,
     AccommodationTypeViewSet,
     AccommodationAmenityViewSet,
     AccommodationLocationViewSet,
@@ -87,6 +89,7 @@ from apps.poi.views import (
     ActivityMetadataDetailView,
     AccommodationMetadataCollectionView,
     AccommodationMetadataDetailView,
+    AccommodationQuoteView,
     RestaurantMetadataCollectionView,
     RestaurantMetadataDetailView,
 )
@@ -113,7 +116,7 @@ from apps.content.views import (
     StoryGenerationView,
     StoryViewSet,
 )
-from apps.bookings.views import BookingViewSet, RatePlanViewSet, RoomViewSet
+from apps.bookings.views import BookingViewSet, RatePlanViewSet, RoomAvailabilitySearchView, RoomViewSet
 from apps.travel.views import (
     EnhancedTripPlannerView,
     TravelAIAssistantView,
@@ -224,6 +227,9 @@ urlpatterns = [
     path('api/v1/partners/<str:pk>/analytics/', PartnerAnalyticsView.as_view(), name='partner-analytics'),
     path('api/v1/partners/bulk-poi-status/', PartnerBulkPOIStatusView.as_view(), name='partner-bulk-poi'),
     path('api/v1/locations/resolve/', LocationResolveView.as_view(), name='location-resolve'),
+    path('api/v1/search/suggest/', SearchSuggestView.as_view(), name='search-suggest'),
+    path('api/v1/bookings/availability/', RoomAvailabilitySearchView.as_view(), name='booking-availability'),
+    path('api/v1/analytics/events/', TouristPointEventIngestView.as_view(), name='analytics-events'),
     path('api/v1/analytics/be-inspired/overview/', BeInspiredOverviewView.as_view(), name='be-inspired-overview'),
     path('api/v1/analytics/be-inspired/pois/', BeInspiredPOIStatsView.as_view(), name='be-inspired-pois'),
     path('api/v1/analytics/be-inspired/users/', BeInspiredUserActivityView.as_view(), name='be-inspired-users'),
@@ -238,6 +244,11 @@ urlpatterns = [
         ActivityMetadataDetailView.as_view(),
         name='poi-activity-section-detail',
     ),
+    path(
+        'api/v1/poi/tourist-points/<uuid:pk>/accommodation/quote/',
+        AccommodationQuoteView.as_view(),
+        name='poi-accommodation-quote',
+    ),
     path(
         'api/v1/poi/tourist-points/<uuid:pk>/accommodation/<str:section>/',
         AccommodationMetadataCollectionView.as_view(),
@@ -84,7 +84,7 @@ export const TravelAnalytics = () => {
         params.country = selectedCountry;
       }
 
-      const data = await apiClient.get<AnalyticsData[]>('analytics/travel/', params);
+      const data = await apiClient.getAll<AnalyticsData>('analytics/travel/', params);
       setAnalyticsData(data || []);
     } catch (error) {
       console.error('Error fetching analytics:', error);
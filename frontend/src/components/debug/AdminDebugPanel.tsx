@@ -19,8 +19,8 @@ export const AdminDebugPanel = () => {
     try {
       
       // Direct query to check roles via API
-      const rolesData = await apiClient.get<any[]>('accounts/user-roles/', { user: user.id });
-      const permissionsData = await apiClient.get<any[]>('admin/permission-rules/', { admin: user.id });
+      const rolesData = await apiClient.getAll<any>('accounts/user-roles/', { user: user.id });
+      const permissionsData = await apiClient.getAll<any>('admin/permission-rules/', { admin: user.id });
 
 
       setDebugInfo({
@@ -90,7 +90,7 @@ const AdvancedPartnerDashboard: React.FC = () => {
       if (!user?.id) return;
 
       // Fetch tourist points from Django API
-      const touristPoints = await apiClient.get<any[]>('poi/tourist-points/', {
+      const touristPoints = await apiClient.getAll<any>('poi/tourist-points/', {
         owner: 'me'
       });
 
@@ -100,7 +100,7 @@ const AdvancedPartnerDashboard: React.FC = () => {
         const thirtyDaysAgo = new Date();
         thirtyDaysAgo.setDate(thirtyDaysAgo.getDate() - 30);
 
-        analyticsData = await apiClient.get<any[]>('analytics/tourist-points/', {
+        analyticsData = await apiClient.getAll<any>('analytics/tourist-points/', {
           tourist_point__owner: user.id,
           date__gte: thirtyDaysAgo.toISOString().split('T')[0],
           ordering: '-date'
@@ -112,7 +112,7 @@ const AdvancedPartnerDashboard: React.FC = () => {
       // Fetch commissions data from Django API
       let commissionData: any[] = [];
       try {
-        commissionData = await apiClient.get<any[]>('partners/commissions/', {
+        commissionData = await apiClient.getAll<any>('partners/commissions/', {
           ordering: '-booking_date'
         });
       } catch (error) {
@@ -53,7 +53,7 @@ export const BookingAnalyticsPanel: React.FC = () => {
       setLoading(true);
 
       // Fetch booking reservations from Django API
-      const bookingData = await apiClient.get<any[]>('bookings/reservations/', {
+      const bookingData = await apiClient.getAll<any>('bookings/reservations/', {
         ordering: '-created_at'
       });
 
@@ -83,7 +83,7 @@ const DynamicFinancialDashboard: React.FC = () => {
       setLoading(true);
 
       // Récupération des commissions via Django API
-      const commissionsData = await apiClient.get<any[]>('partners/commissions/');
+      const commissionsData = await apiClient.getAll<any>('partners/commissions/');
 
       const formattedCommissions: Commission[] = commissionsData?.map(item => ({
         id: item.id,
@@ -99,7 +99,7 @@ const DynamicFinancialDashboard: React.FC = () => {
       setCommissions(formattedCommissions);
 
       // Récupération des moyens de paiement via Django API
-      const paymentMethodsData = await apiClient.get<any[]>('partners/payment-methods/');
+      const paymentMethodsData = await apiClient.getAll<any>('partners/payment-methods/');
 
       // Conversion des données DB vers l'interface TypeScript
       const formattedPaymentMethods: PaymentMethod[] = (paymentMethodsData || []).map(method => ({
@@ -113,7 +113,7 @@ const DynamicFinancialDashboard: React.FC = () => {
       setPaymentMethods(formattedPaymentMethods);
 
       // Récupération des demandes de retrait via Django API
-      const withdrawalsData = await apiClient.get<any[]>('partners/withdrawals/');
+      const withdrawalsData = await apiClient.getAll<any>('partners/withdrawals/');
 
       // Conversion des données DB vers l'interface TypeScript
       const formattedWithdrawals: WithdrawalRequest[] = (withdrawalsData || []).map(withdrawal => ({
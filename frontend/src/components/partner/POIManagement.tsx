@@ -65,7 +65,7 @@ const POIManagement: React.FC = () => {
 
     setLoading(true);
     try {
-      const data = await apiClient.get<any[]>('poi/tourist-points/', { owner: 'me' });
+      const data = await apiClient.getAll<any>('poi/tourist-points/', { owner: 'me' });
 
       const withPreview = (data || []).map((poi: any) => {
         const images: string[] = Array.isArray(poi.media_images) ? poi.media_images : [];
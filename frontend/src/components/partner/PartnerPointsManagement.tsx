@@ -74,7 +74,7 @@ const PartnerPointsManagement: React.FC = () => {
   const fetchPoints = async () => {
     try {
       setLoading(true);
-      const data = await apiClient.get<TouristPoint[]>('poi/tourist-points/', { owner: 'me' });
+      const data = await apiClient.getAll<TouristPoint>('poi/tourist-points/', { owner: 'me' });
       setPoints(data || []);
     } catch (error) {
       console.error('Erreur lors du chargement des points:', error);
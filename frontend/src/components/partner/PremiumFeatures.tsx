@@ -96,7 +96,7 @@ const PremiumFeatures: React.FC = () => {
       setLoading(true);
 
       // Récupérer les points d'intérêt du partenaire via Django API
-      const pointsData = await apiClient.get<TouristPoint[]>('poi/tourist-points/', { owner: 'me' });
+      const pointsData = await apiClient.getAll<TouristPoint>('poi/tourist-points/', { owner: 'me' });
       setPoints(pointsData || []);
 
       // Simuler des données de réservation (à remplacer par une vraie table)
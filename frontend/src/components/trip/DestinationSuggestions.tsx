@@ -84,7 +84,7 @@ export const DestinationSuggestions: React.FC<DestinationSuggestionsProps> = ({
 
     try {
       // Get user's favorite POIs from Django API
-      const favorites = await apiClient.get<any[]>('poi/favorites/', {
+      const favorites = await apiClient.getAll<any>('poi/favorites/', {
         user: user.id
       });
 
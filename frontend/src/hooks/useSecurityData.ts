@@ -43,7 +43,7 @@ export const useSecurityData = () => {
       setScanning(true);
 
       const [poiData, auditLogs] = await Promise.all([
-        apiClient.get<any[]>('poi/tourist-points/', { limit: 100 }),
+        apiClient.getAll<any>('poi/tourist-points/'),
         apiClient.get<any[]>('admin/audit-logs/', { limit: 1 }),
       ]);
 
@@ -29,6 +29,23 @@ const buildUrl = (endpoint: string, searchParams?: RequestOptions['searchParams'
   return url;
 };
 
+// Taille de page maximale acceptée par l'API (StableCursorPagination.max_page_size).
+const MAX_PAGE_SIZE = 200;
+
+// URL de la page suivante annoncée dans l'en-tête `Link` (rel="next"), sinon null.
+const nextPageUrl = (linkHeader: string | null): URL | null => {
+  if (!linkHeader) {
+    return null;
+  }
+  for (const part of linkHeader.split(',')) {
+    const match = part.match(/<([^>]+)>\s*;\s*rel="next"/);
+    if (match) {
+      return new URL(match[1]);
+    }
+  }
+  return null;
+};
+
 const getAuthHeaders = (): HeadersInit => {
   const token = localStorage.getItem('tasarini_access_token');
   return token ? { Authorization: `Bearer ${token}` } : {};
@@ -88,9 +105,13 @@ export class ApiError extends Error {
 }
 
 export class ApiClient {
-  async request<T>(endpoint: string, options: RequestOptions = {}, attempt = 0): Promise<T> {
-    const { method = 'GET', headers, body, searchParams } = options;
-    const url = buildUrl(endpoint, searchParams);
+  async request<T>(endpoint: string, options: RequestOptions = {}): Promise<T> {
+    const { data } = await this.send<T>(buildUrl(endpoint, options.searchParams), options);
+    return data;
+  }
+
+  private async send<T>(url: URL, options: RequestOptions, attempt = 0): Promise<{ data: T; response: Response }> {
+    const { method = 'GET', headers, body } = options;
     const response = await fetch(url, {
       method,
       headers: {
@@ -107,13 +128,13 @@ export class ApiClient {
       if (response.status === 401 && attempt === 0) {
         const refreshed = await this.tryRefreshToken();
         if (refreshed) {
-          return this.request<T>(endpoint, options, attempt + 1);
+          return this.send<T>(url, options, attempt + 1);
         }
       }
       throw new ApiError(response.statusText || 'API Error', response.status, responseBody);
     }
 
-    return responseBody as T;
+    return { data: responseBody as T, response };
   }
 
   private async parseBody(response: Response) {
@@ -128,6 +149,28 @@ export class ApiClient {
     return this.request<T>(endpoint, { method: 'GET', searchParams });
   }
 
+  /**
+   * Liste complète d'un endpoint paginé : suit les pages annoncées dans l'en-tête
+   * `Link` (rel="next"). Avec `limit`, s'arrête aux `limit` premiers éléments.
+   */
+  async getAll<T>(endpoint: string, searchParams?: RequestOptions['searchParams']): Promise<T[]> {
+    const limit = searchParams?.limit !== undefined ? Number(searchParams.limit) : undefined;
+    const items: T[] = [];
+    let url: URL | null = buildUrl(
+      endpoint,
+      limit === undefined ? { page_size: MAX_PAGE_SIZE, ...searchParams } : searchParams,
+    );
+    while (url) {
+      const { data, response } = await this.send<T[]>(url, { method: 'GET' });
+      items.push(...(data ?? []));
+      if (limit !== undefined && items.length >= limit) {
+        return items.slice(0, limit);
+      }
+      url = nextPageUrl(response.headers.get('Link'));
+    }
+    return items;
+  }
+
   post<T>(endpoint: string, body?: unknown) {
     return this.request<T>(endpoint, { method: 'POST', body });
   }
@@ -208,7 +208,7 @@ const Profile = () => {
     if (!user) return;
 
     try {
-      const data = await apiClient.get<any[]>('poi/tourist-points/', { owner: 'me' });
+      const data = await apiClient.getAll<any>('poi/tourist-points/', { owner: 'me' });
       setTouristPoints(data || []);
     } catch (error) {
       console.error('Error fetching tourist points:', error);
@@ -52,7 +52,7 @@ const PublicTouristPoints: React.FC = () => {
 
   const fetchTouristPoints = async () => {
     try {
-      const data = await apiClient.get<TouristPoint[]>('poi/tourist-points/', {
+      const data = await apiClient.getAll<TouristPoint>('poi/tourist-points/', {
         is_active: true,
         ordering: '-created_at'
       });
@@ -77,7 +77,7 @@ export interface ConversationMessage {
 
 export const adminPoiService = {
   list(params: Record<string, string | number | boolean> = {}) {
-    return apiClient.get<AdminPoi[]>('poi/tourist-points/', params);
+    return apiClient.getAll<AdminPoi>('poi/tourist-points/', params);
   },
 
   get(id: string) {
@@ -117,11 +117,11 @@ export const adminService = {
   },
 
   listAuditLogs() {
-    return apiClient.get<AdminAuditLog[]>('admin/audit-logs/');
+    return apiClient.getAll<AdminAuditLog>('admin/audit-logs/');
   },
 
   listAdminSessions() {
-    return apiClient.get<AdminSession[]>('admin/sessions/');
+    return apiClient.getAll<AdminSession>('admin/sessions/');
   },
 
   listAdminPermissions() {
@@ -133,7 +133,7 @@ export const adminService = {
   },
 
   listUsers() {
-    return apiClient.get<ApiUser[]>('users/');
+    return apiClient.getAll<ApiUser>('users/');
   },
 
   deleteUser(userId: number) {
@@ -154,7 +154,7 @@ export const adminService = {
 
   listPermissionRules(adminId?: number) {
     const params = adminId ? { admin: adminId } : undefined;
-    return apiClient.get<AdminPermissionRule[]>('admin/permission-rules/', params);
+    return apiClient.getAll<AdminPermissionRule>('admin/permission-rules/', params);
   },
 
   createPermissionRule(payload: { admin: number; permission_type: string; can_create?: boolean; can_read?: boolean; can_update?: boolean; can_delete?: boolean }) {
@@ -40,7 +40,7 @@ export interface Reservation {
 
 export const bookingService = {
   listReservations(params: { status?: string; scope?: 'partner' | 'user' } = {}) {
-    return apiClient.get<Reservation[]>('bookings/reservations/', params);
+    return apiClient.getAll<Reservation>('bookings/reservations/', params);
   },
 
   updateReservation(id: number | string, payload: Partial<Pick<Reservation, 'status' | 'special_requests'>>) {
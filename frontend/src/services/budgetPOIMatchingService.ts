@@ -92,7 +92,7 @@ export const getPOIsByBudgetLevel = async (budgetLevelCode: string, radius?: num
       'budget_level__code': budgetLevelCode,
       status: 'approved',
     };
-    const pois = await apiClient.get<POI[]>('poi/tourist-points/', params);
+    const pois = await apiClient.getAll<POI>('poi/tourist-points/', params);
     if (radius && latitude && longitude) {
       return (pois || []).filter((poi) => {
         if (poi.latitude === undefined || poi.longitude === undefined) {
@@ -29,7 +29,7 @@ const BASE_ENDPOINT = 'discovery/itineraries/';
 
 export const discoveryService = {
   list(params?: Record<string, string | number | boolean>) {
-    return apiClient.get<DiscoveryItinerary[]>(BASE_ENDPOINT, params);
+    return apiClient.getAll<DiscoveryItinerary>(BASE_ENDPOINT, params);
   },
 
   create(payload: DiscoveryItineraryPayload) {
@@ -12,7 +12,7 @@ const BASE_ENDPOINT = 'poi/favorites/';
 
 export const favoritePoiService = {
   list() {
-    return apiClient.get<FavoritePOIEntry[]>(BASE_ENDPOINT);
+    return apiClient.getAll<FavoritePOIEntry>(BASE_ENDPOINT);
   },
 
   add(tourist_point_id: string) {
@@ -39,7 +39,7 @@ export interface NotificationPreferenceDTO {
 
 export const notificationService = {
   list(params?: { limit?: number }) {
-    return apiClient.get<NotificationDTO[]>('accounts/notifications/', params);
+    return apiClient.getAll<NotificationDTO>('accounts/notifications/', params);
   },
 
   create(payload: Partial<Omit<NotificationDTO, 'id' | 'user' | 'created_at' | 'updated_at'>>) {
@@ -152,7 +152,7 @@ export interface PartnerAnalyticsSeriesPoint {
 
 export const partnerService = {
   async listProfiles(params?: { search?: string; status?: string; subscription_type?: string }) {
-    return apiClient.get<PartnerProfile[]>('partners/profiles/', params);
+    return apiClient.getAll<PartnerProfile>('partners/profiles/', params);
   },
 
   async getMyProfile() {
@@ -178,7 +178,7 @@ export const partnerService = {
 
   async listNotifications(params: { limit?: number } = {}) {
     const searchParams = params.limit ? { limit: params.limit } : undefined;
-    return apiClient.get<PartnerNotificationDTO[]>('partners/notifications/', searchParams);
+    return apiClient.getAll<PartnerNotificationDTO>('partners/notifications/', searchParams);
   },
 
   async markNotificationRead(id: number | string) {
@@ -206,11 +206,11 @@ export const partnerService = {
   },
 
   async listManagedTouristPoints() {
-    return apiClient.get<PartnerTouristPointSummary[]>('poi/tourist-points/', { owner: 'me' });
+    return apiClient.getAll<PartnerTouristPointSummary>('poi/tourist-points/', { owner: 'me' });
   },
 
   async getBookingConfigByPoint(touristPointId: string) {
-    const configs = await apiClient.get<PartnerBookingConfig[]>('partners/booking-configs/', {
+    const configs = await apiClient.getAll<PartnerBookingConfig>('partners/booking-configs/', {
       tourist_point: touristPointId,
     });
     return configs[0] ?? null;
@@ -229,11 +229,11 @@ export const partnerService = {
   },
 
   async listCommissions(params: { payment_status?: string } = {}) {
-    return apiClient.get<PartnerCommission[]>('partners/commissions/', params);
+    return apiClient.getAll<PartnerCommission>('partners/commissions/', params);
   },
 
   async listWithdrawals() {
-    return apiClient.get<PartnerWithdrawal[]>('partners/withdrawals/');
+    return apiClient.getAll<PartnerWithdrawal>('partners/withdrawals/');
   },
 
   async requestWithdrawal(payload: { amount: number; payment_method: number | string }) {
@@ -241,7 +241,7 @@ export const partnerService = {
   },
 
   async listPaymentMethods() {
-    return apiClient.get<PartnerPaymentMethod[]>('partners/payment-methods/');
+    return apiClient.getAll<PartnerPaymentMethod>('partners/payment-methods/');
   },
 
   async addPaymentMethod(payload: { method_type: string; label?: string; details: Record<string, any>; is_default?: boolean }) {
@@ -253,7 +253,7 @@ export const partnerService = {
   },
 
   async listEndpointHealth() {
-    return apiClient.get<PartnerEndpointHealth[]>('partners/endpoints/');
+    return apiClient.getAll<PartnerEndpointHealth>('partners/endpoints/');
   },
 
   async runEndpointHealthCheck() {
@@ -253,7 +253,7 @@ export const getPOIsInRadius = async (
 ): Promise<POI[]> => {
   try {
     const params = buildSearchParams(filters);
-    const data = await apiClient.get<any[]>('poi/tourist-points/', params);
+    const data = await apiClient.getAll<any>('poi/tourist-points/', params);
 
     let filteredPOIs = (data ?? [])
       .map(item => mapApiPoi(item, centerLat, centerLon))
@@ -35,7 +35,7 @@ class ReviewService {
    * Get all reviews for a specific tourist point
    */
   async getReviewsForPOI(touristPointId: string): Promise<Review[]> {
-    return apiClient.get<Review[]>(this.endpoint, {
+    return apiClient.getAll<Review>(this.endpoint, {
       tourist_point_id: touristPointId,
     });
   }
@@ -72,7 +72,7 @@ class ReviewService {
    * Get reviews by the current user
    */
   async getMyReviews(): Promise<Review[]> {
-    return apiClient.get<Review[]>(this.endpoint);
+    return apiClient.getAll<Review>(this.endpoint);
   }
 }
 
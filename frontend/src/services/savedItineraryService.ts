@@ -28,7 +28,7 @@ const ENDPOINT = 'travel/saved-itineraries/';
 
 export const savedItineraryService = {
   list(params?: Record<string, string | number | boolean>) {
-    return apiClient.get<SavedItinerary[]>(ENDPOINT, params);
+    return apiClient.getAll<SavedItinerary>(ENDPOINT, params);
   },
 
   create(payload: SaveItineraryPayload) {
@@ -110,7 +110,7 @@ const toId = (id: string | number) => String(id);
 
 export const storyService = {
   fetchStories(params: FetchStoriesParams = {}) {
-    return apiClient.get<Story[]>(STORIES_ENDPOINT, buildQueryParams(params));
+    return apiClient.getAll<Story>(STORIES_ENDPOINT, buildQueryParams(params));
   },
 
   fetchTrendingStories(days: number) {
@@ -154,7 +154,7 @@ export const storyService = {
   },
 
   fetchComments(storyId: string | number) {
-    return apiClient.get<StoryComment[]>(STORY_COMMENTS_ENDPOINT, { story: storyId });
+    return apiClient.getAll<StoryComment>(STORY_COMMENTS_ENDPOINT, { story: storyId });
   },
 
   addComment(storyId: string | number, content: string) {